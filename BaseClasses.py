@@ -4,12 +4,15 @@ import copy
 import itertools
 import functools
 import logging
+import multiprocessing
 import random
 import secrets
+import threading
 import typing  # this can go away when Python 3.8 support is dropped
 from argparse import Namespace
+from array import array
 from collections import Counter, deque
-from collections.abc import Collection, MutableSequence
+from collections.abc import Collection, MutableMapping, MutableSequence
 from enum import IntEnum, IntFlag
 from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, \
                    TypedDict, Union, Type, ClassVar
@@ -19,6 +22,7 @@ import Options
 import Utils
 
 if typing.TYPE_CHECKING:
+    from GenerationProfile import GenerationProfile
     from worlds import AutoWorld
 
 
@@ -59,8 +63,15 @@ class MultiWorld():
     regions: RegionManager
     itempool: List[Item]
     is_race: bool = False
+    generation_threads: int = 1
+    """Amount of threads to run the World.isolated_stages of worlds in."""
+    profile: Optional[GenerationProfile] = None
+    """Records the time taken by generation steps, if profiling."""
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    _sphere_analysis: Optional[SphereAnalysis] = None
+    _sphere_analysis_lock: threading.Lock
+    _indirect_connections_lock: threading.Lock
 
     plando_options: PlandoOptions
     accessibility: Dict[int, Options.Accessibility]
@@ -95,11 +106,24 @@ class MultiWorld():
         region_cache: Dict[int, Dict[str, Region]]
         entrance_cache: Dict[int, Dict[str, Entrance]]
         location_cache: Dict[int, Dict[str, Location]]
+        filled_locations: Dict[int, Dict[Location, int]]
+        """Registered locations holding an item, mapped to their place in location_cache."""
+        unfilled_locations: Dict[int, Dict[Location, int]]
+        """Registered locations without an item, mapped to their place in location_cache."""
+        placements: int
+        """Counts changes to the location indexes, to tell when results depending on placements are outdated."""
+        lock: threading.Lock
+        """Guards the location indexes and placements, which isolated stages of worlds update from other threads."""
 
         def __init__(self, players: int):
             self.region_cache = {player: {} for player in range(1, players+1)}
             self.entrance_cache = {player: {} for player in range(1, players+1)}
             self.location_cache = {player: {} for player in range(1, players+1)}
+            self.filled_locations = {player: {} for player in range(1, players+1)}
+            self.unfilled_locations = {player: {} for player in range(1, players+1)}
+            self._location_order = itertools.count()
+            self.placements = 0
+            self.lock = threading.Lock()
 
         def __iadd__(self, other: Iterable[Region]):
             self.extend(other)
@@ -120,6 +144,48 @@ class MultiWorld():
             self.region_cache[new_id] = {}
             self.entrance_cache[new_id] = {}
             self.location_cache[new_id] = {}
+            self.filled_locations[new_id] = {}
+            self.unfilled_locations[new_id] = {}
+
+        def add_location(self, location: Location) -> None:
+            assert location.name not in self.location_cache[location.player], \
+                f"{location.name} already exists in the location cache."
+            with self.lock:
+                self.location_cache[location.player][location.name] = location
+                self._index_location(location, next(self._location_order))
+                self.placements += 1
+
+        def remove_location(self, location: Location) -> None:
+            with self.lock:
+                del self.location_cache[location.player][location.name]
+                self.filled_locations[location.player].pop(location, None)
+                self.unfilled_locations[location.player].pop(location, None)
+                self.placements += 1
+
+        def update_location(self, location: Location) -> None:
+            """Moves a location to the indexes matching its current item, if it is registered."""
+            player_locations = self.location_cache.get(location.player)
+            if player_locations and player_locations.get(location.name) is location:
+                with self.lock:
+                    order = self.filled_locations[location.player].pop(location, None)
+                    if order is None:
+                        order = self.unfilled_locations[location.player].pop(location)
+                    self._index_location(location, order)
+                    self.placements += 1
+
+        def _index_location(self, location: Location, order: int) -> None:
+            if location.item is None:
+                self.unfilled_locations[location.player][location] = order
+            else:
+                self.filled_locations[location.player][location] = order
+
+        @staticmethod
+        def sorted_locations(index: Dict[int, Dict[Location, int]], player: Optional[int] = None) -> List[Location]:
+            """Returns the locations of an index in location_cache order."""
+            if player is not None:
+                return sorted(index[player], key=index[player].__getitem__)
+            return [location for player_index in index.values()
+                    for location in sorted(player_index, key=player_index.__getitem__)]
 
         def __iter__(self) -> Iterator[Region]:
             for regions in self.region_cache.values():
@@ -155,6 +221,8 @@ class MultiWorld():
         self.local_early_items = {player: {} for player in self.player_ids}
         self.indirect_connections = {}
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
+        self._sphere_analysis_lock = threading.Lock()
+        self._indirect_connections_lock = threading.Lock()
 
         for player in range(1, players + 1):
             def set_player_attr(attr, val):
@@ -406,7 +474,31 @@ class MultiWorld():
     def register_indirect_condition(self, region: Region, entrance: Entrance):
         """Report that access to this Region can result in unlocking this Entrance,
         state.can_reach(Region) in the Entrance's traversal condition, as opposed to pure transition logic."""
-        self.indirect_connections.setdefault(region, set()).add(entrance)
+        with self._indirect_connections_lock:
+            self.indirect_connections.setdefault(region, set()).add(entrance)
+
+    def find_indirect_conditions(self, players: Optional[Iterable[int]] = None) -> Dict[Region, Set[Entrance]]:
+        """
+        Evaluates the access rules of the players' entrances with only the precollected items and with all items,
+        recording which regions they check the reachability of.
+        Returns the regions checked by entrances that aren't registered as indirect conditions for them.
+        """
+        entrances = [entrance for player in (self.player_ids if players is None else players)
+                     for entrance in self.get_entrances(player)]
+        missing: Dict[Region, Set[Entrance]] = {}
+        for state in (CollectionState(self), self.get_all_state(False)):
+            state.track_dependencies()
+            # reach everything first, so the rules below don't record the reads of a nested search
+            for player in self.player_ids:
+                if state.stale[player]:
+                    state.update_reachable_regions(player)
+            for entrance in entrances:
+                _, reads = state.dependency_tracker.call(entrance.access_rule, state)
+                for region in reads:
+                    if isinstance(region, Region) and region is not entrance.parent_region \
+                            and entrance not in self.indirect_connections.get(region, ()):
+                        missing.setdefault(region, set()).add(entrance)
+        return missing
 
     def get_locations(self, player: Optional[int] = None) -> Iterable[Location]:
         if player is not None:
@@ -415,10 +507,14 @@ class MultiWorld():
                                            for player in self.regions.location_cache))
 
     def get_unfilled_locations(self, player: Optional[int] = None) -> List[Location]:
-        return [location for location in self.get_locations(player) if location.item is None]
+        return self.RegionManager.sorted_locations(self.regions.unfilled_locations, player)
 
     def get_filled_locations(self, player: Optional[int] = None) -> List[Location]:
-        return [location for location in self.get_locations(player) if location.item is not None]
+        return self.RegionManager.sorted_locations(self.regions.filled_locations, player)
+
+    def get_advancement_locations(self, player: Optional[int] = None) -> List[Location]:
+        # filtered here, as items can still change their classification after being placed
+        return [location for location in self.get_filled_locations(player) if location.item.advancement]
 
     def get_reachable_locations(self, state: Optional[CollectionState] = None, player: Optional[int] = None) -> List[Location]:
         state: CollectionState = state if state else self.state
@@ -426,7 +522,7 @@ class MultiWorld():
 
     def get_placeable_locations(self, state=None, player=None) -> List[Location]:
         state: CollectionState = state if state else self.state
-        return [location for location in self.get_locations(player) if location.item is None and location.can_reach(state)]
+        return [location for location in self.get_unfilled_locations(player) if location.can_reach(state)]
 
     def get_unfilled_locations_for_players(self, location_names: List[str], players: Iterable[int]):
         for player in players:
@@ -457,16 +553,15 @@ class MultiWorld():
             return all((self.has_beaten_game(state, p) for p in range(1, self.players + 1)))
 
     def can_beat_game(self, starting_state: Optional[CollectionState] = None) -> bool:
-        if starting_state:
-            if self.has_beaten_game(starting_state):
-                return True
-            state = starting_state.copy()
-        else:
-            if self.has_beaten_game(self.state):
-                return True
-            state = CollectionState(self)
-        prog_locations = {location for location in self.get_locations() if location.item
-                          and location.item.advancement and location not in state.locations_checked}
+        if not starting_state:
+            # beaten with self.state, or from a fresh state collecting all placed items
+            return self.has_beaten_game(self.state) or self.get_sphere_analysis().beatable
+        if self.has_beaten_game(starting_state):
+            return True
+        state = starting_state.copy()
+        prog_locations = {location for player_locations in self.regions.filled_locations.values()
+                          for location in player_locations
+                          if location.item.advancement and location not in state.locations_checked}
 
         while prog_locations:
             sphere: Set[Location] = set()
@@ -489,6 +584,18 @@ class MultiWorld():
 
         return False
 
+    def get_sphere_analysis(self, recompute: bool = False) -> SphereAnalysis:
+        """
+        Returns the spheres of the current placements, only computing them again once those have changed.
+
+        :param recompute: compute them again regardless, such as after changing rules
+        """
+        with self._sphere_analysis_lock:
+            analysis = self._sphere_analysis
+            if recompute or not analysis or analysis.key != SphereAnalysis.get_key(self):
+                analysis = self._sphere_analysis = SphereAnalysis(self)
+            return analysis
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -496,30 +603,41 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
+
+        Spheres are swept as they are requested, so changes made while iterating apply to the following spheres.
+        Those of an up-to-date sphere analysis are used until something changes.
         """
-        state = CollectionState(self)
+        analysis = self._sphere_analysis
+        if analysis and analysis.key != SphereAnalysis.get_key(self):
+            analysis = None
+        state = None if analysis else CollectionState(self)
         locations = set(self.get_filled_locations())
-
+        num = 0
         while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
+            if analysis:
+                sphere = set(analysis.spheres[num]) if num < len(analysis.spheres) else set()
+            else:
+                sphere = {location for location in locations if location.can_reach(state)}
             yield sphere
             if not sphere:
                 if locations:
                     yield locations  # unreachable locations
                 break
 
-            for location in sphere:
-                state.collect(location.item, True, location)
+            if analysis and analysis.key != SphereAnalysis.get_key(self):
+                # changed while iterating, continue sweeping from the state in front of this sphere
+                state = analysis.states[num].copy()
+                analysis = None
+            if not analysis:
+                for location in sphere:
+                    state.collect(location.item, True, location)
             locations -= sphere
+            num += 1
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
         if not state:
-            state = CollectionState(self)
+            return self.get_sphere_analysis().fulfills_accessibility()
         players: Dict[str, Set[int]] = {
             "minimal": set(),
             "items": set(),
@@ -579,7 +697,247 @@ class MultiWorld():
         return False
 
 
+class SphereAnalysis:
+    """
+    Spheres of all filled locations of a multiworld, swept once from a fresh CollectionState.
+
+    Get it from MultiWorld.get_sphere_analysis, which keeps it until locations, their items or the classification of
+    items change. Changes of rules are not tracked.
+    """
+    multiworld: MultiWorld
+    key: Tuple[int, int, int]
+    spheres: List[Set[Location]]
+    """Reachable filled locations, by the sphere they are first reachable in."""
+    states: List[CollectionState]
+    """
+    State in front of each sphere, followed by the state with all reachable items collected.
+    Shared by all threads, so copy them before using them, as even can_reach updates a state.
+    """
+    unreachable: Set[Location]
+    beaten_sphere: Optional[int]
+    """Amount of spheres that have to be collected to beat the game, None if it can't be beaten."""
+
+    def __init__(self, multiworld: MultiWorld) -> None:
+        self.multiworld = multiworld
+        self.key = self.get_key(multiworld)
+        self.spheres = []
+        state = CollectionState(multiworld)
+        self.states = [state.copy()]
+        self.beaten_sphere = 0 if multiworld.has_beaten_game(state) else None
+        locations = set(multiworld.get_filled_locations())
+        while locations:
+            sphere = {location for location in locations if location.can_reach(state)}
+            if not sphere:
+                break
+            for location in sphere:
+                state.collect(location.item, True, location)
+            locations -= sphere
+            self.spheres.append(sphere)
+            self.states.append(state.copy())
+            if self.beaten_sphere is None and multiworld.has_beaten_game(state):
+                self.beaten_sphere = len(self.spheres)
+        self.unreachable = locations
+
+    @staticmethod
+    def get_key(multiworld: MultiWorld) -> Tuple[int, int, int]:
+        """Changes whenever placements, the amount of precollected items or classifications of items change."""
+        return (multiworld.regions.placements, sum(map(len, multiworld.precollected_items.values())),
+                Item.classification_changes)
+
+    @property
+    def beatable(self) -> bool:
+        return self.beaten_sphere is not None
+
+    @property
+    def state(self) -> CollectionState:
+        """State with all reachable items collected, to be copied before modifying it."""
+        return self.states[-1]
+
+    def fulfills_accessibility(self) -> bool:
+        """Check if accessibility rules are fulfilled, the same way MultiWorld.fulfills_accessibility does."""
+        players: Dict[str, Set[int]] = {
+            "minimal": set(),
+            "items": set(),
+            "locations": set()
+        }
+        for player, access in self.multiworld.accessibility.items():
+            players[access.current_key].add(player)
+
+        def location_required(location: Location) -> bool:
+            if location.progress_type == LocationProgressType.EXCLUDED:
+                return False
+            return location.player in players["locations"] or \
+                bool(location.advancement and location.item.player not in players["minimal"])
+
+        missing = [location for location in self.unreachable if location_required(location)]
+        if players["locations"]:
+            state = self.state.copy()
+            missing += [location for location in self.multiworld.get_unfilled_locations()
+                        if location_required(location) and not location.can_reach(state)]
+        if missing:
+            logging.warning(f"Could not access required locations for accessibility check."
+                            f" Missing: {missing}")
+            return False
+        return self.beatable
+
+
 PathValue = Tuple[str, Optional["PathValue"]]
+DependencyKey = Union[Tuple[int, str], "Region"]
+"""Either a (player, item name) pair of prog_items or a Region whose reachability was checked."""
+
+
+class DependencyTracker:
+    """Records which prog_items entries and reachable Regions get read and written while rules are evaluated."""
+    __slots__ = ("reads", "writes")
+    reads: Optional[Set[DependencyKey]]
+    writes: Optional[Set[DependencyKey]]
+
+    def __init__(self) -> None:
+        self.reads = None
+        self.writes = None
+
+    def call(self, rule: Callable[..., bool], *args: Any) -> Tuple[bool, Set[DependencyKey]]:
+        """Evaluates rule, returning its result and everything it read."""
+        outer = self.reads
+        self.reads = reads = set()
+        try:
+            return rule(*args), reads
+        finally:
+            self.reads = outer
+
+
+class ItemCounts(MutableMapping):
+    """
+    Counter replacement for prog_items[player] of worlds with array_inventory.
+    Counts live in an array, indexed by slots that are shared by all states of the player, so copies are cheap.
+    Item names without a slot get one when first set. A count of 0 means the same as a missing item name.
+    """
+    __slots__ = ("slots", "counts")
+    slots: Dict[str, int]
+    counts: array
+
+    def __init__(self, slots: Dict[str, int], counts: Optional[array] = None) -> None:
+        self.slots = slots
+        self.counts = array("i", [0] * len(slots)) if counts is None else counts
+
+    def __getitem__(self, item: str) -> int:
+        slot = self.slots.get(item)
+        if slot is None or slot >= len(self.counts):
+            return 0
+        return self.counts[slot]
+
+    def get(self, item: str, default: Any = None) -> Any:
+        return self[item] or default
+
+    def __contains__(self, item: object) -> bool:
+        return self[item] != 0  # type: ignore[index]
+
+    def __setitem__(self, item: str, value: int) -> None:
+        slot = self.slots.get(item)
+        if slot is None:
+            slot = self.slots[item] = len(self.slots)
+        if slot >= len(self.counts):
+            self.counts.extend([0] * (len(self.slots) - len(self.counts)))
+        self.counts[slot] = value
+
+    def __delitem__(self, item: str) -> None:
+        # like Counter, missing items are fine
+        slot = self.slots.get(item)
+        if slot is not None and slot < len(self.counts):
+            self.counts[slot] = 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (item for item, count in zip(self.slots, self.counts) if count)
+
+    def __len__(self) -> int:
+        return len(self.counts) - self.counts.count(0)
+
+    def copy(self) -> ItemCounts:
+        return self.__class__(self.slots, array("i", self.counts))
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> ItemCounts:
+        # the slots are shared by all states of the player
+        return self.copy()
+
+    def update(self, other: Any = (), **kwargs: int) -> None:
+        """Adds counts, like Counter.update does."""
+        if isinstance(other, Mapping):
+            for item, count in other.items():
+                self[item] += count
+        else:
+            for item in other:
+                self[item] += 1
+        for item, count in kwargs.items():
+            self[item] += count
+
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+class _TrackedItems:
+    """Reports reads and writes of item counts to a DependencyTracker."""
+    __slots__ = ()
+    tracker: Optional[DependencyTracker]
+    player: int
+
+    def __getitem__(self, item: str) -> int:
+        if self.tracker and self.tracker.reads is not None:
+            self.tracker.reads.add((self.player, item))
+        return super().__getitem__(item)  # type: ignore[misc]
+
+    def get(self, item: str, default: Any = None) -> Any:
+        if self.tracker and self.tracker.reads is not None:
+            self.tracker.reads.add((self.player, item))
+        return super().get(item, default)  # type: ignore[misc]
+
+    def __contains__(self, item: object) -> bool:
+        if self.tracker and self.tracker.reads is not None:
+            self.tracker.reads.add((self.player, item))
+        return super().__contains__(item)  # type: ignore[misc]
+
+    def __setitem__(self, item: str, value: int) -> None:
+        if self.tracker and self.tracker.writes is not None:
+            self.tracker.writes.add((self.player, item))
+        super().__setitem__(item, value)  # type: ignore[misc]
+
+    def __delitem__(self, item: str) -> None:
+        if self.tracker and self.tracker.writes is not None:
+            self.tracker.writes.add((self.player, item))
+        super().__delitem__(item)  # type: ignore[misc]
+
+
+class TrackedCounter(_TrackedItems, Counter):
+    """Counter used as prog_items[player] while a DependencyTracker is active."""
+    tracker: Optional[DependencyTracker] = None
+    player: int = 0
+
+
+class TrackedItemCounts(_TrackedItems, ItemCounts):
+    """ItemCounts used as prog_items[player] while a DependencyTracker is active."""
+    __slots__ = ("tracker", "player")
+
+    def __init__(self, slots: Dict[str, int], counts: Optional[array] = None) -> None:
+        super().__init__(slots, counts)
+        self.tracker = None
+        self.player = 0
+
+
+class TrackedRegionSet(set):
+    """Set used as reachable_regions[player] while a DependencyTracker is active."""
+    tracker: Optional[DependencyTracker] = None
+
+    def __contains__(self, region: object) -> bool:
+        if self.tracker and self.tracker.reads is not None:
+            self.tracker.reads.add(region)
+        return super().__contains__(region)
+
+    def add(self, region: Region) -> None:
+        if self.tracker and self.tracker.writes is not None:
+            self.tracker.writes.add(region)
+        super().add(region)
 
 
 class CollectionState():
@@ -591,11 +949,17 @@ class CollectionState():
     path: Dict[Union[Region, Entrance], PathValue]
     locations_checked: Set[Location]
     stale: Dict[int, bool]
+    reachability_dependencies: Dict[int, Optional[Dict[Entrance, Set[DependencyKey]]]]
+    """What each traversed entrance read, per player. None if unknown, in which case remove() starts over."""
+    dependency_tracker: Optional[DependencyTracker] = None
+    """Set if any world uses incremental_reachability, see track_dependencies."""
+    private_players: Set[int]
+    """Players whose prog_items, reachable_regions and blocked_connections are not shared with a copy."""
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld):
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = {player: self._new_item_counts(parent, player) for player in parent.get_all_ids()}
         self.multiworld = parent
         self.reachable_regions = {player: set() for player in parent.get_all_ids()}
         self.blocked_connections = {player: set() for player in parent.get_all_ids()}
@@ -603,33 +967,76 @@ class CollectionState():
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.reachability_dependencies = {player: None for player in parent.get_all_ids()}
+        self.private_players = set(parent.get_all_ids())
+        if any(world.incremental_reachability for world in parent.worlds.values()):
+            self.track_dependencies()
         for function in self.additional_init_functions:
             function(self, parent)
         for items in parent.precollected_items.values():
             for item in items:
                 self.collect(item, True)
 
+    @staticmethod
+    def _new_item_counts(multiworld: MultiWorld, player: int) -> Counter[str]:
+        world = multiworld.worlds.get(player)
+        if world and world.array_inventory:
+            return ItemCounts(world.item_slots)  # type: ignore[return-value]
+        return Counter()
+
     def update_reachable_regions(self, player: int):
+        tracker = self.dependency_tracker
+        if not tracker or tracker.reads is None:
+            return self._update_reachable_regions(player)
+        # a rule asking for a region of a stale player only read that region, not what the search behind it checks
+        reads, tracker.reads = tracker.reads, None
+        try:
+            self._update_reachable_regions(player)
+        finally:
+            tracker.reads = reads
+
+    def _update_reachable_regions(self, player: int):
         self.stale[player] = False
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
         queue = deque(self.blocked_connections[player])
         start = self.multiworld.get_region("Menu", player)
+        tracker = self.dependency_tracker
+        shared = player not in self.private_players
 
         # init on first call - this can't be done on construction since the regions don't exist yet
         if start not in reachable_regions:
+            if shared:
+                reachable_regions, blocked_connections = self.unshare(player)
+                shared = False
             reachable_regions.add(start)
             blocked_connections.update(start.exits)
             queue.extend(start.exits)
+            if tracker and self.multiworld.worlds[player].incremental_reachability:
+                self.reachability_dependencies[player] = {}
+        dependencies = self.reachability_dependencies[player]
 
         # run BFS on all connections, and keep track of those blocked by missing items
         while queue:
             connection = queue.popleft()
             new_region = connection.connected_region
             if new_region in reachable_regions:
-                blocked_connections.remove(connection)
-            elif connection.can_reach(self):
+                if not shared:  # only a cleanup, so not worth unsharing for
+                    blocked_connections.remove(connection)
+                continue
+            if dependencies is None:
+                reachable = connection.can_reach(self)
+            else:
+                # remember what allowed traversal, so remove() only has to forget what actually depended on it
+                reachable, reads = tracker.call(connection.can_reach, self)
+                if reachable:
+                    dependencies[connection] = reads
+                self._register_indirect_reads(connection, reads)
+            if reachable:
                 assert new_region, f"tried to search through an Entrance \"{connection}\" with no Region"
+                if shared:
+                    reachable_regions, blocked_connections = self.unshare(player)
+                    shared = False
                 reachable_regions.add(new_region)
                 blocked_connections.remove(connection)
                 blocked_connections.update(new_region.exits)
@@ -641,20 +1048,61 @@ class CollectionState():
                     if new_entrance in blocked_connections and new_entrance not in queue:
                         queue.append(new_entrance)
 
+    def _register_indirect_reads(self, connection: Entrance, reads: Set[DependencyKey]) -> None:
+        """Registers regions the rule of connection checked as indirect conditions, if its world forgot to."""
+        for region in reads:
+            if isinstance(region, Region) and region is not connection.parent_region \
+                    and connection not in self.multiworld.indirect_connections.get(region, ()):
+                logging.debug("Registering %s as indirect condition of %s", region, connection)
+                self.multiworld.register_indirect_condition(region, connection)
+
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
-        ret.prog_items = copy.deepcopy(self.prog_items)
-        ret.reachable_regions = {player: copy.copy(self.reachable_regions[player]) for player in
-                                 self.reachable_regions}
-        ret.blocked_connections = {player: copy.copy(self.blocked_connections[player]) for player in
-                                   self.blocked_connections}
+        """
+        Per-player prog_items, reachable_regions and blocked_connections get shared between the copies,
+        until either of them calls unshare for that player.
+        """
+        ret = self.__class__.__new__(self.__class__)
+        ret.multiworld = self.multiworld
+        if self.dependency_tracker:
+            # tracked containers report to their own state, so they can't be shared
+            ret.prog_items = copy.deepcopy(self.prog_items)
+            ret.reachable_regions = {player: copy.copy(self.reachable_regions[player]) for player in
+                                     self.reachable_regions}
+            ret.blocked_connections = {player: copy.copy(self.blocked_connections[player]) for player in
+                                       self.blocked_connections}
+            ret.private_players = set(self.private_players)
+            ret.track_dependencies()
+        else:
+            ret.prog_items = self.prog_items.copy()
+            ret.reachable_regions = self.reachable_regions.copy()
+            ret.blocked_connections = self.blocked_connections.copy()
+            ret.private_players = set()
+            self.private_players = set()
         ret.events = copy.copy(self.events)
         ret.path = copy.copy(self.path)
         ret.locations_checked = copy.copy(self.locations_checked)
+        ret.stale = {player: True for player in self.stale}
+        ret.reachability_dependencies = {player: None if dependencies is None else dependencies.copy()
+                                         for player, dependencies in self.reachability_dependencies.items()}
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    def unshare(self, player: int) -> Tuple[Set[Region], Set[Entrance]]:
+        """
+        Ensures prog_items, reachable_regions and blocked_connections of player are not shared with a copy.
+        Has to be called before modifying them outside of collect and remove.
+        Returns the now private reachable regions and blocked connections.
+        """
+        if player not in self.private_players:
+            self.private_players.add(player)
+            self.prog_items[player] = self.prog_items[player].copy()
+            self.reachable_regions[player] = self.reachable_regions[player].copy()
+            self.blocked_connections[player] = self.blocked_connections[player].copy()
+        return self.reachable_regions[player], self.blocked_connections[player]
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -682,11 +1130,16 @@ class CollectionState():
 
     def sweep_for_events(self, key_only: bool = False, locations: Optional[Iterable[Location]] = None) -> None:
         if locations is None:
-            locations = self.multiworld.get_filled_locations()
+            # the order does not matter here, the locations end up in a set
+            locations = [location for player_locations in self.multiworld.regions.filled_locations.values()
+                         for location in player_locations]
         reachable_events = True
         # since the loop has a good chance to run more than once, only filter the events once
         locations = {location for location in locations if location.advancement and location not in self.events and
                      not key_only or getattr(location.item, "locked_dungeon_item", False)}
+        if self.dependency_tracker:
+            self._sweep_for_events_incremental(locations)
+            return
         while reachable_events:
             reachable_events = {location for location in locations if location.can_reach(self)}
             locations -= reachable_events
@@ -695,6 +1148,73 @@ class CollectionState():
                 assert isinstance(event.item, Item), "tried to collect Event with no Item"
                 self.collect(event.item, True, event)
 
+    def _sweep_for_events_incremental(self, locations: Set[Location]) -> None:
+        """
+        Like sweep_for_events, but after the first round only re-evaluates locations whose rules read something that
+        changed since. Locations of worlds without incremental_reachability are re-evaluated every round.
+        """
+        tracker = self.dependency_tracker
+        worlds = self.multiworld.worlds
+        untracked = {location for location in locations if not worlds[location.player].incremental_reachability}
+        dependents: Dict[DependencyKey, Set[Location]] = {}
+        region_players: Set[int] = set()
+        pending = locations
+        while pending:
+            reachable_events: List[Location] = []
+            for location in pending:
+                reachable, reads = tracker.call(location.can_reach, self)
+                if reachable:
+                    reachable_events.append(location)
+                elif location not in untracked:
+                    for key in reads:
+                        dependents.setdefault(key, set()).add(location)
+                        if isinstance(key, Region):
+                            region_players.add(key.player)
+            if not reachable_events:
+                break
+
+            tracker.writes = changed = set()
+            try:
+                for event in reachable_events:
+                    locations.discard(event)
+                    self.events.add(event)
+                    assert isinstance(event.item, Item), "tried to collect Event with no Item"
+                    self.collect(event.item, True, event)
+                # newly reachable regions have to be known before deciding what to re-evaluate
+                for player in region_players:
+                    if self.stale[player]:
+                        self.update_reachable_regions(player)
+            finally:
+                tracker.writes = None
+
+            pending = {location for key in changed for location in dependents.pop(key, ()) if location in locations}
+            pending |= untracked & locations
+
+    def track_dependencies(self) -> None:
+        """
+        Switch prog_items and reachable_regions to containers that report to a DependencyTracker,
+        which is what incremental_reachability is built on.
+        """
+        tracker = self.dependency_tracker = DependencyTracker()
+        for player, counter in self.prog_items.items():
+            if isinstance(counter, ItemCounts):
+                if type(counter) is not TrackedItemCounts:
+                    counter = self.prog_items[player] = TrackedItemCounts(counter.slots, counter.counts)
+            elif type(counter) is not TrackedCounter:
+                counter = self.prog_items[player] = TrackedCounter(counter)
+            counter.player = player
+            counter.tracker = tracker
+        for player, regions in self.reachable_regions.items():
+            self.reachable_regions[player] = self._region_set(regions)
+
+    def _region_set(self, regions: Iterable[Region] = ()) -> Set[Region]:
+        if not self.dependency_tracker:
+            return set(regions)
+        if type(regions) is not TrackedRegionSet:
+            regions = TrackedRegionSet(regions)
+        regions.tracker = self.dependency_tracker
+        return regions
+
     # item name related
     def has(self, item: str, player: int, count: int = 1) -> bool:
         return self.prog_items[player][item] >= count
@@ -792,6 +1312,7 @@ class CollectionState():
         if location:
             self.locations_checked.add(location)
 
+        self.unshare(item.player)
         changed = self.multiworld.worlds[item.player].collect(self, item)
 
         if not changed and event:
@@ -805,27 +1326,129 @@ class CollectionState():
 
         return changed
 
-    def remove(self, item: Item):
+    def remove(self, item: Item) -> bool:
+        self.unshare(item.player)
+        if not self.dependency_tracker or all(dependencies is None
+                                              for dependencies in self.reachability_dependencies.values()):
+            changed = self.multiworld.worlds[item.player].remove(self, item)
+            if changed:
+                # invalidate caches, nothing can be trusted anymore now
+                self.reachable_regions[item.player] = self._region_set()
+                self.blocked_connections[item.player] = set()
+                self.stale[item.player] = True
+            return changed
+
+        before = self.prog_items[item.player].copy()
         changed = self.multiworld.worlds[item.player].remove(self, item)
         if changed:
-            # invalidate caches, nothing can be trusted anymore now
-            self.reachable_regions[item.player] = set()
-            self.blocked_connections[item.player] = set()
+            after = self.prog_items[item.player]
+            removed: Set[DependencyKey] = {(item.player, name) for name in before.keys() | after.keys()
+                                           if before[name] != after[name]}
             self.stale[item.player] = True
+            self._invalidate_regions(removed, item.player)
+        return changed
+
+    def _invalidate_regions(self, removed: Set[DependencyKey], player: int) -> None:
+        """
+        Forget the regions that were only reachable through entrances that read something in removed.
+        Regions of a player whose entrance dependencies are unknown are all forgotten, like without tracking.
+        Other regions stay reachable and the BFS resumes from the blocked connections on the next update.
+        """
+        changed: Set[DependencyKey] = removed
+        if self.reachability_dependencies[player] is None:
+            changed = changed | self.reachable_regions[player]
+            self.reachable_regions[player] = self._region_set()
+            self.blocked_connections[player] = set()
+        while changed:
+            lost_regions: Set[DependencyKey] = set()
+            for other, dependencies in self.reachability_dependencies.items():
+                if dependencies:
+                    invalid = [entrance for entrance, reads in dependencies.items() if not reads.isdisjoint(changed)]
+                    if invalid:
+                        lost_regions |= self._prune_regions(other, invalid)
+            # entrances that checked for a now lost region may no longer be traversable either
+            changed = lost_regions
+
+    def _prune_regions(self, player: int, invalid: Iterable[Entrance]) -> Set[Region]:
+        """Removes entrances from the traversed ones and returns the regions that can no longer be reached."""
+        dependencies = self.reachability_dependencies[player]
+        for entrance in invalid:
+            del dependencies[entrance]
+        start = self.multiworld.get_region("Menu", player)
+        reachable_regions = {start}
+        queue = deque((start,))
+        # walk the still valid entrances, no rules need to be evaluated for that
+        while queue:
+            region = queue.popleft()
+            for exit_ in region.exits:
+                if exit_ in dependencies and exit_.connected_region not in reachable_regions:
+                    reachable_regions.add(exit_.connected_region)
+                    queue.append(exit_.connected_region)
+        lost_regions = self.reachable_regions[player] - reachable_regions
+        for entrance in [entrance for entrance in dependencies if entrance.parent_region in lost_regions]:
+            del dependencies[entrance]
+        self.reachable_regions[player] = self._region_set(reachable_regions)
+        self.blocked_connections[player] = {exit_ for region in reachable_regions for exit_ in region.exits
+                                            if exit_ not in dependencies}
+        self.stale[player] = True
+        return lost_regions
+
+
+def _slot_defaults(cls: type, base: type) -> Optional[Tuple[Tuple[str, Any], ...]]:
+    """
+    The slot_defaults of base that an instance of cls has to be given, which are those that neither cls nor any class
+    between it and base override with a class attribute. None if nothing is overridden, so all of them are needed.
+    """
+    try:
+        return _slot_defaults_cache[cls]
+    except KeyError:
+        mro = cls.__mro__
+        overridden = {name for klass in mro[:mro.index(base)] for name in vars(klass)}
+        defaults: Optional[Tuple[Tuple[str, Any], ...]] = tuple(
+            (name, value) for name, value in base.slot_defaults.items() if name not in overridden)
+        if len(defaults) == len(base.slot_defaults):
+            defaults = None
+        _slot_defaults_cache[cls] = defaults
+        return defaults
+
+
+_slot_defaults_cache: Dict[type, Optional[Tuple[Tuple[str, Any], ...]]] = {}
 
 
 class Entrance:
-    access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
-    hide_path: bool = False
+    """
+    Slotted to keep large multiworlds small. Other attributes still work, they go into a __dict__ that only gets
+    created for them, so subclasses stay as compact by declaring __slots__ for the attributes they add.
+    Defaults of slots are in slot_defaults, subclasses can override them with class attributes.
+    """
+    __slots__ = ("player", "name", "parent_region", "connected_region", "access_rule", "hide_path", "addresses",
+                 "target", "__dict__")
+    slot_defaults: ClassVar[Dict[str, Any]] = {
+        "access_rule": lambda state: True,
+        "hide_path": False,
+        "connected_region": None,
+        # LttP specific, TODO: should make a LttPEntrance
+        "addresses": None,
+        "target": None,
+    }
+    access_rule: Callable[[CollectionState], bool]
+    hide_path: bool
     player: int
     name: str
     parent_region: Optional[Region]
-    connected_region: Optional[Region] = None
-    # LttP specific, TODO: should make a LttPEntrance
-    addresses = None
-    target = None
+    connected_region: Optional[Region]
+    addresses: Any
+    target: Any
 
     def __init__(self, player: int, name: str = '', parent: Region = None):
+        defaults = _slot_defaults(type(self), Entrance)
+        if defaults is None:
+            # the common case, assigning them all at once is a lot faster than the loop
+            self.access_rule, self.hide_path, self.connected_region, self.addresses, self.target = \
+                Entrance.slot_defaults.values()
+        else:
+            for key, value in defaults:
+                setattr(self, key, value)
         self.name = name
         self.parent_region = parent
         self.player = player
@@ -853,6 +1476,8 @@ class Entrance:
 
 
 class Region:
+    """Slotted like Entrance."""
+    __slots__ = ("name", "_hint_text", "player", "multiworld", "entrances", "_exits", "_locations", "__dict__")
     name: str
     _hint_text: str
     player: int
@@ -863,6 +1488,7 @@ class Region:
     entrance_type: ClassVar[Type[Entrance]] = Entrance
 
     class Register(MutableSequence):
+        __slots__ = ("_list", "region_manager")
         region_manager: MultiWorld.RegionManager
 
         def __init__(self, region_manager: MultiWorld.RegionManager):
@@ -889,13 +1515,11 @@ class Region:
         def __delitem__(self, index: int) -> None:
             location: Location = self._list.__getitem__(index)
             self._list.__delitem__(index)
-            del(self.region_manager.location_cache[location.player][location.name])
+            self.region_manager.remove_location(location)
 
         def insert(self, index: int, value: Location) -> None:
-            assert value.name not in self.region_manager.location_cache[value.player], \
-                f"{value.name} already exists in the location cache."
+            self.region_manager.add_location(value)
             self._list.insert(index, value)
-            self.region_manager.location_cache[value.player][value.name] = value
 
     class EntranceRegister(Register):
         def __delitem__(self, index: int) -> None:
@@ -1026,25 +1650,56 @@ class LocationProgressType(IntEnum):
 
 
 class Location:
+    """Slotted like Entrance."""
+    __slots__ = ("player", "name", "address", "parent_region", "_item", "locked", "show_in_spoiler", "progress_type",
+                 "always_allow", "access_rule", "item_rule", "__dict__")
+    slot_defaults: ClassVar[Dict[str, Any]] = {
+        "_item": None,
+        "locked": False,
+        "show_in_spoiler": True,
+        "progress_type": LocationProgressType.DEFAULT,
+        "always_allow": lambda state, item: False,
+        "access_rule": lambda state: True,
+        "item_rule": lambda item: True,
+    }
     game: str = "Generic"
     player: int
     name: str
     address: Optional[int]
     parent_region: Optional[Region]
-    locked: bool = False
-    show_in_spoiler: bool = True
-    progress_type: LocationProgressType = LocationProgressType.DEFAULT
-    always_allow = staticmethod(lambda state, item: False)
-    access_rule: Callable[[CollectionState], bool] = staticmethod(lambda state: True)
-    item_rule = staticmethod(lambda item: True)
-    item: Optional[Item] = None
+    locked: bool
+    show_in_spoiler: bool
+    progress_type: LocationProgressType
+    always_allow: Callable[[CollectionState, Item], bool]
+    access_rule: Callable[[CollectionState], bool]
+    item_rule: Callable[[Item], bool]
+    _item: Optional[Item]
 
     def __init__(self, player: int, name: str = '', address: Optional[int] = None, parent: Optional[Region] = None):
+        defaults = _slot_defaults(type(self), Location)
+        if defaults is None:
+            # the common case, assigning them all at once is a lot faster than the loop
+            (self._item, self.locked, self.show_in_spoiler, self.progress_type, self.always_allow, self.access_rule,
+             self.item_rule) = Location.slot_defaults.values()
+        else:
+            for key, value in defaults:
+                setattr(self, key, value)
         self.player = player
         self.name = name
         self.address = address
         self.parent_region = parent
 
+    @property
+    def item(self) -> Optional[Item]:
+        return self._item
+
+    @item.setter
+    def item(self, item: Optional[Item]) -> None:
+        self._item = item
+        if self.parent_region and self.parent_region.multiworld:
+            # keep MultiWorld.get_filled_locations and co. up to date
+            self.parent_region.multiworld.regions.update_location(self)
+
     def can_fill(self, state: CollectionState, item: Item, check_access=True) -> bool:
         return ((self.always_allow(state, item) and item.name not in state.multiworld.worlds[item.player].options.non_local_items)
                 or ((self.progress_type != LocationProgressType.EXCLUDED or not (item.advancement or item.useful))
@@ -1112,21 +1767,32 @@ class ItemClassification(IntFlag):
 
 class Item:
     game: str = "Generic"
-    __slots__ = ("name", "classification", "code", "player", "location")
+    __slots__ = ("name", "_classification", "code", "player", "location")
     name: str
-    classification: ItemClassification
+    _classification: ItemClassification
     code: Optional[int]
     """an item with code None is called an Event, and does not get written to multidata"""
     player: int
     location: Optional[Location]
+    classification_changes: ClassVar[int] = 0
+    """Counts classification changes of all items, to tell when results depending on them are outdated."""
 
     def __init__(self, name: str, classification: ItemClassification, code: Optional[int], player: int):
         self.name = name
-        self.classification = classification
+        self._classification = classification
         self.player = player
         self.code = code
         self.location = None
 
+    @property
+    def classification(self) -> ItemClassification:
+        return self._classification
+
+    @classification.setter
+    def classification(self, classification: ItemClassification) -> None:
+        self._classification = classification
+        Item.classification_changes += 1
+
     @property
     def hint_text(self) -> str:
         return getattr(self, "_hint_text", self.name.replace("_", " ").replace("-", " "))
@@ -1137,23 +1803,23 @@ class Item:
 
     @property
     def advancement(self) -> bool:
-        return ItemClassification.progression in self.classification
+        return ItemClassification.progression in self._classification
 
     @property
     def skip_in_prog_balancing(self) -> bool:
-        return ItemClassification.progression_skip_balancing in self.classification
+        return ItemClassification.progression_skip_balancing in self._classification
 
     @property
     def useful(self) -> bool:
-        return ItemClassification.useful in self.classification
+        return ItemClassification.useful in self._classification
 
     @property
     def trap(self) -> bool:
-        return ItemClassification.trap in self.classification
+        return ItemClassification.trap in self._classification
 
     @property
     def flags(self) -> int:
-        return self.classification.as_flag()
+        return self._classification.as_flag()
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Item):
@@ -1186,6 +1852,124 @@ class EntranceInfo(TypedDict, total=False):
     direction: str
 
 
+class _SphereCuller:
+    """
+    Removes items from the collection spheres of a playthrough that are not needed to beat the game.
+
+    Spheres are culled from the last to the first. A candidate is checked from the cached state in front of its own
+    sphere with the rest of that sphere collected, so only the later spheres get swept again, until the game is beaten.
+    With processes > 1 the candidates of a sphere are first checked speculatively in forked worker processes.
+    Workers are only forked while no other thread runs, as a thread holding a lock at the fork would leave it held in
+    the worker forever; otherwise all candidates are checked in this process.
+    As removing items can only make the game harder, a candidate still required with only the earlier removals is
+    kept, and one removable even when all candidates before it that could be removed are gone is removed;
+    only the remaining ones are checked serially, so the result is the same as without workers.
+    """
+    current: ClassVar[Optional[_SphereCuller]] = None
+    """Culler of the running playthrough, inherited by forked workers."""
+
+    multiworld: MultiWorld
+    spheres: List[Set[Location]]
+    state_cache: List[Optional[CollectionState]]
+    locations: List[Location]
+    items: List[Item]
+    removed: Set[int]
+    """Indices into locations whose items have been culled."""
+
+    def __init__(self, multiworld: MultiWorld, spheres: List[Set[Location]],
+                 state_cache: List[Optional[CollectionState]]) -> None:
+        self.multiworld = multiworld
+        self.spheres = spheres
+        self.state_cache = state_cache
+        self.locations = [location for sphere in spheres for location in sorted(sphere)]
+        self.items = [location.item for location in self.locations]
+        self.removed = set()
+
+    def can_beat_without(self, num: int, index: int) -> bool:
+        """Checks if the game can be beaten without the item at locations[index], which is in sphere num."""
+        location = self.locations[index]
+        location.item = None
+        state = self.state_cache[num].copy() if self.state_cache[num] else CollectionState(self.multiworld)
+        for other in self.spheres[num]:
+            if other.item:
+                state.collect(other.item, True, other)
+        beatable = self.multiworld.can_beat_game(state)
+        location.item = self.items[index]
+        return beatable
+
+    def speculate(self, num: int, index: int, removed: Iterable[int]) -> bool:
+        """Runs can_beat_without as if the items at removed were culled, restoring them afterwards."""
+        for removed_index in removed:
+            self.locations[removed_index].item = None
+        beatable = self.can_beat_without(num, index)
+        for removed_index in removed:
+            self.locations[removed_index].item = self.items[removed_index]
+        return beatable
+
+    def cull(self, processes: int = 1) -> Dict[Location, Item]:
+        """Culls all spheres in place and returns the removed items by location, which are left empty."""
+        pool = None
+        if processes > 1 and len(self.locations) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            if threading.active_count() > 1:
+                logging.debug("Other threads are running, culling the playthrough without worker processes.")
+            elif multiprocessing.current_process().daemon:
+                logging.debug("Daemonic processes can't have children, culling the playthrough without worker "
+                              "processes.")
+            else:
+                _SphereCuller.current = self
+                pool = multiprocessing.get_context("fork").Pool(processes)
+        try:
+            start = len(self.locations)
+            for num, sphere in reversed(tuple(enumerate(self.spheres))):
+                start -= len(sphere)
+                indices = range(start, start + len(sphere))
+                known: Dict[int, bool] = {}
+                if pool and len(sphere) > 1:
+                    known = self.speculate_in(pool, num, indices)
+                for index in indices:
+                    location = self.locations[index]
+                    logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
+                                  location.item.player)
+                    beatable = known.get(index)
+                    if beatable is None:
+                        beatable = self.can_beat_without(num, index)
+                    if beatable:
+                        location.item = None
+                        self.removed.add(index)
+                # cull entries in spheres for spoiler walkthrough at end
+                sphere.difference_update(self.locations[index] for index in indices if index in self.removed)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+                _SphereCuller.current = None
+        return {self.locations[index]: self.items[index] for index in self.removed}
+
+    def speculate_in(self, pool: multiprocessing.pool.Pool, num: int, indices: range) -> Dict[int, bool]:
+        """Checks the candidates of sphere num in the workers, returning the results that are already certain."""
+        removed = tuple(self.removed)
+        results = pool.map(_speculate_culling, [(num, index, removed) for index in indices])
+        known = {index: False for index, beatable in zip(indices, results) if not beatable}
+        removable: List[int] = []
+        optimistic = []
+        for index in indices:
+            if index in known:
+                continue
+            if removable:
+                optimistic.append((num, index, removed + tuple(removable)))
+            else:
+                known[index] = True
+            removable.append(index)
+        for (_, index, _), beatable in zip(optimistic, pool.map(_speculate_culling, optimistic)):
+            if beatable:
+                known[index] = True
+        return known
+
+
+def _speculate_culling(args: Tuple[int, int, Tuple[int, ...]]) -> bool:
+    return _SphereCuller.current.speculate(*args)
+
+
 class Spoiler:
     multiworld: MultiWorld
     hashes: Dict[int, str]
@@ -1210,65 +1994,49 @@ class Spoiler:
             self.entrances[(entrance, direction, player)] = \
                 {"player": player, "entrance": entrance, "exit": exit_, "direction": direction}
 
-    def create_playthrough(self, create_paths: bool = True) -> None:
-        """Destructive to the multiworld while it is run, damage gets repaired afterwards."""
+    def create_playthrough(self, create_paths: bool = True, processes: int = 1) -> None:
+        """
+        Destructive to the multiworld while it is run, damage gets repaired afterwards.
+
+        :param create_paths: also find the paths to the required items
+        :param processes: amount of worker processes to cull the collection spheres with, where fork is available
+            and no other thread is running
+        """
         from itertools import chain
-        # get locations containing progress items
         multiworld = self.multiworld
-        prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
-        collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
-        sphere_candidates = set(prog_locations)
-        logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
+        # culling changes placements and restores them, which would outdate the sphere analysis
+        placements = multiworld.regions.placements
+        # build up spheres of collection radius, computed again as rules may have changed since the last analysis,
+        # which output generation then reuses.
+        # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
+        analysis = multiworld.get_sphere_analysis(recompute=True)
+        collection_spheres: List[Set[Location]] = [{location for location in sphere if location.item.advancement}
+                                                   for sphere in analysis.spheres]
+        logging.debug('Calculated %i spheres, containing %i progress items.', len(collection_spheres),
+                      sum(map(len, collection_spheres)))
+        unreachables = {location for location in analysis.unreachable if location.item.advancement}
+        if unreachables:
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           unreachables])
+            if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in unreachables]):
+                raise RuntimeError(f'Not all progression items reachable ({unreachables}). '
+                                   f'Something went terribly wrong here.')
+            else:
+                self.unreachables = unreachables
 
+        # the states of the analysis hold all items, the ones in front of each sphere only need the progress items,
+        # which are collected without sweeping
+        state = CollectionState(multiworld)
+        state_cache: List[Optional[CollectionState]] = [state.copy()]
+        for sphere in collection_spheres[:-1]:
             for location in sphere:
                 state.collect(location.item, True, location)
-
-            sphere_candidates -= sphere
-            collection_spheres.append(sphere)
             state_cache.append(state.copy())
 
-            logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
-                          len(sphere),
-                          len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if any([multiworld.worlds[location.item.player].options.accessibility != 'minimal' for location in sphere_candidates]):
-                    raise RuntimeError(f'Not all progression items reachable ({sphere_candidates}). '
-                                       f'Something went terribly wrong here.')
-                else:
-                    self.unreachables = sphere_candidates
-                    break
-
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
-        restore_later = {}
-        for num, sphere in reversed(tuple(enumerate(collection_spheres))):
-            to_delete = set()
-            for location in sphere:
-                # we remove the item at location and check if game is still beatable
-                logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
-                              location.item.player)
-                old_item = location.item
-                location.item = None
-                if multiworld.can_beat_game(state_cache[num]):
-                    to_delete.add(location)
-                    restore_later[location] = old_item
-                else:
-                    # still required, got to keep it around
-                    location.item = old_item
-
-            # cull entries in spheres for spoiler walkthrough at end
-            sphere -= to_delete
+        restore_later = _SphereCuller(multiworld, collection_spheres, state_cache).cull(processes)
 
         # second phase, sphere 0
         removed_precollected = []
@@ -1276,7 +2044,7 @@ class Spoiler:
             logging.debug('Checking if %s (Player %d) is required to beat the game.', item.name, item.player)
             multiworld.precollected_items[item.player].remove(item)
             multiworld.state.remove(item)
-            if not multiworld.can_beat_game():
+            if not multiworld.can_beat_game(CollectionState(multiworld)):
                 multiworld.push_precollected(item)
             else:
                 removed_precollected.append(item)
@@ -1324,6 +2092,7 @@ class Spoiler:
 
         for item in removed_precollected:
             multiworld.push_precollected(item)
+        multiworld.regions.placements = placements
 
     def create_paths(self, state: CollectionState, collection_spheres: List[Set[Location]]) -> None:
         from itertools import zip_longest
@@ -0,0 +1,176 @@
+"""
+Generates many seeds at once, spread over worker processes.
+Worlds get imported once before the workers are forked, so they share that memory instead of each importing it again.
+Reports the timing and failure of each seed in a json summary.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from typing import List, NamedTuple, Optional, TypedDict
+
+import ModuleUpdate
+
+ModuleUpdate.update()
+
+import Utils
+from BaseClasses import get_seed
+
+
+class BatchJob(NamedTuple):
+    player_files_path: str
+    seed: int
+    outputpath: str
+
+
+class BatchResult(TypedDict):
+    player_files_path: str
+    seed: int
+    seed_name: Optional[str]
+    success: bool
+    seconds: float
+    error: Optional[str]
+
+
+def batch_argparse(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    from settings import get_settings
+    settings = get_settings()
+    defaults = settings.generator
+
+    parser = argparse.ArgumentParser(description="Generate many seeds in parallel, defaults come from host.yaml.")
+    parser.add_argument("player_files_paths", nargs="*", default=[defaults.player_files_path],
+                        help="Folders of player files, each is generated as its own multiworld.")
+    parser.add_argument("--seeds", default=1, type=lambda value: max(int(value), 1),
+                        help="Number of seeds to generate for each folder of player files.")
+    parser.add_argument("--seed", type=int,
+                        help="Seed number of the first seed, the following ones count up from it. Random by default.")
+    parser.add_argument("--processes", default=os.cpu_count() or 1, type=lambda value: max(int(value), 1),
+                        help="Number of worker processes. 1 generates in this process, one seed after the other.")
+    parser.add_argument("--outputpath", default=settings.general_options.output_path,
+                        help="Path to output folder. Absolute or relative to cwd.")
+    parser.add_argument("--summary", default="batch_summary.json",
+                        help="Path of the json summary. Relative to the output folder.")
+    parser.add_argument("--spoiler", type=int, default=defaults.spoiler)
+    parser.add_argument("--log_level", default="info", help="Sets log level")
+    parser.add_argument("--skip_prog_balancing", action="store_true",
+                        help="Skip progression balancing step during generation.")
+    parser.add_argument("--skip_output", action="store_true",
+                        help="Skips generation assertion and output stages and skips multidata and spoiler output.")
+    return parser.parse_args(argv)
+
+
+def get_jobs(args: argparse.Namespace) -> List[BatchJob]:
+    jobs: List[BatchJob] = []
+    first_seed = args.seed
+    for player_files_path in args.player_files_paths:
+        # seeds of different folders can share a seed name, so they need their own output folder
+        outputpath = os.path.join(args.outputpath, os.path.basename(os.path.normpath(player_files_path))) \
+            if len(args.player_files_paths) > 1 else args.outputpath
+        for index in range(args.seeds):
+            seed = get_seed() if first_seed is None else first_seed + index
+            jobs.append(BatchJob(player_files_path, seed, outputpath))
+    return jobs
+
+
+def generate(job: BatchJob, args: argparse.Namespace) -> BatchResult:
+    """Generates one seed like Generate.py would, catching anything that goes wrong."""
+    import Generate
+    import Main
+
+    # seeds already generate in parallel, and pool workers can't start worker processes of their own
+    generate_argv = ["--player_files_path", job.player_files_path, "--seed", str(job.seed),
+                     "--outputpath", job.outputpath, "--spoiler", str(args.spoiler), "--log_level", args.log_level,
+                     "--playthrough_processes", "1"]
+    if args.skip_prog_balancing:
+        generate_argv.append("--skip_prog_balancing")
+    if args.skip_output:
+        generate_argv.append("--skip_output")
+
+    start = time.perf_counter()
+    seed_name: Optional[str] = None
+    error: Optional[str] = None
+    try:
+        erargs, seed = Generate.main(Generate.mystery_argparse(generate_argv))
+        seed_name = erargs.outputname
+        Main.main(erargs, seed)
+    except Exception:
+        logging.exception(f"Seed {job.seed} of {job.player_files_path} failed.")
+        error = traceback.format_exc()
+    return {
+        "player_files_path": job.player_files_path,
+        "seed": job.seed,
+        "seed_name": seed_name,
+        "success": error is None,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+    }
+
+
+def main(args: Optional[argparse.Namespace] = None) -> List[BatchResult]:
+    if not args:
+        args = batch_argparse()
+
+    Utils.init_logging("BatchGenerate", loglevel=args.log_level)
+    jobs = get_jobs(args)
+    processes = min(args.processes, len(jobs))
+    logging.info(f"Generating {len(jobs)} seeds with {processes} process{'es' if processes > 1 else ''}.")
+
+    # import everything a generation needs before forking, so the workers share it
+    import Generate
+    import Main
+    import worlds
+    if processes > 1:
+        # worlds are imported lazily, on first lookup of their game, which would be in each worker otherwise
+        worlds.load_all_worlds()
+
+    start = time.perf_counter()
+    results: List[BatchResult] = []
+    worker = functools.partial(generate, args=args)
+    if processes == 1:
+        for job in jobs:
+            results.append(worker(job))
+    else:
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            # without fork, each worker has to import the worlds itself
+            context = multiprocessing.get_context()
+        # a fresh process per seed, as a generation leaves behind state in its process
+        with context.Pool(processes, maxtasksperchild=1) as pool:
+            for result in pool.imap_unordered(worker, jobs):
+                logging.info(f"Seed {result['seed']} of {result['player_files_path']} "
+                             f"{'generated' if result['success'] else 'failed'} "
+                             f"after {result['seconds']:.2f} seconds.")
+                results.append(result)
+    seconds = time.perf_counter() - start
+
+    results.sort(key=lambda result: (result["player_files_path"], result["seed"]))
+    failed = sum(not result["success"] for result in results)
+    summary = {
+        "version": Utils.__version__,
+        "processes": processes,
+        "seconds": seconds,
+        "generated": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
+    summary_path = os.path.join(args.outputpath, args.summary)
+    os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    logging.info(f"Generated {len(results) - failed} of {len(results)} seeds in {seconds:.2f} seconds. "
+                 f"Summary written to {summary_path}.")
+    return results
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    batch_results = main()
+    sys.exit(1 if any(not result["success"] for result in batch_results) else 0)
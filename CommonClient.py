@@ -345,7 +345,8 @@ class CommonContext:
 
         self.jsontotextparser = JSONtoTextParser(self)
         self.rawjsontotextparser = RawJSONtoTextParser(self)
-        self.update_data_package(network_data_package)
+        # the data package of the other games gets picked up once connected to a multiworld using them
+        self.update_game(network_data_package["games"]["Archipelago"], "Archipelago")
 
         # execution
         self.keep_alive_task = asyncio.create_task(keep_alive(self), name="Bouncy")
@@ -540,6 +541,8 @@ class CommonContext:
 
         needed_updates: typing.Set[str] = set()
         for game in relevant_games:
+            if game in network_data_package["games"]:
+                self.update_game(network_data_package["games"][game], game)
             if game not in remote_date_package_versions and game not in remote_data_package_checksums:
                 continue
 
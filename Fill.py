@@ -1,13 +1,15 @@
 import collections
 import itertools
 import logging
+import time
 import typing
 from collections import Counter, deque
 
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
+from GenerationProfile import profiled
 from Options import Accessibility
 
-from worlds.AutoWorld import call_all
+from worlds.AutoWorld import World, call_all
 from worlds.generic.Rules import add_item_rule
 
 
@@ -28,10 +30,41 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+def _collect_pool(base_state: CollectionState, itempool: typing.Iterable[Item]) -> CollectionState:
+    new_state = base_state.copy()
+    for item in itempool:
+        new_state.collect(item, True)
+    return new_state
+
+
+def _removable(multiworld: MultiWorld, items: typing.Iterable[Item]) -> bool:
+    """Whether state.remove undoes state.collect for items, which is only known for worlds using World.collect."""
+    return all(type(multiworld.worlds[item.player]).collect is World.collect for item in items)
+
+
+def _fill_candidates(state: CollectionState, locations: typing.List[Location]) \
+        -> typing.Tuple[typing.List[Location], typing.Dict[int, typing.List[Location]]]:
+    """
+    Returns the locations that state can fill regardless of the item, which are the reachable ones and those that
+    always allow some items, in the order of locations and additionally by player.
+    Locations overriding can_fill may loosen the access check for some items, so they always stay candidates.
+    """
+    always_allow_nothing = Location.slot_defaults["always_allow"]
+    candidates = [location for location in locations
+                  if location.always_allow is not always_allow_nothing
+                  or type(location).can_fill is not Location.can_fill or location.can_reach(state)]
+    candidates_by_player: typing.Dict[int, typing.List[Location]] = {}
+    for location in candidates:
+        candidates_by_player.setdefault(location.player, []).append(location)
+    return candidates, candidates_by_player
+
+
+@profiled("fill_restrictive")
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
-                     allow_partial: bool = False, allow_excluded: bool = False, name: str = "Unknown") -> None:
+                     allow_partial: bool = False, allow_excluded: bool = False, name: str = "Unknown",
+                     incremental: bool = False) -> None:
     """
     :param multiworld: Multiworld to be filled.
     :param base_state: State assumed before fill.
@@ -44,6 +77,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     :param allow_partial: only place what is possible. Remaining items will be in the item_pool list.
     :param allow_excluded: if true and placement fails, it is re-attempted while ignoring excluded on Locations
     :param name: name of this fill step for progress logging purposes
+    :param incremental: if true, keeps a state of base_state and the remaining items, removing items as they get
+    placed instead of collecting the whole pool again for every sweep
     """
     unplaced_items: typing.List[Item] = []
     placements: typing.List[Location] = []
@@ -57,6 +92,11 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     total = min(len(item_pool), len(locations))
     placed = 0
 
+    pool_state: typing.Optional[CollectionState] = None
+    if incremental:
+        # base_state and everything that is neither placed nor being placed, without sweeping
+        pool_state = _collect_pool(base_state, item_pool)
+
     while any(reachable_items.values()) and locations:
         # grab one item per player
         items_to_place = [items.pop()
@@ -66,15 +106,30 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                 if pool_item is item:
                     item_pool.pop(p)
                     break
-        maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
-            if single_player_placement else None)
+        if pool_state is not None:
+            if not _removable(multiworld, items_to_place) or \
+                    not all([pool_state.remove(item) for item in items_to_place]):
+                # the world couldn't take an item back out, which only happens if collecting it changed nothing,
+                # or might not restore what collecting changed, like worlds adding effects of items in collect
+                pool_state = _collect_pool(base_state, item_pool + unplaced_items)
+            maximum_exploration_state = sweep_from_pool(pool_state, (), multiworld.get_filled_locations(item.player)
+                                                        if single_player_placement else None)
+        else:
+            maximum_exploration_state = sweep_from_pool(
+                base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
+                if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
+        # candidates for placing with an access check, only valid for this maximum_exploration_state
+        candidates: typing.Optional[typing.List[Location]] = None
+        candidates_by_player: typing.Dict[int, typing.List[Location]] = {}
 
         while items_to_place:
             # if we have run out of locations to fill,break out of this loop
             if not locations:
+                if pool_state is not None:
+                    for unplaced_item in items_to_place:
+                        pool_state.collect(unplaced_item, True)
                 unplaced_items += items_to_place
                 break
             item_to_place = items_to_place.pop(0)
@@ -89,15 +144,30 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             else:
                 perform_access_check = True
 
-            for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
-                    # popping by index is faster than removing by content,
-                    spot_to_fill = locations.pop(i)
-                    # skipping a scan for the element
-                    break
-
+            if perform_access_check:
+                if candidates is None:
+                    candidates, candidates_by_player = _fill_candidates(maximum_exploration_state, locations)
+                for location in (candidates_by_player.get(item_to_place.player, ()) if single_player_placement
+                                 else candidates):
+                    if location.can_fill(maximum_exploration_state, item_to_place):
+                        spot_to_fill = location
+                        locations.remove(location)
+                        candidates.remove(location)
+                        candidates_by_player[location.player].remove(location)
+                        break
             else:
+                for i, location in enumerate(locations):
+                    if (not single_player_placement or location.player == item_to_place.player) \
+                            and location.can_fill(maximum_exploration_state, item_to_place, False):
+                        # popping by index is faster than removing by content,
+                        spot_to_fill = locations.pop(i)
+                        # skipping a scan for the element
+                        break
+                if candidates is not None and spot_to_fill in candidates:
+                    candidates.remove(spot_to_fill)
+                    candidates_by_player[spot_to_fill.player].remove(spot_to_fill)
+
+            if spot_to_fill is None:
                 # we filled all reachable spots.
                 if swap:
                     # try swapping this item with previously placed items in a safe way then in an unsafe way
@@ -143,6 +213,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                                 reachable_items[placed_item.player].appendleft(
                                     placed_item)
                                 item_pool.append(placed_item)
+                                if pool_state is not None:
+                                    pool_state.collect(placed_item, True)
 
                                 # cleanup at the end to hopefully get better errors
                                 cleanup_required = True
@@ -156,9 +228,13 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                     if spot_to_fill is None:
                         # Can't place this item, move on to the next
                         unplaced_items.append(item_to_place)
+                        if pool_state is not None:
+                            pool_state.collect(item_to_place, True)
                         continue
                 else:
                     unplaced_items.append(item_to_place)
+                    if pool_state is not None:
+                        pool_state.collect(item_to_place, True)
                     continue
             multiworld.push_item(spot_to_fill, item_to_place, False)
             spot_to_fill.locked = lock
@@ -194,7 +270,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             for location in excluded_locations:
                 location.progress_type = location.progress_type.DEFAULT
             fill_restrictive(multiworld, base_state, excluded_locations, unplaced_items, single_player_placement, lock,
-                             swap, on_place, allow_partial, False)
+                             swap, on_place, allow_partial, False, incremental=incremental)
             for location in excluded_locations:
                 if not location.item:
                     location.progress_type = location.progress_type.EXCLUDED
@@ -217,6 +293,12 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     item_pool.extend(unplaced_items)
 
 
+def _item_rule_class(item: Item) -> typing.Hashable:
+    """Items of the same class are assumed to be accepted by the same item rules."""
+    return type(item), item.player, item.name, item.classification, item.code
+
+
+@profiled("remaining_fill")
 def remaining_fill(multiworld: MultiWorld,
                    locations: typing.List[Location],
                    itempool: typing.List[Item],
@@ -227,16 +309,27 @@ def remaining_fill(multiworld: MultiWorld,
     swapped_items: typing.Counter[typing.Tuple[int, str]] = Counter()
     total = min(len(itempool),  len(locations))
     placed = 0
-    while locations and itempool:
+    # bit i of free is set while locations[i] is still empty. Items are grouped into classes that item rules can't
+    # tell apart, and the locations known to reject a class are remembered as another bitset, so each location's
+    # item_rule is only evaluated once per class it rejects, instead of once per item.
+    fill_locations = tuple(locations)
+    free = (1 << len(fill_locations)) - 1
+    rejected: typing.Dict[typing.Hashable, int] = {}
+    while free and itempool:
         item_to_place = itempool.pop()
         spot_to_fill: typing.Optional[Location] = None
 
-        for i, location in enumerate(locations):
+        item_class = _item_rule_class(item_to_place)
+        candidates = free & ~rejected.get(item_class, 0)
+        while candidates:
+            candidate = candidates & -candidates  # first empty location not known to reject this item
+            location = fill_locations[candidate.bit_length() - 1]
             if location.item_rule(item_to_place):
-                # popping by index is faster than removing by content,
-                spot_to_fill = locations.pop(i)
-                # skipping a scan for the element
+                spot_to_fill = location
+                free ^= candidate
                 break
+            rejected[item_class] = rejected.get(item_class, 0) | candidate
+            candidates ^= candidate
 
         else:
             # we filled all reachable spots.
@@ -283,6 +376,7 @@ def remaining_fill(multiworld: MultiWorld,
     if total > 1000:
         _log_fill_progress(name, placed, total)
 
+    locations[:] = [location for i, location in enumerate(fill_locations) if free >> i & 1]
     if unplaced_items and locations:
         # There are leftover unplaceable items and locations that won't accept them
         if move_unplaceable_to_start_inventory:
@@ -343,6 +437,7 @@ def inaccessible_location_rules(multiworld: MultiWorld, state: CollectionState,
             add_item_rule(location, forbid_important_item_rule)
 
 
+@profiled("distribute_early_items")
 def distribute_early_items(multiworld: MultiWorld,
                            fill_locations: typing.List[Location],
                            itempool: typing.List[Item]) -> typing.Tuple[typing.List[Location], typing.List[Item]]:
@@ -429,6 +524,7 @@ def distribute_early_items(multiworld: MultiWorld,
     return fill_locations, itempool
 
 
+@profiled("distribute_items_restrictive")
 def distribute_items_restrictive(multiworld: MultiWorld,
                                  panic_method: typing.Literal["swap", "raise", "start_inventory"] = "swap") -> None:
     fill_locations = sorted(multiworld.get_unfilled_locations())
@@ -483,15 +579,18 @@ def distribute_items_restrictive(multiworld: MultiWorld,
         if panic_method == "swap":
             fill_restrictive(multiworld, multiworld.state, defaultlocations, progitempool,
                              swap=True,
-                             name="Progression", single_player_placement=multiworld.players == 1)
+                             name="Progression", single_player_placement=multiworld.players == 1,
+                             incremental=True)
         elif panic_method == "raise":
             fill_restrictive(multiworld, multiworld.state, defaultlocations, progitempool,
                              swap=False,
-                             name="Progression", single_player_placement=multiworld.players == 1)
+                             name="Progression", single_player_placement=multiworld.players == 1,
+                             incremental=True)
         elif panic_method == "start_inventory":
             fill_restrictive(multiworld, multiworld.state, defaultlocations, progitempool,
                              swap=False, allow_partial=True,
-                             name="Progression", single_player_placement=multiworld.players == 1)
+                             name="Progression", single_player_placement=multiworld.players == 1,
+                             incremental=True)
             if progitempool:
                 for item in progitempool:
                     logging.debug(f"Moved {item} to start_inventory to prevent fill failure.")
@@ -544,6 +643,7 @@ def distribute_items_restrictive(multiworld: MultiWorld,
         logging.info(f"Per-Player counts: {print_data})")
 
 
+@profiled("flood_items")
 def flood_items(multiworld: MultiWorld) -> None:
     # get items to distribute
     multiworld.random.shuffle(multiworld.itempool)
@@ -605,6 +705,7 @@ def flood_items(multiworld: MultiWorld) -> None:
                 break
 
 
+@profiled("balance_multiworld_progression")
 def balance_multiworld_progression(multiworld: MultiWorld) -> None:
     # A system to reduce situations where players have no checks remaining, popularly known as "BK mode."
     # Overall progression balancing algorithm:
@@ -622,6 +723,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
     else:
         logging.info(f'Balancing multiworld progression for {len(balanceable_players)} Players.')
         logging.debug(balanceable_players)
+        start = time.perf_counter()
         state: CollectionState = CollectionState(multiworld)
         checked_locations: typing.Set[Location] = set()
         unchecked_locations: typing.Set[Location] = set(multiworld.get_locations())
@@ -643,6 +745,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         }
         sphere_num: int = 1
         moved_item_count: int = 0
+        balancing_passes: int = 0
+        # spheres a balancing pass already computed ahead of state, with the state that found them,
+        # valid until items get moved
+        known_spheres: typing.Deque[typing.Tuple[typing.Set[Location], CollectionState]] = deque()
 
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
@@ -660,7 +766,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
-            sphere_locations = get_sphere_locations(state, unchecked_locations)
+            if known_spheres:
+                sphere_locations, state = known_spheres.popleft()
+            else:
+                sphere_locations = get_sphere_locations(state, unchecked_locations)
             for location in sphere_locations:
                 unchecked_locations.remove(location)
                 if not location.locked:
@@ -690,6 +799,9 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         and item_percentage(player, reachables) < threshold_percentages[player])
                 }
                 if balancing_players:
+                    balancing_passes += 1
+                    pass_start = time.perf_counter()
+                    known_spheres.clear()
                     balancing_state = state.copy()
                     balancing_unchecked_locations = unchecked_locations.copy()
                     balancing_reachables = reachable_locations_count.copy()
@@ -709,6 +821,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                     candidate_items[player].add(location)
                                     logging.debug(f"Candidate item: {location.name}, {location.item.name}")
                         balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                        known_spheres.append((balancing_sphere, balancing_state.copy()))
                         for location in balancing_sphere:
                             balancing_unchecked_locations.remove(location)
                             if not location.locked:
@@ -731,25 +844,37 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         items_to_test = list(candidate_items[player])
                         items_to_test.sort()
                         multiworld.random.shuffle(items_to_test)
+                        # state with the items that are still to test or to be replaced, collected only once
+                        kept_state: typing.Optional[CollectionState] = None
+                        if _removable(multiworld, (location.item for location in items_to_test)):
+                            kept_state = state.copy()
+                            for location in items_to_test:
+                                kept_state.collect(location.item, True, location)
                         while items_to_test:
                             testing = items_to_test.pop()
-                            reducing_state = state.copy()
-                            for location in itertools.chain((
-                                l for l in items_to_replace
-                                if l.item.player == player
-                            ), items_to_test):
-                                reducing_state.collect(location.item, True, location)
+                            if kept_state and kept_state.remove(testing.item):
+                                reducing_state = kept_state.copy()
+                            else:
+                                kept_state = None
+                                reducing_state = state.copy()
+                                for location in itertools.chain((
+                                    l for l in items_to_replace
+                                    if l.item.player == player
+                                ), items_to_test):
+                                    reducing_state.collect(location.item, True, location)
 
                             reducing_state.sweep_for_events(locations=locations_to_test)
 
                             if multiworld.has_beaten_game(balancing_state):
-                                if not multiworld.has_beaten_game(reducing_state):
-                                    items_to_replace.append(testing)
+                                replace = not multiworld.has_beaten_game(reducing_state)
                             else:
                                 reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
                                 p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
-                                if p < threshold_percentages[player]:
-                                    items_to_replace.append(testing)
+                                replace = p < threshold_percentages[player]
+                            if replace:
+                                items_to_replace.append(testing)
+                                if kept_state:
+                                    kept_state.collect(testing.item, True, testing)
 
                     old_moved_item_count = moved_item_count
 
@@ -777,6 +902,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                             logging.warning(f"Could not Progression Balance {old_location.item}")
 
                     if old_moved_item_count < moved_item_count:
+                        known_spheres.clear()
                         logging.debug(f"Moved {moved_item_count} items so far\n")
                         unlocked = {fresh for player in balancing_players for fresh in unlocked_locations[player]}
                         for location in get_sphere_locations(state, unlocked):
@@ -784,6 +910,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                             if not location.locked:
                                 reachable_locations_count[location.player] += 1
                             sphere_locations.add(location)
+                    logging.debug(f"Balancing pass {balancing_passes} took {time.perf_counter() - pass_start:.3f} "
+                                  f"seconds, moving {moved_item_count - old_moved_item_count} items")
 
             for location in sphere_locations:
                 if location.advancement:
@@ -795,6 +923,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             elif not sphere_locations:
                 logging.warning("Progression Balancing ran out of paths.")
                 break
+        logging.info(f"Progression balancing took {time.perf_counter() - start:.2f} seconds for {balancing_passes} "
+                     f"passes over {sphere_num - 1} spheres, moving {moved_item_count} items.")
 
 
 def swap_location_item(location_1: Location, location_2: Location, check_locked: bool = True) -> None:
@@ -809,6 +939,7 @@ def swap_location_item(location_1: Location, location_2: Location, check_locked:
     location_2.item.location = location_2
 
 
+@profiled("distribute_planned")
 def distribute_planned(multiworld: MultiWorld) -> None:
     def warn(warning: str, force: typing.Union[bool, str]) -> None:
         if force in [True, 'fail', 'failure', 'none', False, 'warn', 'warning']:
@@ -10,7 +10,7 @@ import sys
 import urllib.parse
 import urllib.request
 from collections import Counter
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from itertools import chain
 
 import ModuleUpdate
@@ -23,7 +23,7 @@ from BaseClasses import seeddigits, get_seed, PlandoOptions
 from Utils import parse_yamls, version_tuple, __version__, tuplize_version
 
 
-def mystery_argparse():
+def mystery_argparse(argv: Optional[List[str]] = None):
     from settings import get_settings
     settings = get_settings()
     defaults = settings.generator
@@ -38,6 +38,19 @@ def mystery_argparse():
     parser.add_argument('--seed', help='Define seed number to generate.', type=int)
     parser.add_argument('--multi', default=defaults.players, type=lambda value: max(int(value), 1))
     parser.add_argument('--spoiler', type=int, default=defaults.spoiler)
+    parser.add_argument('--playthrough_processes', default=defaults.playthrough_processes,
+                        type=lambda value: max(int(value), 1),
+                        help="Number of processes to cull the spoiler playthrough with.")
+    parser.add_argument('--generation_threads', default=defaults.generation_threads,
+                        type=lambda value: max(int(value), 1),
+                        help="Number of threads to run world generation steps in, for worlds supporting it.")
+    parser.add_argument('--multidata_compression', default=defaults.multidata_compression, choices=("zlib", "zstd"),
+                        help="Compression of the multidata. zstd requires the zstandard module.")
+    parser.add_argument('--multidata_compression_level', default=defaults.multidata_compression_level, type=int,
+                        help="Compression level of the multidata. Lower is faster.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record the time and memory taken per generation step, world and player "
+                             "and write it as json and csv next to the output.")
     parser.add_argument('--outputpath', default=settings.general_options.output_path,
                         help="Path to output folder. Absolute or relative to cwd.")  # absolute or relative to cwd
     parser.add_argument('--race', action='store_true', default=defaults.race)
@@ -52,7 +65,7 @@ def mystery_argparse():
     parser.add_argument("--skip_output", action="store_true",
                         help="Skips generation assertion and output stages and skips multidata and spoiler output. "
                              "Intended for debugging and testing purposes.")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if not os.path.isabs(args.weights_file_path):
         args.weights_file_path = os.path.join(args.player_files_path, args.weights_file_path)
     if not os.path.isabs(args.meta_file_path):
@@ -150,6 +163,11 @@ def main(args=None) -> Tuple[argparse.Namespace, int]:
     erargs.seed = seed
     erargs.plando_options = args.plando
     erargs.spoiler = args.spoiler
+    erargs.playthrough_processes = args.playthrough_processes
+    erargs.generation_threads = args.generation_threads
+    erargs.profile = args.profile
+    erargs.multidata_compression = args.multidata_compression
+    erargs.multidata_compression_level = args.multidata_compression_level
     erargs.race = args.race
     erargs.outputname = seed_name
     erargs.outputpath = args.outputpath
@@ -0,0 +1,98 @@
+"""
+Records how long each generation step takes per world and player, for Generate.py --profile.
+"""
+from __future__ import annotations
+
+import csv
+import functools
+import inspect
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Iterator, List, NamedTuple, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from BaseClasses import MultiWorld
+
+FunctionType = TypeVar("FunctionType", bound=Callable[..., Any])
+
+
+class ProfileRecord(NamedTuple):
+    stage: str
+    game: str
+    """Game of the world the stage ran for, empty for stages of the whole multiworld."""
+    player: Optional[int]
+    """Player the stage ran for, None for stages of a whole game or the whole multiworld."""
+    seconds: float
+    allocated_blocks: int
+    """Change in the amount of memory blocks allocated by Python, counting those of other threads running meanwhile."""
+    thread: str
+
+
+class GenerationProfile:
+    """
+    Collects a ProfileRecord per measured stage, in the order they finished.
+    Stages can contain others, like the fill steps of distribute_items_restrictive.
+    """
+    records: List[ProfileRecord]
+
+    def __init__(self) -> None:
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage: str, game: str = "", player: Optional[int] = None) -> Iterator[None]:
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = ProfileRecord(stage, game, player, time.perf_counter() - start,
+                                   sys.getallocatedblocks() - blocks, threading.current_thread().name)
+            with self._lock:
+                self.records.append(record)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump([record._asdict() for record in self.records], file, indent=1)
+
+    def write_csv(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(ProfileRecord._fields)
+            writer.writerows(self.records)
+
+    def write(self, base_path: str) -> None:
+        """Writes the records to base_path.json and base_path.csv."""
+        self.write_json(base_path + ".json")
+        self.write_csv(base_path + ".csv")
+
+
+def measure(multiworld: MultiWorld, stage: str, game: str = "", player: Optional[int] = None) -> ContextManager[None]:
+    """Measures the contained code as stage if the multiworld is being profiled."""
+    if multiworld.profile is None:
+        return nullcontext()
+    return multiworld.profile.measure(stage, game, player)
+
+
+def profiled(stage: str) -> Callable[[FunctionType], FunctionType]:
+    """
+    Measures calls of a function taking the multiworld as first argument as stage, if the multiworld is being profiled.
+    If the function takes a name, it is appended to the stage.
+    """
+    def decorator(function: FunctionType) -> FunctionType:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(multiworld: MultiWorld, *args: Any, **kwargs: Any) -> Any:
+            if multiworld.profile is None:
+                return function(multiworld, *args, **kwargs)
+            name = signature.bind(multiworld, *args, **kwargs).arguments.get("name")
+            with multiworld.profile.measure(f"{stage} {name}" if name else stage):
+                return function(multiworld, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -23,8 +23,12 @@ from typing import Callable, Sequence, Union, Optional
 
 import Utils
 import settings
+from worlds import load_all_worlds
 from worlds.LauncherComponents import Component, components, Type, SuffixIdentifier, icon_paths
 
+# worlds add their launcher components when they get imported
+load_all_worlds()
+
 if __name__ == "__main__":
     import ModuleUpdate
     ModuleUpdate.update()
@@ -2,24 +2,26 @@ import collections
 import concurrent.futures
 import logging
 import os
-import pickle
 import tempfile
 import time
 import zipfile
 import zlib
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar, Union
 
 import worlds
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region
 from Fill import balance_multiworld_progression, distribute_items_restrictive, distribute_planned, flood_items
+from GenerationProfile import GenerationProfile, measure
 from Options import StartInventoryPool
-from Utils import __version__, output_path, version_tuple, get_settings
+from Utils import __version__, output_path, pickle_compressed, version_tuple, get_settings
 from settings import get_settings
 from worlds import AutoWorld
 from worlds.generic.Rules import exclusion_rules, locality_rules
 
 __all__ = ["main"]
 
+T = TypeVar("T")
+
 
 def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = None):
     if not baked_server_options:
@@ -36,6 +38,9 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     logger = logging.getLogger()
     multiworld.set_seed(seed, args.race, str(args.outputname) if args.outputname else None)
     multiworld.plando_options = args.plando_options
+    multiworld.generation_threads = args.generation_threads
+    if args.profile:
+        multiworld.profile = GenerationProfile()
     multiworld.plando_items = args.plando_items.copy()
     multiworld.plando_texts = args.plando_texts.copy()
     multiworld.plando_connections = args.plando_connections.copy()
@@ -49,23 +54,26 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     multiworld.state = CollectionState(multiworld)
     logger.info('Archipelago Version %s  -  Seed: %s\n', __version__, multiworld.seed)
 
-    logger.info(f"Found {len(AutoWorld.AutoWorldRegister.world_types)} World Types:")
-    longest_name = max(len(text) for text in AutoWorld.AutoWorldRegister.world_types)
+    # only the worlds in use, the others do not get imported
+    world_types = {game: AutoWorld.AutoWorldRegister.world_types[game]
+                   for game in sorted({"Archipelago", *multiworld.game.values()})}
+    logger.info(f"Found {len(world_types)} World Types:")
+    longest_name = max(len(text) for text in world_types)
 
     max_item = 0
     max_location = 0
-    for cls in AutoWorld.AutoWorldRegister.world_types.values():
+    for cls in world_types.values():
         if cls.item_id_to_name:
             max_item = max(max_item, max(cls.item_id_to_name))
             max_location = max(max_location, max(cls.location_id_to_name))
 
     item_digits = len(str(max_item))
     location_digits = len(str(max_location))
-    item_count = len(str(max(len(cls.item_names) for cls in AutoWorld.AutoWorldRegister.world_types.values())))
-    location_count = len(str(max(len(cls.location_names) for cls in AutoWorld.AutoWorldRegister.world_types.values())))
+    item_count = len(str(max(len(cls.item_names) for cls in world_types.values())))
+    location_count = len(str(max(len(cls.location_names) for cls in world_types.values())))
     del max_item, max_location
 
-    for name, cls in AutoWorld.AutoWorldRegister.world_types.items():
+    for name, cls in world_types.items():
         if not cls.hidden and len(cls.item_names) > 0:
             logger.info(f" {name:{longest_name}}: {len(cls.item_names):{item_count}} "
                         f"Items (IDs: {min(cls.item_id_to_name):{item_digits}} - "
@@ -74,7 +82,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                         f"Locations (IDs: {min(cls.location_id_to_name):{location_digits}} - "
                         f"{max(cls.location_id_to_name):{location_digits}})")
 
-    del item_digits, location_digits, item_count, location_count
+    del item_digits, location_digits, item_count, location_count, world_types
 
     # This assertion method should not be necessary to run if we are not outputting any multidata.
     if not args.skip_output:
@@ -142,6 +150,16 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     
     AutoWorld.call_all(multiworld, "generate_basic")
 
+    detecting_players = [player for player in multiworld.player_ids
+                         if multiworld.worlds[player].detect_indirect_conditions]
+    if detecting_players:
+        with measure(multiworld, "find_indirect_conditions"):
+            missing_conditions = multiworld.find_indirect_conditions(detecting_players)
+        for region, entrances in missing_conditions.items():
+            for entrance in entrances:
+                logger.info(f"Registering {region} as indirect condition of {entrance}.")
+                multiworld.register_indirect_condition(region, entrance)
+
     # remove starting inventory from pool items.
     # Because some worlds don't actually create items during create_items this has to be as late as possible.
     if any(getattr(multiworld.worlds[player].options, "start_inventory_from_pool", None) for player in multiworld.player_ids):
@@ -285,24 +303,48 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     multiworld.random.passthrough = False
 
     if args.skip_output:
+        write_profile(multiworld)
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
         return multiworld
 
+    def create_playthrough() -> None:
+        logger.info('Calculating playthrough.')
+        with measure(multiworld, "create_playthrough"):
+            multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2,
+                                                  processes=args.playthrough_processes)
+
+    # worker processes only get forked while no other thread is running, so calculate it before the output threads
+    playthrough_first = args.spoiler > 1 and args.playthrough_processes > 1
+    if playthrough_first:
+        create_playthrough()
+
     logger.info(f'Beginning output...')
     outfilebase = 'AP_' + multiworld.seed_name
 
+    zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
+    logger.info(f"Creating final archive at {zipfilename}")
     output = tempfile.TemporaryDirectory()
-    with output as temp_dir:
+    with output as temp_dir, OutputArchive(zipfilename, multiworld) as archive:
+        def output_directory(name: str) -> str:
+            """Separate directory per output task, so its files can be archived as soon as it is done."""
+            directory = os.path.join(temp_dir, name)
+            os.mkdir(directory)
+            return directory
+
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
         with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
-            check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
+            check_accessibility_task = pool.submit(measured, multiworld, "fulfills_accessibility",
+                                                   multiworld.fulfills_accessibility)
 
-            output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
+            output_file_futures: Dict[concurrent.futures.Future, str] = {}
+            directory = output_directory("stage")
+            output_file_futures[pool.submit(AutoWorld.call_stage, multiworld, "generate_output", directory)] = directory
             for player in output_players:
                 # skip starting a thread for methods that say "pass".
-                output_file_futures.append(
-                    pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
+                directory = output_directory(str(player))
+                output_file_futures[pool.submit(AutoWorld.call_step, multiworld, "generate_output", player,
+                                                directory)] = directory
 
             # collect ER hint info
             er_hint_data: Dict[int, Dict[int, str]] = {}
@@ -402,13 +444,14 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 }
                 AutoWorld.call_all(multiworld, "modify_multidata", multidata)
 
-                multidata = zlib.compress(pickle.dumps(multidata), 9)
-
-                with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
-                    f.write(multidata)
+                compression = args.multidata_compression
+                with open(os.path.join(multidata_directory, f'{outfilebase}.archipelago'), 'wb') as f:
+                    f.write(bytes([4 if compression == "zstd" else 3]))  # version of format
+                    pickle_compressed(multidata, f, compression, args.multidata_compression_level)
 
-            output_file_futures.append(pool.submit(write_multidata))
+            multidata_directory = output_directory("multidata")
+            output_file_futures[pool.submit(measured, multiworld, "write_multidata", write_multidata)] = \
+                multidata_directory
             if not check_accessibility_task.result():
                 if not multiworld.can_beat_game():
                     raise Exception("Game appears as unbeatable. Aborting.")
@@ -420,20 +463,99 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 if i % 10 == 0 or i == len(output_file_futures):
                     logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
                 future.result()
+                archive.add_directory(output_file_futures[future])
 
-        if args.spoiler > 1:
-            logger.info('Calculating playthrough.')
-            multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
+        if args.spoiler > 1 and not playthrough_first:
+            create_playthrough()
 
         if args.spoiler:
-            multiworld.spoiler.to_file(os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase))
+            with measure(multiworld, "write_spoiler"):
+                spoiler_path = os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase)
+                multiworld.spoiler.to_file(spoiler_path)
+            archive.add(spoiler_path)
 
-        zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
-        logger.info(f"Creating final archive at {zipfilename}")
-        with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
-                             compresslevel=9) as zf:
-            for file in os.scandir(temp_dir):
-                zf.write(file.path, arcname=file.name)
+        with measure(multiworld, "write_archive"):
+            archive.wait()
 
+    write_profile(multiworld)
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
+
+
+def measured(multiworld: MultiWorld, stage: str, function: Callable[[], T]) -> T:
+    with measure(multiworld, stage):
+        return function()
+
+
+def write_profile(multiworld: MultiWorld) -> None:
+    """Writes the generation profile next to the output archive, if profiling."""
+    if multiworld.profile:
+        profile_path = output_path(f"AP_{multiworld.seed_name}_profile")
+        multiworld.profile.write(profile_path)
+        logging.info(f"Wrote generation profile to {profile_path}.json and .csv")
+
+
+def is_compressed(path: str, sample_size: int = 0x10000) -> bool:
+    """Whether the file hardly compresses, judged by its start, like patches that are archives themselves."""
+    with open(path, "rb") as file:
+        sample = file.read(sample_size)
+    return len(zlib.compress(sample, 1)) > len(sample) * 0.9
+
+
+class OutputArchive:
+    """
+    The final zip of the output files. Files get added by a thread of its own as soon as they are done,
+    while the remaining output is still being generated.
+    Files that hardly compress get stored instead of compressed again.
+    """
+    path: str
+    multiworld: MultiWorld
+    zip_file: zipfile.ZipFile
+    futures: List[concurrent.futures.Future]
+    names: Set[str]
+    """Names of the entries added so far, all at the root of the archive."""
+
+    def __init__(self, path: str, multiworld: MultiWorld) -> None:
+        self.path = path
+        self.multiworld = multiworld
+        self.zip_file = zipfile.ZipFile(path, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=9)
+        # a zip can only be written one entry at a time, zlib releases the GIL while compressing
+        self._writer = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="OutputArchive")
+        self.futures = []
+        self.names = set()
+
+    def add(self, path: str) -> None:
+        name = os.path.basename(path)
+        if name in self.names:
+            # output tasks write into directories of their own, so they can produce the same file name
+            logging.warning(f"Not adding {path} to the archive, it already contains a file named {name}.")
+            return
+        self.names.add(name)
+        self.futures.append(self._writer.submit(self._write, path, name))
+
+    def add_directory(self, directory: str) -> None:
+        """Adds the files of directory to the root of the archive."""
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            self.add(entry.path)
+
+    def wait(self) -> None:
+        """Waits for all added files to be written, raising what went wrong writing them."""
+        for future in self.futures:
+            future.result()
+
+    def _write(self, path: str, name: str) -> None:
+        with measure(self.multiworld, f"write_archive {name}"):
+            compress_type = zipfile.ZIP_STORED if os.path.isfile(path) and is_compressed(path) else None
+            self.zip_file.write(path, arcname=name, compress_type=compress_type)
+
+    def __enter__(self) -> "OutputArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type:
+            for future in self.futures:
+                future.cancel()
+        self._writer.shutdown()
+        self.zip_file.close()
+        if exc_type:
+            os.remove(self.path)
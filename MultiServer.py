@@ -13,6 +13,7 @@ import itertools
 import logging
 import math
 import operator
+import os
 import pickle
 import random
 import threading
@@ -181,12 +182,28 @@ class Context:
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
     logger: logging.Logger
+    outbox: typing.Deque[typing.Tuple[typing.List[dict], typing.List[Endpoint]]]
+    """ messages queued by queue_msgs, with the endpoints to send them to """
+    outbox_budget: int = 1000
+    """ amount of queued messages to encode per event loop iteration, the rest waits for the next iteration """
+    encoded_cache: typing.Dict[typing.Hashable, str]
+    """ encoded parts of messages sent to many clients, see get_encoded """
+    save_journal: bool
+    """ append the changes since the last save to save_filename.journal instead of writing the whole save """
+    journal_records: typing.List[typing.Tuple[typing.Any, ...]]
+    """ changes since the last save, see journal """
+    journal_compaction_records: int = 10000
+    """ amount of journaled changes after which the next save writes the whole save again """
+    journaled_save_keys: typing.ClassVar[typing.FrozenSet[str]] = frozenset(
+        ("received_items", "hints", "location_checks", "client_game_state", "stored_data"))
+    """ keys of get_save that are journaled per change, the others are journaled whole on every save """
 
 
     def __init__(self, host: str, port: int, server_password: str, password: str, location_check_points: int,
                  hint_cost: int, item_cheat: bool, release_mode: str = "disabled", collect_mode="disabled",
                  remaining_mode: str = "disabled", auto_shutdown: typing.SupportsFloat = 0, compatibility: int = 2,
-                 log_network: bool = False, logger: logging.Logger = logging.getLogger()):
+                 log_network: bool = False, logger: logging.Logger = logging.getLogger(),
+                 save_journal: bool = False):
         self.logger = logger
         super(Context, self).__init__()
         self.slot_info = {}
@@ -209,6 +226,7 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.new_items_receivers: typing.Set[team_slot] = set()  # slots that may have items their clients lack
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
@@ -234,6 +252,11 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        self.save_journal = save_journal
+        self.journal_records = []
+        self.journal_lock = threading.Lock()
+        self.journal_id: typing.Optional[str] = None
+        self.journal_length = 0
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
@@ -245,6 +268,9 @@ class Context:
         self.stored_data_notification_clients = collections.defaultdict(weakref.WeakSet)
         self.read_data = {}
         self.spheres = []
+        self.outbox = collections.deque()
+        self._outbox_flush: typing.Optional[asyncio.Handle] = None
+        self.encoded_cache = {}
 
         # init empty to satisfy linter, I suppose
         self.gamespackage = {}
@@ -271,8 +297,8 @@ class Context:
 
         for game_package in self.gamespackage.values():
             # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+            game_package.pop("item_name_groups", None)
+            game_package.pop("location_name_groups", None)
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
@@ -294,6 +320,22 @@ class Context:
             self.item_names[game].update(archipelago_item_names)
             self.location_names[game].update(archipelago_location_names)
 
+    def get_encoded(self, key: typing.Hashable, get_value: typing.Callable[[], typing.Any]) -> str:
+        """Returns get_value() encoded, only encoding it again after key was removed from encoded_cache."""
+        encoded = self.encoded_cache.get(key)
+        if encoded is None:
+            encoded = self.encoded_cache[key] = self.dumper(get_value())
+        return encoded
+
+    def get_encoded_game_package(self, game: str) -> str:
+        # kept per room, as many rooms run in one WebHost process
+        return self.get_encoded(("game_package", game), lambda: self.gamespackage[game])
+
+    def encode_with(self, msg: dict, encoded_values: typing.Dict[str, str]) -> str:
+        """Encodes msg with the already encoded values added to it."""
+        encoded = self.dumper(msg)
+        return encoded[:-1] + "".join(f",{self.dumper(key)}:{value}" for key, value in encoded_values.items()) + "}"
+
     def item_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["item_name_to_id"] if game in self.gamespackage else None
 
@@ -304,6 +346,8 @@ class Context:
     async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
+        if self.outbox:
+            self.flush_outbox(everything=True)
         msg = self.dumper(msgs)
         try:
             await endpoint.socket.send(msg)
@@ -319,6 +363,8 @@ class Context:
     async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
+        if self.outbox:
+            self.flush_outbox(everything=True)
         try:
             await endpoint.socket.send(msg)
         except websockets.ConnectionClosed:
@@ -331,6 +377,9 @@ class Context:
             return True
 
     async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
+        return self._broadcast_encoded_msgs(endpoints, msg)
+
+    def _broadcast_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
         sockets = []
         for endpoint in endpoints:
             if endpoint.socket and endpoint.socket.open:
@@ -346,6 +395,8 @@ class Context:
             return True
 
     def broadcast_all(self, msgs: typing.List[dict]):
+        if self.outbox:
+            self.flush_outbox(everything=True)
         msgs = self.dumper(msgs)
         endpoints = (endpoint for endpoint in self.endpoints if endpoint.auth)
         async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
@@ -355,14 +406,56 @@ class Context:
         self.broadcast_all([{**{"cmd": "PrintJSON", "data": [{ "text": text }]}, **additional_arguments}])
 
     def broadcast_team(self, team: int, msgs: typing.List[dict]):
+        if self.outbox:
+            self.flush_outbox(everything=True)
         msgs = self.dumper(msgs)
         endpoints = (endpoint for endpoint in itertools.chain.from_iterable(self.clients[team].values()))
         async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
 
     def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
+        if self.outbox:
+            self.flush_outbox(everything=True)
         msgs = self.dumper(msgs)
         async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
 
+    def queue_msgs(self, endpoints: typing.Iterable[Endpoint], msgs: typing.List[dict]):
+        """
+        Queue msgs for endpoints. Everything queued for an endpoint within an event loop iteration is sent to it as
+        one frame, and the msgs get encoded once for all endpoints.
+        Sending or broadcasting messages directly first sends everything queued, so they can't overtake these.
+        """
+        endpoints = list(endpoints)
+        if not endpoints or not msgs:
+            return
+        self.outbox.append((msgs, endpoints))
+        if not self._outbox_flush:
+            self._outbox_flush = asyncio.get_running_loop().call_soon(self.flush_outbox)
+
+    def queue_team(self, team: int, msgs: typing.List[dict]):
+        self.queue_msgs(itertools.chain.from_iterable(self.clients[team].values()), msgs)
+
+    def flush_outbox(self, everything: bool = False):
+        """Send queued messages, up to outbox_budget of them unless everything, queuing the rest for later."""
+        if self._outbox_flush:
+            self._outbox_flush.cancel()
+            self._outbox_flush = None
+        budget = self.outbox_budget
+        frames: typing.Dict[Endpoint, typing.List[str]] = {}
+        while self.outbox and (everything or budget > 0):
+            msgs, endpoints = self.outbox.popleft()
+            budget -= len(msgs)
+            encoded = self.dumper(msgs)[1:-1]  # strip the brackets, to join the messages into one list
+            for endpoint in endpoints:
+                frames.setdefault(endpoint, []).append(encoded)
+        # endpoints that got the same messages share their frame
+        shared_frames: typing.Dict[typing.Tuple[int, ...], typing.Tuple[typing.List[str], typing.List[Endpoint]]] = {}
+        for endpoint, parts in frames.items():
+            shared_frames.setdefault(tuple(map(id, parts)), (parts, []))[1].append(endpoint)
+        for parts, endpoints in shared_frames.values():
+            self._broadcast_encoded_msgs(endpoints, f"[{','.join(parts)}]")
+        if self.outbox:
+            self._outbox_flush = asyncio.get_running_loop().call_soon(self.flush_outbox)
+
     async def disconnect(self, endpoint: Client):
         if endpoint in self.endpoints:
             self.endpoints.remove(endpoint)
@@ -404,14 +497,17 @@ class Context:
     @staticmethod
     def decompress(data: bytes) -> dict:
         format_version = data[0]
-        if format_version > 3:
+        if format_version > 4:
             raise Utils.VersionException("Incompatible multidata.")
+        if format_version == 4:
+            return restricted_loads(Utils.decompress(data[1:], "zstd"))
         return restricted_loads(zlib.decompress(data[1:]))
 
     def _load(self, decoded_obj: dict, game_data_packages: typing.Dict[str, typing.Any],
               use_embedded_server_options: bool):
 
         self.read_data = {}
+        self.encoded_cache.clear()
         mdata_ver = decoded_obj["minimum_versions"]["server"]
         if mdata_ver > version_tuple:
             raise RuntimeError(f"Supplied Multidata (.archipelago) requires a server of at least version {mdata_ver},"
@@ -503,20 +599,123 @@ class Context:
 
     def _save(self, exit_save: bool = False) -> bool:
         try:
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            if self.save_journal:
+                self._save_journal(exit_save)
+            else:
+                encoded_save = pickle.dumps(self.get_save())
+                with open(self.save_filename, "wb") as f:
+                    f.write(zlib.compress(encoded_save))
         except Exception as e:
             self.logger.exception(e)
             return False
         else:
             return True
 
+    # journal
+
+    @property
+    def journal_filename(self) -> str:
+        return self.save_filename + ".journal"
+
+    def journal(self, *record: typing.Any) -> None:
+        """Records a change of the save data, to be appended to the journal on the next save. Call after the change."""
+        if self.saving and self.save_journal:
+            with self.journal_lock:
+                self.journal_records.append(record)
+
+    def _save_journal(self, compact: bool = False) -> None:
+        with self.journal_lock:
+            records, self.journal_records = self.journal_records, []
+        # the snapshot is written after taking the records, so it contains all of them and later ones replay onto it
+        if compact or self.journal_id is None \
+                or self.journal_length + len(records) > self.journal_compaction_records:
+            self._save_snapshot()
+        else:
+            records.append(("save", {key: value for key, value in self.get_save().items()
+                                     if key not in self.journaled_save_keys and key != "connect_names"}))
+            self._append_journal(records)
+            self.journal_length += len(records)
+
+    def _save_snapshot(self) -> None:
+        # a new id every time, so a journal left over from before the snapshot can't be replayed onto it
+        self.journal_id = os.urandom(8).hex()
+        save = self.get_save()
+        save["journal_id"] = self.journal_id
+        temp_filename = self.save_filename + ".tmp"
+        with open(temp_filename, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(save)))
+        os.replace(temp_filename, self.save_filename)
+        with open(self.journal_filename, "wb"):
+            pass
+        self._append_journal([("journal_id", self.journal_id)])
+        self.journal_length = 0
+
+    def _append_journal(self, records: typing.List[typing.Tuple[typing.Any, ...]]) -> None:
+        frame = zlib.compress(pickle.dumps(records))
+        with open(self.journal_filename, "ab") as f:
+            f.write(len(frame).to_bytes(4, "little") + frame)
+
+    def _read_journal(self) -> typing.List[typing.Tuple[typing.Any, ...]]:
+        """Reads the journal, stopping at a torn or damaged frame, as left behind by a crash while appending."""
+        records: typing.List[typing.Tuple[typing.Any, ...]] = []
+        with open(self.journal_filename, "rb") as f:
+            data = f.read()
+        position = 0
+        while position + 4 <= len(data):
+            end = position + 4 + int.from_bytes(data[position:position + 4], "little")
+            if end > len(data):
+                self.logger.warning("Save journal ends in an incomplete entry, ignoring it.")
+                break
+            try:
+                records.extend(restricted_loads(zlib.decompress(data[position + 4:end])))
+            except Exception as e:
+                self.logger.warning(f"Save journal contains a damaged entry, ignoring it and the rest: {e}")
+                break
+            position = end
+        return records
+
+    def _replay_journal(self, journal_id: typing.Optional[str]) -> None:
+        try:
+            records = self._read_journal()
+        except FileNotFoundError:
+            return
+        if not records or records[0] != ("journal_id", journal_id):
+            self.logger.warning("Save journal does not belong to the save file, ignoring it.")
+            return
+        self.journal_id = journal_id
+        self.journal_length = len(records)
+        save: typing.Optional[dict] = None
+        for kind, *data in records[1:]:
+            if kind == "location_checks":
+                team, slot, locations = data
+                self.location_checks[team, slot] |= locations
+            elif kind == "received_item":
+                key, index, item = data
+                received_items = self.received_items.setdefault(key, [])
+                if index >= len(received_items):  # lower indices were already in the save file
+                    received_items.append(item)
+            elif kind == "hint":
+                team, slot, hint = data
+                self.hints[team, slot].add(hint)
+            elif kind == "hints":
+                team, slot, hints = data
+                self.hints[team, slot] = set(hints)
+            elif kind == "stored_data":
+                key, value = data
+                self.stored_data[key] = value
+            elif kind == "client_game_state":
+                team, slot, status = data
+                self.client_game_state[team, slot] = status
+            elif kind == "save":
+                save = data[0]
+        if save:
+            self.set_save({**self.get_save(), **save})
+        self.logger.info(f"Replayed {len(records) - 1} changes from the save journal.")
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
             if not self.save_filename:
-                import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
@@ -524,6 +723,8 @@ class Context:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
                     self.set_save(save_data)
+                if self.save_journal:
+                    self._replay_journal(save_data.get("journal_id", None))
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -596,6 +797,7 @@ class Context:
         self.hints.update(savedata["hints"])
 
         self.name_aliases.update(savedata["name_aliases"])
+        self.encoded_cache.clear()
         self.client_game_state.update(savedata["client_game_state"])
         self.client_connection_timers.update(
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
@@ -637,10 +839,16 @@ class Context:
     def recheck_hints(self, team: typing.Optional[int] = None, slot: typing.Optional[int] = None):
         for hint_team, hint_slot in self.hints:
             if (team is None or team == hint_team) and (slot is None or slot == hint_slot):
-                self.hints[hint_team, hint_slot] = {
+                self.replace_hints(hint_team, hint_slot, {
                     hint.re_check(self, hint_team) for hint in
                     self.hints[hint_team, hint_slot]
-                }
+                })
+
+    def replace_hints(self, team: int, slot: int, hints: typing.Set[NetUtils.Hint]) -> None:
+        """Replaces the hints of a slot, journaling them if any changed, such as a hint that got found."""
+        if hints != self.hints[team, slot]:
+            self.hints[team, slot] = hints
+            self.journal("hints", team, slot, frozenset(hints))
 
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
@@ -710,9 +918,11 @@ class Context:
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
                     self.hints[team, hint.finding_player].add(hint)
+                    self.journal("hint", team, hint.finding_player, hint)
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
                         self.hints[team, player].add(hint)
+                        self.journal("hint", team, player, hint)
                         new_hint_events.add(player)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
@@ -760,8 +970,9 @@ class Context:
 
 
 def update_aliases(ctx: Context, team: int):
-    cmd = ctx.dumper([{"cmd": "RoomUpdate",
-                       "players": ctx.get_players_package()}])
+    ctx.encoded_cache.pop("players", None)
+    players = ctx.get_encoded("players", ctx.get_players_package)
+    cmd = f"[{ctx.encode_with({'cmd': 'RoomUpdate'}, {'players': players})}]"
 
     for clients in ctx.clients[team].values():
         for client in clients:
@@ -940,25 +1151,26 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+    """Send ReceivedItems to the clients of the slots that received items, as noted in ctx.new_items_receivers."""
+    receivers, ctx.new_items_receivers = ctx.new_items_receivers, set()
+    for team, slot in receivers:
+        for client in ctx.clients.get(team, {}).get(slot, ()):
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                first_new_item = max(0, client.send_index - len(start_inventory))
+                ctx.queue_msgs([client], [{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": start_inventory[client.send_index:] + items[first_new_item:]}])
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
-    ctx.broadcast(ctx.clients[team][slot],
-                  [{"cmd": "RoomUpdate", "checked_locations": get_checked_checks(ctx, team, slot)}])
+    ctx.queue_msgs(ctx.clients[team][slot],
+                   [{"cmd": "RoomUpdate", "checked_locations": get_checked_checks(ctx, team, slot)}])
 
 
 def release_player(ctx: Context, team: int, slot: int):
@@ -997,10 +1209,17 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[int]:
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
     for target in ctx.slot_set(target_slot):
+        ctx.new_items_receivers.add((team, target))
         for item in items:
             if item.player != target_slot:
-                get_received_items(ctx, team, target, False).append(item)
-            get_received_items(ctx, team, target, True).append(item)
+                append_received_item(ctx, team, target, False, item)
+            append_received_item(ctx, team, target, True, item)
+
+
+def append_received_item(ctx: Context, team: int, player: int, remote_items: bool, item: NetworkItem):
+    received_items = get_received_items(ctx, team, player, remote_items)
+    received_items.append(item)
+    ctx.journal("received_item", (team, player, remote_items), len(received_items) - 1, item)
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1010,6 +1229,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
     if new_locations:
         if count_activity:
             ctx.client_activity_timers[team, slot] = datetime.datetime.now(datetime.timezone.utc)
+        info_texts = []
         for location in new_locations:
             item_id, target_player, flags = ctx.locations[slot][location]
             new_item = NetworkItem(item_id, location, slot, flags)
@@ -1018,12 +1238,15 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             ctx.logger.info('(Team #%d) %s sent %s to %s (%s)' % (
                 team + 1, ctx.player_names[(team, slot)], ctx.item_names[ctx.slot_info[target_player].game][item_id],
                 ctx.player_names[(team, target_player)], ctx.location_names[ctx.slot_info[slot].game][location]))
-            info_text = json_format_send_event(new_item, target_player)
-            ctx.broadcast_team(team, [info_text])
+            info_texts.append(json_format_send_event(new_item, target_player))
+        ctx.queue_team(team, info_texts)
 
         ctx.location_checks[team, slot] |= new_locations
+        ctx.journal("location_checks", team, slot, new_locations)
+        ctx.encoded_cache.pop(("missing_locations", team, slot), None)
+        ctx.encoded_cache.pop(("checked_locations", team, slot), None)
         send_new_items(ctx)
-        ctx.broadcast(ctx.clients[team][slot], [{
+        ctx.queue_msgs(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
             "hint_points": get_slot_points(ctx, team, slot),
             "checked_locations": new_locations,  # send back new checks only
@@ -1456,8 +1679,9 @@ class ClientMessageProcessor(CommonCommandProcessor):
             )
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
-                get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
-                get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                append_received_item(self.ctx, self.client.team, self.client.slot, False, new_item)
+                append_received_item(self.ctx, self.client.team, self.client.slot, True, new_item)
+                self.ctx.new_items_receivers.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1478,7 +1702,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         if not input_text:
             hints = {hint.re_check(self.ctx, self.client.team) for hint in
                      self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            self.ctx.replace_hints(self.client.team, self.client.slot, hints)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1616,6 +1840,12 @@ class ClientMessageProcessor(CommonCommandProcessor):
         return self.get_hints(location, True)
 
 
+def encode_data_package(ctx: Context, games: typing.Iterable[str]) -> str:
+    """Encodes a DataPackage message of games, from the cached encoding of each game's data package."""
+    encoded_games = ",".join(f"{ctx.dumper(game)}:{ctx.get_encoded_game_package(game)}" for game in games)
+    return f'[{{"cmd":"DataPackage","data":{{"games":{{{encoded_games}}}}}}}]'
+
+
 def get_checked_checks(ctx: Context, team: int, slot: int) -> typing.List[int]:
     return ctx.locations.get_checked(ctx.location_checks, team, slot)
 
@@ -1700,13 +1930,18 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             connected_packet = {
                 "cmd": "Connected",
                 "team": client.team, "slot": client.slot,
-                "players": ctx.get_players_package(),
-                "missing_locations": get_missing_checks(ctx, team, slot),
-                "checked_locations": get_checked_checks(ctx, team, slot),
-                "slot_info": ctx.slot_info,
                 "hint_points": get_slot_points(ctx, team, slot),
             }
-            reply = [connected_packet]
+            # the bulk of the packet only changes with aliases and checks, so it is kept encoded between connects
+            encoded_values = {
+                "players": ctx.get_encoded("players", ctx.get_players_package),
+                "missing_locations": ctx.get_encoded(("missing_locations", team, slot),
+                                                     lambda: get_missing_checks(ctx, team, slot)),
+                "checked_locations": ctx.get_encoded(("checked_locations", team, slot),
+                                                     lambda: get_checked_checks(ctx, team, slot)),
+                "slot_info": ctx.get_encoded("slot_info", lambda: ctx.slot_info),
+            }
+            reply = []
             start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
@@ -1716,29 +1951,27 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 client.auth = True
                 await on_client_joined(ctx, client)
             if args.get("slot_data", True):
-                connected_packet["slot_data"] = ctx.slot_data[client.slot]
-            await ctx.send_msgs(client, reply)
+                encoded_values["slot_data"] = ctx.get_encoded(("slot_data", client.slot),
+                                                              lambda: ctx.slot_data[client.slot])
+            frame = [ctx.encode_with(connected_packet, encoded_values)]
+            if reply:
+                frame.append(ctx.dumper(reply)[1:-1])
+            await ctx.send_encoded_msgs(client, f"[{','.join(frame)}]")
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested_games = set(args["games"])
+            games = [name for name in ctx.gamespackage if name in requested_games]
+            await ctx.send_encoded_msgs(client, encode_data_package(ctx, games))
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
+            games = [name for name in ctx.gamespackage if name not in exclusions]
+            await ctx.send_encoded_msgs(client, encode_data_package(ctx, games))
 
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            await ctx.send_encoded_msgs(client, encode_data_package(ctx, ctx.gamespackage))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1861,6 +2094,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            ctx.journal("stored_data", args["key"], value)
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", True):
                 targets.add(client)
@@ -1889,6 +2123,7 @@ def update_client_status(ctx: Context, client: Client, new_status: ClientStatus)
                 ctx.broadcast_text_all(f"Team #{client.team + 1} has completed all of their games! Congratulations!")
 
         ctx.client_game_state[client.team, client.slot] = new_status
+        ctx.journal("client_game_state", client.team, client.slot, new_status)
         ctx.on_client_status_change(client.team, client.slot)
         ctx.save()
 
@@ -2239,6 +2474,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--password', default=defaults["password"])
     parser.add_argument('--savefile', default=defaults["savefile"])
     parser.add_argument('--disable_save', default=defaults["disable_save"], action='store_true')
+    parser.add_argument('--save_journal', default=defaults["save_journal"], action='store_true',
+                        help="Append changes to a journal next to the save file, "
+                             "instead of writing the whole save file every time.")
     parser.add_argument('--cert', help="Path to a SSL Certificate for encryption.")
     parser.add_argument('--cert_key', help="Path to SSL Certificate Key file")
     parser.add_argument('--loglevel', default=defaults["loglevel"],
@@ -2328,7 +2566,7 @@ async def main(args: argparse.Namespace):
     ctx = Context(args.host, args.port, args.server_password, args.password, args.location_check_points,
                   args.hint_cost, not args.disable_item_cheat, args.release_mode, args.collect_mode,
                   args.remaining_mode,
-                  args.auto_shutdown, args.compatibility, args.log_network)
+                  args.auto_shutdown, args.compatibility, args.log_network, save_journal=args.save_journal)
     data_filename = args.multidata
 
     if not data_filename:
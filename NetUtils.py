@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import typing
 import enum
+import math
 import warnings
 from json import JSONEncoder, JSONDecoder
 
@@ -9,6 +10,11 @@ import websockets
 
 from Utils import ByValue, Version
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class JSONMessagePart(typing.TypedDict, total=False):
     text: str
@@ -101,7 +107,42 @@ _encode = JSONEncoder(
 ).encode
 
 
+def _orjson_default(obj: typing.Any) -> typing.Any:
+    """Turns what orjson can't encode natively into what _scan_for_TypedTuples would, letting orjson recurse."""
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        data = obj._asdict()
+        data["class"] = obj.__class__.__name__
+        return data
+    if isinstance(obj, (set, frozenset)):
+        return tuple(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def _has_non_finite_float(obj: typing.Any) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite_float(key) or _has_non_finite_float(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return any(_has_non_finite_float(value) for value in obj)
+    return False
+
+
 def encode(obj: typing.Any) -> str:
+    """
+    Encodes obj to JSON, with orjson if available. The result decodes to the same objects as that of the json module,
+    but isn't necessarily the same text, as orjson formats some floats differently, such as 1e-7 instead of 1e-07.
+    So don't compare or key anything on the encoded text across installs.
+    """
+    if orjson:
+        try:
+            encoded = orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # such as integers beyond 64 bit, which the json module can encode
+        else:
+            # orjson writes NaN and Infinity as null, the json module keeps them, so only nulls need a closer look
+            if b"null" not in encoded or not _has_non_finite_float(obj):
+                return encoded.decode("utf-8")
     return _encode(_scan_for_TypedTuples(obj))
 
 
@@ -136,7 +177,17 @@ def _object_hook(o: typing.Any) -> typing.Any:
     return o
 
 
-decode = JSONDecoder(object_hook=_object_hook).decode
+_decode = JSONDecoder(object_hook=_object_hook).decode
+
+
+def decode(data: str) -> typing.Any:
+    # only messages naming a class have dicts for _object_hook, which is quickest to run from the json module
+    if orjson and '"class"' not in data:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # such as NaN or integers beyond 64 bit, which the json module can decode
+    return _decode(data)
 
 
 class Endpoint:
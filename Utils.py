@@ -445,6 +445,48 @@ def restricted_loads(s: bytes) -> Any:
     return RestrictedUnpickler(io.BytesIO(s)).load()
 
 
+class _CompressingWriter:
+    """Compresses everything written to it into file, so pickle.Pickler can stream into a compressed file."""
+    __slots__ = ("file", "compressor")
+
+    def __init__(self, file: BinaryIO, compressor: Any) -> None:
+        self.file = file
+        self.compressor = compressor
+
+    def write(self, data: bytes) -> int:
+        self.file.write(self.compressor.compress(data))
+        return len(data)
+
+
+def pickle_compressed(obj: Any, file: BinaryIO, compression: str = "zlib", level: int = 9) -> None:
+    """
+    Helper function analogous to file.write(zlib.compress(pickle.dumps(obj), level)), also supporting "zstd".
+    Pickles and compresses frame by frame, so neither the whole pickle nor its compressed form are held in memory.
+    """
+    if compression == "zlib":
+        import zlib
+        compressor = zlib.compressobj(level)
+    elif compression == "zstd":
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    else:
+        raise ValueError(f"Unknown compression {compression}.")
+    pickle.Pickler(_CompressingWriter(file, compressor)).dump(obj)
+    file.write(compressor.flush())
+
+
+def decompress(data: bytes, compression: str = "zlib") -> bytes:
+    """Decompresses the data written by pickle_compressed with compression."""
+    if compression == "zlib":
+        import zlib
+        return zlib.decompress(data)
+    if compression == "zstd":
+        import zstandard
+        # streamed frames don't state their size, which ZstdDecompressor.decompress requires
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unknown compression {compression}.")
+
+
 class ByValue:
     """
     Mixin for enums to pickle value instead of name (restores pre-3.11 behavior). Use as left-most parent.
@@ -134,6 +134,11 @@ def gen_game(gen_options: dict, meta: Optional[Dict[str, Any]] = None, owner=Non
                                                                        {"bosses", "items", "connections", "texts"}))
         erargs.skip_prog_balancing = False
         erargs.skip_output = False
+        erargs.playthrough_processes = 1
+        erargs.generation_threads = 1
+        erargs.profile = False
+        erargs.multidata_compression = "zlib"
+        erargs.multidata_compression_level = 9
 
         name_counter = Counter()
         for player, (playerfile, settings) in enumerate(gen_options.items(), 1):
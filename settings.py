@@ -22,24 +22,20 @@ __all__ = [
 
 no_gui = False
 skip_autosave = False
-_world_settings_name_cache: Dict[str, str] = {}  # TODO: cache on disk and update when worlds change
+_world_settings_name_cache: Dict[str, str] = {}  # settings_key -> game
 _world_settings_name_cache_updated = False
 _lock = Lock()
 
 
 def _update_cache() -> None:
-    """Load all worlds and update world_settings_name_cache"""
+    """Update world_settings_name_cache from the worlds' manifest, without importing the worlds"""
     global _world_settings_name_cache_updated
     if _world_settings_name_cache_updated:
         return
 
     try:
-        from worlds.AutoWorld import AutoWorldRegister
-        for world in AutoWorldRegister.world_types.values():
-            annotation = world.__annotations__.get("settings", None)
-            if annotation is None or annotation == "ClassVar[Optional['Group']]":
-                continue
-            _world_settings_name_cache[world.settings_key] = f"{world.__module__}.{world.__name__}"
+        from worlds import world_settings_games
+        _world_settings_name_cache.update(world_settings_games)
     finally:
         _world_settings_name_cache_updated = True
 
@@ -520,6 +516,12 @@ class ServerOptions(Group):
         Allows for clients to log on and manage the server.  If this is null, no remote administration is possible.
         """
 
+    class SaveJournal(Bool):
+        """
+        Append the changes since the last save to a journal next to the save file,
+        instead of writing the whole save file every time. The journal is merged into the save file regularly and on exit.
+        """
+
     class DisableItemCheat(Bool):
         """Disallow !getitem"""
 
@@ -592,6 +594,7 @@ class ServerOptions(Group):
     multidata: Optional[str] = None
     savefile: Optional[str] = None
     disable_save: bool = False
+    save_journal: Union[SaveJournal, bool] = False
     loglevel: str = "info"
     server_password: Optional[ServerPassword] = None
     disable_item_cheat: Union[DisableItemCheat, bool] = False
@@ -654,6 +657,30 @@ class GeneratorOptions(Group):
         OFF = 0
         ON = 1
 
+    class PlaythroughProcesses(int):
+        """
+        Amount of processes to cull the playthrough of the spoiler with, where supported by the OS.
+        1 culls it in the generating process.
+        """
+
+    class GenerationThreads(int):
+        """
+        Amount of threads to run the generation steps of worlds that support it in, alongside other worlds.
+        Threads only compute in parallel on free-threaded builds of Python.
+        """
+
+    class MultidataCompression(str):
+        """
+        How to compress the multidata (.archipelago) of generated seeds.
+        zlib -> Readable by all servers. (Default)
+        zstd -> Much faster at similar size, requires the zstandard module and a server of this version or newer.
+        """
+
+    class MultidataCompressionLevel(int):
+        """
+        Compression level of the multidata, from 1 (fastest) to 9 for zlib or 22 for zstd.
+        """
+
     class PanicMethod(str):
         """
         What to do if the current item placements appear unsolvable.
@@ -671,6 +698,10 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    playthrough_processes: PlaythroughProcesses = PlaythroughProcesses(1)
+    generation_threads: GenerationThreads = GenerationThreads(1)
+    multidata_compression: MultidataCompression = MultidataCompression("zlib")
+    multidata_compression_level: MultidataCompressionLevel = MultidataCompressionLevel(9)
 
 
 class SNIOptions(Group):
@@ -737,9 +768,14 @@ class Settings(Group):
             if key not in _world_settings_name_cache:
                 # not a world group
                 return super().__getattribute__(key)
-            # directly import world and grab settings class
-            world_mod, world_cls_name = _world_settings_name_cache[key].rsplit(".", 1)
-            world = cast(type, getattr(__import__(world_mod, fromlist=[world_cls_name]), world_cls_name))
+            # import world and grab settings class
+            from worlds.AutoWorld import AutoWorldRegister
+            try:
+                world = cast(type, AutoWorldRegister.world_types[_world_settings_name_cache[key]])
+            except KeyError:
+                # listed in the manifest, but failed to import; keep what was read from the file, if anything
+                return super().__getattribute__(key)
+            world_mod, world_cls_name = world.__module__, world.__name__
             assert getattr(world, "settings_key") == key
             try:
                 cls_or_name = world.__annotations__["settings"]
@@ -817,7 +853,7 @@ class Settings(Group):
         # load all world setting classes
         _update_cache()
         for key in _world_settings_name_cache:
-            self.__getattribute__(key)  # load all worlds
+            getattr(self, key, None)  # load all worlds
         super().dump(f, level)
 
     @property
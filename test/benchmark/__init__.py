@@ -5,3 +5,9 @@ if __name__ == "__main__":
     load_worlds.run_load_worlds_benchmark()
     import locations
     locations.run_locations_benchmark()
+    import fill
+    fill.run_fill_benchmark()
+    import net_codec
+    net_codec.run_net_codec_benchmark()
+    import memory
+    memory.run_memory_benchmark()
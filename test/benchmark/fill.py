@@ -0,0 +1,83 @@
+def run_fill_benchmark():
+    """Compare fill_restrictive rebuilding its maximum exploration state for every item
+    against keeping it incrementally, on generated multiworlds of increasing size."""
+    import argparse
+    import logging
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, Item, ItemClassification, Location, MultiWorld, Region
+    from Fill import fill_restrictive
+    from worlds import AutoWorld
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class BenchmarkRunner:
+        player_counts: typing.Tuple[int, ...] = (1, 10, 20)
+        regions_per_player: int = 20
+        locations_per_region: int = 10
+        keys_per_region: int = 2
+
+        def create_multiworld(self, players: int) -> typing.Tuple[MultiWorld, typing.List[Location], typing.List[Item]]:
+            multiworld = MultiWorld(players)
+            multiworld.game = {player: "Archipelago" for player in multiworld.player_ids}
+            multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+            multiworld.set_seed(0)
+            multiworld.state = CollectionState(multiworld)
+            args = argparse.Namespace()
+            options = AutoWorld.AutoWorldRegister.world_types["Archipelago"].options_dataclass
+            for name, option in options.type_hints.items():
+                setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+            multiworld.set_options(args)
+            locations: typing.List[Location] = []
+            items: typing.List[Item] = []
+            for player in multiworld.player_ids:
+                regions = [Region("Menu", player, multiworld)]
+                multiworld.regions.append(regions[0])
+                for region_index in range(1, self.regions_per_player):
+                    # a binary tree of regions, each locked by its own keys
+                    keys = [f"Key {region_index}-{key_index}" for key_index in range(self.keys_per_region)]
+                    items += [Item(key, ItemClassification.progression, None, player) for key in keys]
+                    regions.append(self.create_region(multiworld, regions[(region_index - 1) // 2], player,
+                                                      region_index, keys))
+                for region_index, region in enumerate(regions):
+                    for location_index in range(self.locations_per_region):
+                        location = Location(player, f"Location {region_index}-{location_index}", None, region)
+                        region.locations.append(location)
+                        locations.append(location)
+                multiworld.completion_condition[player] = lambda state, player_=player, regions_=regions: \
+                    all(region.can_reach(state) for region in regions_)
+            multiworld.random.shuffle(locations)
+            multiworld.random.shuffle(items)
+            return multiworld, locations, items
+
+        @staticmethod
+        def create_region(multiworld: MultiWorld, parent: Region, player: int, index: int,
+                          keys: typing.List[str]) -> Region:
+            region = Region(f"Region {index}", player, multiworld)
+            multiworld.regions.append(region)
+            parent.connect(region, rule=lambda state: state.has_all(keys, player))
+            return region
+
+        def main(self):
+            for players in self.player_counts:
+                times: typing.Dict[bool, float] = {}
+                for incremental in (False, True):
+                    multiworld, locations, items = self.create_multiworld(players)
+                    with TimeIt(f"{players} player fill_restrictive with incremental={incremental}", logger) as t:
+                        fill_restrictive(multiworld, multiworld.state, locations, items, incremental=incremental,
+                                         name="Benchmark")
+                    times[incremental] = t.dif
+                logger.info(f"{players} players: incremental fill is {times[False] / times[True]:.2f} times as fast.")
+
+    runner = BenchmarkRunner()
+    runner.main()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_fill_benchmark()
@@ -7,11 +7,13 @@ def run_locations_benchmark():
     import sys
 
     from time_it import TimeIt
+    from time import perf_counter
 
     from Utils import init_logging
     from BaseClasses import MultiWorld, CollectionState, Location
     from worlds import AutoWorld
     from worlds.AutoWorld import call_all
+    from worlds.generic.RuleBuilder import Rule
 
     init_logging("Benchmark Runner")
     logger = logging.getLogger("Benchmark")
@@ -40,6 +42,30 @@ def run_locations_benchmark():
                 gc.collect()
             return t.dif
 
+        def rule_test(self, rule: typing.Callable[[CollectionState], bool], state: CollectionState) -> float:
+            start = perf_counter()
+            for _ in range(self.rule_iterations):
+                rule(state)
+            return perf_counter() - start
+
+        def compiled_rules_test(self, game: str, locations: typing.List[Location],
+                                states: typing.Sequence[CollectionState]) -> None:
+            """Compare rules compiled by the RuleBuilder against the same rules written as lambdas."""
+            compiled_locations = [location for location in locations
+                                  if isinstance(getattr(location.access_rule, "rule", None), Rule)]
+            if not compiled_locations:
+                return
+            compiled_time = 0.0
+            reference_time = 0.0
+            for location in compiled_locations:
+                reference_rule = location.access_rule.rule.build_reference()
+                for state in states:
+                    compiled_time += self.rule_test(location.access_rule, state)
+                    reference_time += self.rule_test(reference_rule, state)
+            logger.info(f"{game} compiled rules of {len(compiled_locations)} locations are "
+                        f"{reference_time / compiled_time:.2f} times as fast as lambdas. "
+                        f"({compiled_time:.4f} against {reference_time:.4f} seconds)")
+
         def main(self):
             for game in sorted(AutoWorld.AutoWorldRegister.world_types):
                 summary_data: typing.Dict[str, collections.Counter[str]] = {
@@ -87,6 +113,7 @@ def run_locations_benchmark():
                                 f"{self.format_times_from_counter(summary_data['empty_state'])}")
                     logger.info(f"Top times in all_state:\n"
                                 f"{self.format_times_from_counter(summary_data['all_state'])}")
+                    self.compiled_rules_test(game, locations, (multiworld.state, all_state))
 
                 except Exception as e:
                     logger.exception(e)
@@ -0,0 +1,60 @@
+def run_memory_benchmark():
+    """Report the bytes per Region, Location and Entrance of a large synthetic multiworld, measured with tracemalloc.
+    Includes names, cache entries and registers."""
+    import logging
+    import tracemalloc
+
+    from Utils import init_logging
+    from BaseClasses import MultiWorld, Region
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    players, regions_per_player, locations_per_region = 100, 50, 10
+    multiworld = MultiWorld(players)
+    multiworld.regions += [Region("Menu", player, multiworld) for player in multiworld.player_ids]
+
+    def measure(create) -> float:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            count = create()
+            return (tracemalloc.get_traced_memory()[0] - before) / count
+        finally:
+            tracemalloc.stop()
+
+    def rule(state) -> bool:
+        return True
+
+    def create_regions() -> int:
+        for player in multiworld.player_ids:
+            for index in range(regions_per_player):
+                multiworld.regions.append(Region(f"Region {index}", player, multiworld))
+        return players * regions_per_player
+
+    def create_locations() -> int:
+        for region in multiworld.get_regions():
+            region.add_locations({f"{region.name} Location {index}": None for index in range(locations_per_region)})
+        # like set_rules, after all locations exist
+        for location in multiworld.get_locations():
+            location.access_rule = rule
+            location.item_rule = rule
+        return players * regions_per_player * locations_per_region
+
+    def create_entrances() -> int:
+        for region in multiworld.get_regions():
+            if region.name != "Menu":
+                multiworld.get_region("Menu", region.player).connect(region, rule=rule)
+        return players * regions_per_player
+
+    bytes_per_region = measure(create_regions)
+    bytes_per_location = measure(create_locations)
+    bytes_per_entrance = measure(create_entrances)
+    logger.info(f"Memory footprint of {players} players: {bytes_per_region:.0f} bytes per Region, "
+                f"{bytes_per_location:.0f} bytes per Location, {bytes_per_entrance:.0f} bytes per Entrance")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_memory_benchmark()
@@ -0,0 +1,65 @@
+def run_net_codec_benchmark():
+    """Compare NetUtils.encode and decode with and without orjson on typical messages."""
+    import logging
+    import typing
+    from unittest import mock
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    import NetUtils
+    from NetUtils import JSONMessagePart, NetworkItem, decode, encode
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class BenchmarkRunner:
+        iterations: int = 1000
+
+        @staticmethod
+        def create_messages() -> typing.Dict[str, typing.List[dict]]:
+            import worlds
+            items = [NetworkItem(item, item + 1000, item % 50, item % 8) for item in range(1000)]
+            print_json: typing.List[JSONMessagePart] = [
+                {"text": "1", "type": "player_id"}, {"text": " sent "},
+                {"text": "12345", "player": 2, "flags": 1, "type": "item_id"}, {"text": " to "},
+                {"text": "2", "type": "player_id"}, {"text": " ("},
+                {"text": "67890", "player": 1, "type": "location_id"}, {"text": ")"}]
+            return {
+                "ReceivedItems": [{"cmd": "ReceivedItems", "index": 0, "items": items}],
+                "PrintJSON": [{"cmd": "PrintJSON", "data": print_json, "type": "ItemSend", "receiving": 2,
+                               "item": item} for item in items[:100]],
+                "DataPackage": [{"cmd": "DataPackage",
+                                 "data": {"games": {game: package for game, package in
+                                                    list(worlds.network_data_package["games"].items())[:10]}}}],
+            }
+
+        def main(self):
+            messages = self.create_messages()
+            for name, message in messages.items():
+                encoded = encode(message)
+                times: typing.Dict[str, float] = {}
+                for codec in ("json", "orjson"):
+                    with mock.patch.object(NetUtils, "orjson", NetUtils.orjson if codec == "orjson" else None):
+                        with TimeIt(f"{self.iterations} encodes of {name} with {codec}", logger) as t:
+                            for _ in range(self.iterations):
+                                encode(message)
+                        times[f"encode {codec}"] = t.dif
+                        with TimeIt(f"{self.iterations} decodes of {name} with {codec}", logger) as t:
+                            for _ in range(self.iterations):
+                                decode(encoded)
+                        times[f"decode {codec}"] = t.dif
+                logger.info(f"{name} ({len(encoded)} characters): orjson encodes "
+                            f"{times['encode json'] / times['encode orjson']:.2f} and decodes "
+                            f"{times['decode json'] / times['decode orjson']:.2f} times as fast.")
+
+    if not NetUtils.orjson:
+        logger.warning("orjson is not installed, comparing the json module with itself.")
+    runner = BenchmarkRunner()
+    runner.main()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_net_codec_benchmark()
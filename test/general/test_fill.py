@@ -1,10 +1,10 @@
-from typing import List, Iterable
+from typing import Dict, List, Iterable
 import unittest
 
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
 from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
-    distribute_early_items, distribute_items_restrictive
+    distribute_early_items, distribute_items_restrictive, remaining_fill
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
 from worlds.generic.Rules import CollectionRule, add_item_rule, locality_rules, set_rule
@@ -463,6 +463,62 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertEqual(1, len(player1.prog_items))
         self.assertIsNot(loc0.item, player1.prog_items[0], "Filled item was still present in item pool")
 
+    def test_always_allow_unreachable_fill(self):
+        """Test that fill places into unreachable locations that always allow the item"""
+        multiworld = generate_test_multiworld()
+        player1 = generate_player_data(multiworld, 1, 2, 2)
+        items = player1.prog_items
+        locations = player1.locations
+
+        set_rule(locations[0], lambda state: False)
+        locations[0].always_allow = lambda state, item: item is items[0]
+        fill_restrictive(multiworld, multiworld.state, player1.locations.copy(), player1.prog_items.copy())
+
+        self.assertEqual(locations[0].item, items[0])
+        self.assertEqual(locations[1].item, items[1])
+
+    def test_can_fill_override_unreachable_fill(self):
+        """Test that fill places into unreachable locations that allow the item through an overridden can_fill"""
+        multiworld = generate_test_multiworld()
+        player1 = generate_player_data(multiworld, 1, 2, 2)
+        items = player1.prog_items
+        locations = player1.locations
+
+        class KeyLocation(Location):
+            __slots__ = ()
+
+            def can_fill(self, state, item, check_access=True) -> bool:
+                return super().can_fill(state, item, check_access and item is not items[0])
+
+        set_rule(locations[0], lambda state: False)
+        locations[0].__class__ = KeyLocation
+        fill_restrictive(multiworld, multiworld.state, player1.locations.copy(), player1.prog_items.copy())
+
+        self.assertEqual(locations[0].item, items[0])
+        self.assertEqual(locations[1].item, items[1])
+
+    def test_incremental_fill(self):
+        """Test that the incremental fill places the same as rebuilding the state for every item"""
+        def fill(incremental: bool) -> List[str]:
+            multiworld = generate_test_multiworld(2)
+            players = [generate_player_data(multiworld, player, 3, 8) for player in multiworld.player_ids]
+            for player in players:
+                region = player.menu
+                for i in range(4):
+                    items = player.prog_items[2 * i:2 * i + 2]
+                    region = player.generate_region(region, 3, lambda state, items_=items: state.has_all(
+                        names(items_), items_[0].player))
+                multiworld.completion_condition[player.id] = lambda state, player_=player: state.has_all(
+                    names(player_.prog_items), player_.id)
+            items = [item for player in players for item in player.prog_items]
+            fill_restrictive(multiworld, multiworld.state,
+                             [location for player in players for location in player.locations], items.copy(),
+                             incremental=incremental)
+            self.assertTrue(multiworld.can_beat_game())
+            return [item.location.name for item in items]
+
+        self.assertEqual(fill(False), fill(True))
+
 
 class TestDistributeItemsRestrictive(unittest.TestCase):
     def test_basic_distribute(self):
@@ -749,6 +805,44 @@ class TestDistributeItemsRestrictive(unittest.TestCase):
             assert item in items_in_locations, "early item to be placed in location"
 
 
+class TestRemainingFill(unittest.TestCase):
+    def test_first_accepting_location(self) -> None:
+        """Items go to the first empty location accepting them, in the order they are popped from the pool."""
+        multiworld = generate_test_multiworld()
+        player1 = generate_player_data(multiworld, 1, 12, 0, 12)
+        for item in player1.basic_items[-3:]:
+            item.name = "Picky"
+        for index, location in enumerate(player1.locations):
+            if index % 4:
+                add_item_rule(location, lambda item: item.name != "Picky")
+        expected: Dict[Location, Item] = {}
+        empty = player1.locations.copy()
+        for item in reversed(player1.basic_items):
+            location = next(location for location in empty if location.item_rule(item))
+            empty.remove(location)
+            expected[location] = item
+
+        locations = player1.locations.copy()
+        remaining_fill(multiworld, locations, player1.basic_items.copy())
+        self.assertEqual(locations, [])
+        self.assertEqual({location: location.item for location in player1.locations}, expected)
+
+    def test_swap(self) -> None:
+        """An item that fits nowhere swaps with a placed item, which then takes a location left empty."""
+        multiworld = generate_test_multiworld()
+        player1 = generate_player_data(multiworld, 1, 3, 0, 2)
+        only_item0, only_item1, no_items = player1.locations
+        add_item_rule(only_item0, lambda item: item == player1.basic_items[0])
+        add_item_rule(only_item1, lambda item: item == player1.basic_items[1])
+        add_item_rule(no_items, lambda item: False)
+
+        locations = [only_item0, no_items, only_item1]
+        remaining_fill(multiworld, locations, player1.basic_items.copy())
+        self.assertEqual(only_item0.item, player1.basic_items[0])
+        self.assertEqual(only_item1.item, player1.basic_items[1])
+        self.assertEqual(locations, [no_items])
+
+
 class TestBalanceMultiworldProgression(unittest.TestCase):
     def assertRegionContains(self, region: Region, item: Item) -> bool:
         for location in region.locations:
@@ -806,6 +900,16 @@ class TestBalanceMultiworldProgression(unittest.TestCase):
         self.assertRegionContains(
             self.player1.regions[1], self.player2.prog_items[0])
 
+    def test_logs_balancing_time(self) -> None:
+        """Tests that progression balancing reports how long it took"""
+        self.multiworld.progression_balancing[self.player1.id].value = 50
+        self.multiworld.progression_balancing[self.player2.id].value = 50
+
+        with self.assertLogs(level="INFO") as logs:
+            balance_multiworld_progression(self.multiworld)
+
+        self.assertTrue(any("Progression balancing took" in message for message in logs.output))
+
     def test_balances_progression_light(self) -> None:
         """Test that progression balancing still moves items earlier on minimum value"""
         self.multiworld.progression_balancing[self.player1.id].value = 1
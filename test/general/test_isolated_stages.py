@@ -0,0 +1,91 @@
+import sys
+import threading
+import unittest
+from typing import ClassVar, Dict
+
+from BaseClasses import Item, ItemClassification, Region
+from test.general import gen_steps, setup_multiworld
+from worlds.AutoWorld import AutoWorldRegister, World, call_all
+
+
+class IsolatedWorld(World):
+    game = "Isolated Test Game"
+    item_name_to_id = {}
+    location_name_to_id = {}
+    hidden = True
+    isolated_stages = frozenset({"create_regions"})
+    threads: ClassVar[Dict[int, str]] = {}
+
+    def create_regions(self) -> None:
+        self.threads[self.player] = threading.current_thread().name
+        self.multiworld.regions.append(Region("Menu", self.player, self.multiworld))
+
+
+class PlacingWorld(World):
+    game = "Placing Test Game"
+    item_name_to_id = {}
+    location_name_to_id = {}
+    hidden = True
+    isolated_stages = frozenset({"create_regions"})
+    location_count: ClassVar[int] = 2000
+
+    def create_regions(self) -> None:
+        menu = Region("Menu", self.player, self.multiworld)
+        self.multiworld.regions.append(menu)
+        menu.add_locations({f"Location {index}": None for index in range(self.location_count)})
+        for location in menu.locations:
+            location.place_locked_item(Item("Event", ItemClassification.progression, None, self.player))
+
+
+class TestIsolatedStages(unittest.TestCase):
+    def test_threads(self) -> None:
+        """Isolated stages only leave the main thread with more than one generation thread."""
+        for threads in (1, 2):
+            with self.subTest(threads=threads):
+                IsolatedWorld.threads.clear()
+                multiworld = setup_multiworld([IsolatedWorld] * 3, ())
+                multiworld.generation_threads = threads
+                call_all(multiworld, "generate_early")
+                call_all(multiworld, "create_regions")
+                self.assertEqual(len(multiworld.regions), 3)
+                on_main_thread = [name == threading.main_thread().name for name in IsolatedWorld.threads.values()]
+                self.assertEqual(on_main_thread, [threads == 1] * 3)
+
+    def test_exception(self) -> None:
+        """Exceptions of isolated stages reach the caller."""
+        multiworld = setup_multiworld([IsolatedWorld] * 2, ())
+        multiworld.generation_threads = 2
+        multiworld.regions.append(Region("Menu", 2, multiworld))
+        call_all(multiworld, "generate_early")
+        with self.assertRaises(AssertionError):
+            call_all(multiworld, "create_regions")
+
+    def test_same_result(self) -> None:
+        """Worlds opting in generate the same with threads."""
+        checksfinder = AutoWorldRegister.world_types["ChecksFinder"]
+        self.assertTrue(checksfinder.isolated_stages)
+        results = []
+        for threads in (1, 4):
+            multiworld = setup_multiworld([checksfinder] * 4, (), seed=1)
+            multiworld.generation_threads = threads
+            for step in gen_steps:
+                call_all(multiworld, step)
+            results.append([(location.name, location.player, location.parent_region.name)
+                            for location in multiworld.get_locations()])
+            results.append([(item.name, item.player) for item in multiworld.itempool])
+        self.assertEqual(results[:2], results[2:])
+
+    def test_shared_counters(self) -> None:
+        """Isolated stages adding and filling locations at the same time don't lose placements."""
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            multiworld = setup_multiworld([PlacingWorld] * 4, ())
+            multiworld.generation_threads = 4
+            placements = multiworld.regions.placements
+            call_all(multiworld, "generate_early")
+            call_all(multiworld, "create_regions")
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.assertEqual(multiworld.regions.placements - placements, 4 * PlacingWorld.location_count * 2)
+        self.assertEqual(len(multiworld.get_filled_locations()), 4 * PlacingWorld.location_count)
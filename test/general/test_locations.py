@@ -1,7 +1,9 @@
 import unittest
 from collections import Counter
+from BaseClasses import Item, ItemClassification, Location, Region
+from Fill import distribute_items_restrictive, swap_location_item
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from . import generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -66,3 +68,58 @@ class TestBase(unittest.TestCase):
                         for location in locations:
                             self.assertIn(location, world_type.location_name_to_id)
                         self.assertNotIn(group_name, world_type.location_name_to_id)
+
+    def test_location_indexes(self):
+        """Tests that the filled and unfilled location indexes match the locations after fill."""
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            with self.subTest("Game", game_name=game_name):
+                multiworld = setup_solo_multiworld(world_type)
+                distribute_items_restrictive(multiworld)
+                locations = list(multiworld.get_locations())
+                self.assertEqual([location for location in locations if location.item is not None],
+                                 multiworld.get_filled_locations())
+                self.assertEqual([location for location in locations if location.item is None],
+                                 multiworld.get_unfilled_locations())
+                self.assertEqual([location for location in locations if location.advancement],
+                                 multiworld.get_advancement_locations())
+
+    def test_location_index_updates(self):
+        """Tests that placing, swapping and removing items and locations updates the location indexes."""
+        multiworld = generate_test_multiworld(2)
+        region = Region("Test Region", 1, multiworld)
+        multiworld.regions.append(region)
+        first, second, third = (Location(1, name, None, region) for name in ("First", "Second", "Third"))
+        region.locations += [first, second]
+        progression = Item("Progression", ItemClassification.progression, None, 1)
+        filler = Item("Filler", ItemClassification.filler, None, 2)
+
+        self.assertEqual([first, second], multiworld.get_unfilled_locations(1))
+        multiworld.push_item(second, progression, False)
+        first.place_locked_item(filler)
+        self.assertEqual([first, second], multiworld.get_filled_locations())
+        self.assertEqual([second], multiworld.get_advancement_locations(1))
+        swap_location_item(first, second)
+        self.assertEqual([first], multiworld.get_advancement_locations())
+        filler.classification = ItemClassification.progression
+        self.assertEqual([first, second], multiworld.get_advancement_locations())
+        first.item = None
+        self.assertEqual([first], multiworld.get_unfilled_locations(1))
+        region.locations.remove(second)
+        third.item = progression
+        region.locations.append(third)
+        self.assertEqual([third], multiworld.get_filled_locations(1))
+        self.assertEqual([first, third], list(multiworld.get_locations(1)))
+
+    def test_sweep_locked_dungeon_items(self):
+        """Tests that sweep_for_events also collects locked dungeon items that aren't advancement."""
+        class DungeonItem(Item):
+            locked_dungeon_item = True
+
+        multiworld = generate_test_multiworld()
+        region = multiworld.get_region("Menu", 1)
+        location = Location(1, "Dungeon Chest", None, region)
+        region.locations.append(location)
+        location.place_locked_item(DungeonItem("Small Key", ItemClassification.filler, None, 1))
+        state = multiworld.state.copy()
+        state.sweep_for_events()
+        self.assertIn(location, state.events)
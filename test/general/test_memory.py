@@ -1,7 +1,9 @@
 import unittest
 
+from BaseClasses import Entrance, Location, LocationProgressType, Region
 from worlds.AutoWorld import AutoWorldRegister
-from . import setup_solo_multiworld
+from worlds.generic.Rules import add_item_rule, add_rule, forbid_item
+from . import generate_test_multiworld, setup_solo_multiworld
 
 
 class TestWorldMemory(unittest.TestCase):
@@ -14,3 +16,74 @@ class TestWorldMemory(unittest.TestCase):
                 weak = weakref.ref(setup_solo_multiworld(world_type))
                 gc.collect()
                 self.assertFalse(weak(), "World leaked a reference")
+
+    def test_footprint(self):
+        """Tests that the standard attributes of Region, Location and Entrance don't need a per-instance __dict__.
+        test/benchmark/memory.py reports the actual bytes per instance."""
+        for cls in (Region, Location, Entrance):
+            self.assertIn("__slots__", vars(cls), f"{cls.__name__} is not slotted")
+        multiworld = generate_test_multiworld(2)
+
+        def rule(state) -> bool:
+            return True
+
+        for player in multiworld.player_ids:
+            region = Region("Region", player, multiworld)
+            multiworld.regions.append(region)
+            region.add_locations({f"Location {index}": None for index in range(3)})
+            for location in region.locations:
+                location.access_rule = rule
+                location.item_rule = rule
+            multiworld.get_region("Menu", player).connect(region, rule=rule)
+        for location in multiworld.get_locations():
+            with self.subTest("Location", location=location.name, player=location.player):
+                self.assertEqual({}, location.__dict__)
+        for entrance in multiworld.get_entrances():
+            with self.subTest("Entrance", entrance=entrance.name, player=entrance.player):
+                self.assertEqual({}, entrance.__dict__)
+
+    def test_slot_defaults(self):
+        """Tests that slotted classes get their defaults and subclasses can still override them."""
+        class ExcludedLocation(Location):
+            progress_type = LocationProgressType.EXCLUDED
+
+        class CompactLocation(Location):
+            __slots__ = ("extra",)
+
+        location = Location(1, "Location")
+        self.assertIsNone(location.item)
+        self.assertTrue(location.access_rule(None))
+        self.assertEqual(LocationProgressType.EXCLUDED, ExcludedLocation(1, "Excluded").progress_type)
+        compact = CompactLocation(1, "Compact")
+        compact.extra = True
+        compact.locked = True
+        self.assertEqual({}, compact.__dict__)
+        # other attributes still work
+        location.extra = True
+        self.assertEqual({"extra": True}, location.__dict__)
+
+    def test_default_rules_replaced(self):
+        """Tests that adding rules to spots with the default rules stores the new rules as they are."""
+        class RuleLocation(Location):
+            access_rule = staticmethod(lambda state: False)
+
+        def rule(state):
+            return True
+
+        def item_rule(item):
+            return True
+
+        location = Location(1, "Location")
+        entrance = Entrance(1, "Entrance")
+        add_rule(location, rule)
+        add_rule(entrance, rule)
+        add_item_rule(location, item_rule)
+        self.assertIs(rule, location.access_rule)
+        self.assertIs(rule, entrance.access_rule)
+        self.assertIs(item_rule, location.item_rule)
+        forbid_item(location, "Item", 1)
+        self.assertIsNot(item_rule, location.item_rule)
+
+        overriding = RuleLocation(1, "Overriding")
+        add_rule(overriding, rule)
+        self.assertIs(rule, overriding.access_rule)
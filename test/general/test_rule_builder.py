@@ -0,0 +1,109 @@
+import itertools
+import unittest
+
+from BaseClasses import CollectionState, Item, ItemClassification, Location, MultiWorld
+from worlds.generic.Rules import add_rule, set_rule
+from worlds.generic.RuleBuilder import (And, CanReach, Constant, Has, HasAll, HasAllCounts, HasAny, HasFromList,
+                                        HasGroup, Rule, compile_rule)
+from . import generate_test_multiworld
+
+
+class TestRuleBuilder(unittest.TestCase):
+    multiworld: MultiWorld
+    player: int = 1
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.world = self.multiworld.worlds[self.player]
+        self.world.item_name_groups = {"Keys": frozenset({"Key A", "Key B"})}
+        self.menu = self.multiworld.get_region("Menu", self.player)
+        self.location = Location(self.player, "Location", None, self.menu)
+        self.menu.locations.append(self.location)
+
+    def create_state(self, items) -> CollectionState:
+        state = CollectionState(self.multiworld)
+        for name, player in items:
+            state.collect(Item(name, ItemClassification.progression, None, player), True)
+        return state
+
+    def test_resolve(self) -> None:
+        """Tests that rules get flattened, folded and merged when resolved"""
+        resolve = lambda rule: rule.resolve(self.world)
+        self.assertEqual(Constant(True), resolve(Has("Key A", 0)))
+        self.assertEqual(Has("Key A", 1, 1), resolve(HasAll("Key A")))
+        self.assertEqual(Constant(False), resolve(HasAny()))
+        self.assertEqual(HasAny("Key A", "Key B", player=1), resolve(HasGroup("Keys")))
+        self.assertEqual(Constant(False), resolve(HasGroup("Keys", 3, unique=True)))
+        self.assertEqual(HasAllCounts({"Key A": 2, "Key B": 1}, 1),
+                         resolve(Has("Key A") & (Has("Key A", 2) & Has("Key B"))))
+        self.assertEqual(And(Has("Key A", 1, 1), Has("Key A", 1, 2)),
+                         resolve(Has("Key A") & Has("Key A", player=2) & Constant(True)))
+        self.assertEqual(Constant(False), resolve(Has("Key A") & Constant(False)))
+        self.assertEqual(HasAny("Key A", "Key B", "Key C", player=1),
+                         resolve(Has("Key A") | HasAny("Key B", "Key C") | Constant(False)))
+        self.assertEqual(Constant(True), resolve(Has("Key A") | Constant(True)))
+        self.assertEqual(And(Has("Key A", 1, 1), CanReach(self.menu, "Region", 1)),
+                         resolve(CanReach("Menu") & Has("Key A")))
+
+    def test_compiled_matches_lambdas(self) -> None:
+        """Tests that compiled rules evaluate the same as the lambdas they replace"""
+        player = self.player
+        rules = [
+            (Has("Key A", 2), lambda state: state.has("Key A", player, 2)),
+            (HasAll("Key A", "Key B"), lambda state: state.has_all(("Key A", "Key B"), player)),
+            (HasAny("Key A", "Key C"), lambda state: state.has_any(("Key A", "Key C"), player)),
+            (HasAllCounts({"Key A": 2, "Key C": 1}), lambda state: state.has_all_counts({"Key A": 2, "Key C": 1},
+                                                                                         player)),
+            (HasFromList(("Key A", "Key B", "Key C"), 2),
+             lambda state: state.has_from_list(("Key A", "Key B", "Key C"), player, 2)),
+            (HasFromList(("Key A", "Key B", "Key C"), 2, unique=True),
+             lambda state: state.has_from_list_unique(("Key A", "Key B", "Key C"), player, 2)),
+            (HasGroup("Keys", 2), lambda state: state.has_group("Keys", player, 2)),
+            (Has("Key A") & Has("Key B", player=2), lambda state: state.has("Key A", player) and state.has("Key B", 2)),
+            (Has("Key A", 2) | (Has("Key B") & Has("Key C")),
+             lambda state: state.has("Key A", player, 2) or state.has_all(("Key B", "Key C"), player)),
+            ((Has("Key A") | Has("Key B")) & CanReach("Menu"),
+             lambda state: state.has_any(("Key A", "Key B"), player) and state.can_reach("Menu", "Region", player)),
+        ]
+        items = [("Key A", 1), ("Key A", 1), ("Key B", 1), ("Key C", 1), ("Key B", 2)]
+        for rule, reference in rules:
+            compiled = compile_rule(rule, self.world)
+            for count in range(len(items) + 1):
+                for collected in itertools.combinations(items, count):
+                    state = self.create_state(collected)
+                    with self.subTest(rule=rule, items=collected):
+                        self.assertEqual(reference(state), compiled(state))
+
+    def test_array_inventory(self) -> None:
+        """Tests that rules compiled for an array_inventory world read item slots and still match the lambdas"""
+        self.world.array_inventory = True
+        self.world.item_slots = {"Key B": 0}
+        rules = [
+            (Has("Key A", 2), lambda state: state.has("Key A", self.player, 2)),
+            (HasAll("Key A", "Key B"), lambda state: state.has_all(("Key A", "Key B"), self.player)),
+            (HasAny("Key C", "Key A"), lambda state: state.has_any(("Key A", "Key C"), self.player)),
+            (HasFromList(("Key A", "Key B", "Key C"), 3),
+             lambda state: state.has_from_list(("Key A", "Key B", "Key C"), self.player, 3)),
+        ]
+        # a state from before the rules handed out their slots and one from before the world knew about them
+        old_state = self.create_state([("Key B", 1)])
+        self.world.array_inventory = False
+        counter_state = self.create_state([("Key B", 1)])
+        self.world.array_inventory = True
+        compiled_rules = [(compile_rule(rule, self.world), reference) for rule, reference in rules]
+        self.assertEqual(["Key B", "Key A", "Key C"], list(self.world.item_slots))
+        for collected in ([], [("Key A", 1)], [("Key A", 1), ("Key A", 1), ("Key B", 1), ("Key C", 1)]):
+            for state in (self.create_state(collected), old_state, counter_state):
+                for compiled, reference in compiled_rules:
+                    with self.subTest(rule=compiled.rule, items=collected):
+                        self.assertEqual(reference(state), compiled(state))
+
+    def test_set_rule(self) -> None:
+        """Tests that set_rule and add_rule accept and combine declarative rules"""
+        set_rule(self.location, Has("Key A"))
+        add_rule(self.location, Has("Key B"))
+        self.assertIsInstance(self.location.access_rule.rule, Rule)
+        self.assertEqual(HasAll("Key B", "Key A", player=1), self.location.access_rule.rule)
+        add_rule(self.location, lambda state: state.has("Key C", self.player))
+        self.assertFalse(self.location.can_reach(self.create_state([("Key A", 1), ("Key B", 1)])))
+        self.assertTrue(self.location.can_reach(self.create_state([("Key A", 1), ("Key B", 1), ("Key C", 1)])))
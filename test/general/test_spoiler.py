@@ -0,0 +1,188 @@
+import threading
+import unittest
+from unittest import mock
+
+from BaseClasses import CollectionState, Entrance, ItemClassification, Location, MultiWorld, Region, \
+    SphereAnalysis, _SphereCuller
+from test.general import generate_items, generate_locations, generate_test_multiworld
+
+
+def setup_multiworld() -> MultiWorld:
+    """Two players, each with a key item opening their second region, which holds the goal item."""
+    multiworld = generate_test_multiworld(2)
+    for player in multiworld.player_ids:
+        menu = multiworld.get_region("Menu", player)
+        region = Region(f"player{player}_region", player, multiworld)
+        multiworld.regions.append(region)
+        entrance = Entrance(player, f"player{player}_entrance", menu)
+        menu.exits.append(entrance)
+        entrance.connect(region)
+        key_name = f"player{player}_progitem0"
+        entrance.access_rule = lambda state, key_name=key_name, player=player: state.has(key_name, player)
+        goal_name = f"player{player}_progitem1"
+        multiworld.completion_condition[player] = \
+            lambda state, goal_name=goal_name, player=player: state.has(goal_name, player)
+
+        menu_locations = generate_locations(3, player, menu)
+        region_locations = generate_locations(2, player, region, tag="_region")
+        key, goal, spare_key, spare = generate_items(4, player, True)
+        spare_key.name = key_name
+        menu_locations[0].place_locked_item(key)
+        menu_locations[1].place_locked_item(spare_key)
+        menu_locations[2].place_locked_item(spare)
+        region_locations[0].place_locked_item(goal)
+        region_locations[1].place_locked_item(generate_items(1, player)[0])
+    return multiworld
+
+
+class TestPlaythrough(unittest.TestCase):
+    def test_culling(self) -> None:
+        """Only one of two equal keys and no unneeded item are left, and the multiworld is repaired after."""
+        multiworld = setup_multiworld()
+        filled = {location: location.item for location in multiworld.get_filled_locations()}
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        playthrough = multiworld.spoiler.playthrough
+        self.assertEqual(len(playthrough), 3)
+        for player in multiworld.player_ids:
+            suffix = f" ({multiworld.player_name[player]})"
+            self.assertEqual(sum(item == f"player{player}_progitem0{suffix}" for item in playthrough["1"].values()), 1)
+            self.assertIn(f"player{player}_progitem1{suffix}", playthrough["2"].values())
+            self.assertNotIn(f"player{player}_progitem3{suffix}", playthrough["1"].values())
+        self.assertEqual({location: location.item for location in multiworld.get_filled_locations()}, filled)
+
+    def test_processes(self) -> None:
+        """Culling in worker processes gives the same playthrough."""
+        multiworld = setup_multiworld()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        serial = multiworld.spoiler.playthrough
+        multiworld = setup_multiworld()
+        multiworld.spoiler.create_playthrough(create_paths=False, processes=2)
+        self.assertEqual(multiworld.spoiler.playthrough, serial)
+
+    def test_processes_with_threads(self) -> None:
+        """No worker processes get forked while other threads run, culling in this process instead."""
+        multiworld = setup_multiworld()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        serial = multiworld.spoiler.playthrough
+        multiworld = setup_multiworld()
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            with mock.patch("multiprocessing.get_context") as get_context:
+                multiworld.spoiler.create_playthrough(create_paths=False, processes=2)
+        finally:
+            stop.set()
+            thread.join()
+        get_context.assert_not_called()
+        self.assertEqual(multiworld.spoiler.playthrough, serial)
+
+    def test_culling_states(self) -> None:
+        """Items are culled from states holding only the progress items, even after demoting some."""
+        multiworld = setup_multiworld()
+        multiworld.get_sphere_analysis()
+        for player in multiworld.player_ids:
+            multiworld.get_location(f"player{player}_location2", player).item.classification = \
+                ItemClassification.useful
+        with mock.patch.object(_SphereCuller, "cull", autospec=True, side_effect=_SphereCuller.cull) as cull:
+            multiworld.spoiler.create_playthrough(create_paths=False)
+        for state in cull.call_args.args[0].state_cache:
+            for player in multiworld.player_ids:
+                self.assertNotIn(f"player{player}_progitem3", state.prog_items[player])
+        for player in multiworld.player_ids:
+            self.assertNotIn(f"player{player}_progitem3{f' ({multiworld.player_name[player]})'}",
+                             multiworld.spoiler.playthrough["1"].values())
+
+    def test_processes_in_daemon(self) -> None:
+        """Daemonic processes, like the workers of BatchGenerate, cull in their own process."""
+        multiworld = setup_multiworld()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        serial = multiworld.spoiler.playthrough
+        multiworld = setup_multiworld()
+        with mock.patch("multiprocessing.current_process", return_value=mock.Mock(daemon=True)), \
+                mock.patch("multiprocessing.get_context") as get_context:
+            multiworld.spoiler.create_playthrough(create_paths=False, processes=2)
+        get_context.assert_not_called()
+        self.assertEqual(multiworld.spoiler.playthrough, serial)
+
+
+class TestSphereAnalysis(unittest.TestCase):
+    def test_spheres(self) -> None:
+        multiworld = setup_multiworld()
+        analysis = multiworld.get_sphere_analysis()
+        self.assertIs(multiworld.get_sphere_analysis(), analysis)
+        self.assertEqual(list(multiworld.get_spheres()), analysis.spheres)
+        self.assertEqual([len(sphere) for sphere in analysis.spheres], [6, 4])
+        self.assertEqual(analysis.beaten_sphere, 2)
+        self.assertTrue(multiworld.can_beat_game())
+        self.assertTrue(multiworld.fulfills_accessibility())
+
+    def test_invalidation(self) -> None:
+        """Moving an item recomputes the analysis, which then finds the items behind the key unreachable."""
+        multiworld = setup_multiworld()
+        analysis = multiworld.get_sphere_analysis()
+        for player in multiworld.player_ids:
+            key = multiworld.get_location(f"player{player}_location0", player).item
+            multiworld.get_location(f"player{player}_location0", player).item = None
+            multiworld.get_location(f"player{player}_location1", player).item = None
+            multiworld.get_location(f"player{player}_region_location1", player).item = key
+        self.assertIsNot(multiworld.get_sphere_analysis(), analysis)
+        spheres = list(multiworld.get_spheres())
+        self.assertEqual([len(sphere) for sphere in spheres], [2, 0, 4])
+        self.assertFalse(multiworld.can_beat_game())
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(multiworld.fulfills_accessibility())
+
+    def test_classification_change(self) -> None:
+        """Changing a classification while iterating the spheres sweeps the following ones, and outdates the analysis."""
+        multiworld = setup_multiworld()
+        analysis = multiworld.get_sphere_analysis()
+        spheres = []
+        with mock.patch.object(Location, "can_reach", autospec=True, side_effect=Location.can_reach) as can_reach:
+            for sphere in multiworld.get_spheres():
+                if not spheres:
+                    can_reach.assert_not_called()
+                    multiworld.get_location("player1_location2", 1).item.classification = ItemClassification.useful
+                spheres.append(sphere)
+        self.assertTrue(can_reach.called)
+        self.assertEqual(spheres, analysis.spheres)
+        self.assertIsNot(multiworld.get_sphere_analysis(), analysis)
+
+    def test_can_beat_game_with_state(self) -> None:
+        """Without a state, the game is also beaten if it is with the collected items of multiworld.state."""
+        multiworld = setup_multiworld()
+        for player in multiworld.player_ids:
+            multiworld.get_location(f"player{player}_location0", player).item = None
+            multiworld.get_location(f"player{player}_location1", player).item = None
+        self.assertFalse(multiworld.can_beat_game())
+        for player in multiworld.player_ids:
+            multiworld.state.collect(multiworld.get_location(f"player{player}_region_location0", player).item, True)
+        self.assertTrue(multiworld.can_beat_game())
+        self.assertFalse(multiworld.can_beat_game(CollectionState(multiworld)))
+
+    def test_playthrough_keeps_analysis(self) -> None:
+        """Creating the playthrough leaves an up-to-date analysis for output generation to reuse."""
+        multiworld = setup_multiworld()
+        analysis = multiworld.get_sphere_analysis()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        self.assertIsNot(multiworld.get_sphere_analysis(), analysis)
+        self.assertIs(multiworld.get_sphere_analysis(), multiworld.get_sphere_analysis())
+        analysis = multiworld.get_sphere_analysis()
+        multiworld.spoiler.create_playthrough(create_paths=False)
+        with mock.patch.object(SphereAnalysis, "__init__", side_effect=AssertionError("computed again")):
+            self.assertTrue(multiworld.can_beat_game())
+            self.assertEqual(len(list(multiworld.get_spheres())), 2)
+        self.assertEqual(analysis.spheres, multiworld.get_sphere_analysis().spheres)
+
+    def test_shared_state_unchanged(self) -> None:
+        """The accessibility check doesn't reach locations with the state shared by all threads."""
+        multiworld = setup_multiworld()
+        for player in multiworld.player_ids:
+            multiworld.worlds[player].options.accessibility.value = \
+                multiworld.worlds[player].options.accessibility.option_locations
+            generate_locations(1, player, multiworld.get_region("Menu", player), tag="_empty")
+        analysis = multiworld.get_sphere_analysis()
+        with mock.patch.object(Location, "can_reach", autospec=True, side_effect=Location.can_reach) as can_reach:
+            self.assertTrue(multiworld.fulfills_accessibility())
+        self.assertTrue(can_reach.call_args_list)
+        self.assertNotIn(analysis.state, [call.args[1] for call in can_reach.call_args_list])
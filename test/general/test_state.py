@@ -0,0 +1,215 @@
+import copy
+import unittest
+
+from BaseClasses import CollectionState, Entrance, Item, ItemClassification, ItemCounts, Location, MultiWorld, Region
+from . import generate_test_multiworld
+
+
+class TestIncrementalReachability(unittest.TestCase):
+    multiworld: MultiWorld
+    player: int = 1
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.multiworld.worlds[self.player].incremental_reachability = True
+        self.menu = self.multiworld.get_region("Menu", self.player)
+
+    def create_region(self, name: str, parent: Region, item_name: str) -> Region:
+        region = Region(name, self.player, self.multiworld)
+        self.multiworld.regions.append(region)
+        entrance = Entrance(self.player, f"{parent.name} -> {name}", parent)
+        parent.exits.append(entrance)
+        entrance.connect(region)
+        entrance.access_rule = lambda state: state.has(item_name, self.player)
+        return region
+
+    def create_event(self, name: str, region: Region, item_name: str, required: str = "") -> Location:
+        location = Location(self.player, name, None, region)
+        region.locations.append(location)
+        if required:
+            location.access_rule = lambda state: state.has(required, self.player)
+        location.place_locked_item(Item(item_name, ItemClassification.progression, None, self.player))
+        return location
+
+    def test_sweep_matches_full_sweep(self) -> None:
+        """Tests that the incremental sweep collects the same chain of events as re-evaluating everything"""
+        upper = self.create_region("Upper", self.menu, "Key")
+        self.create_event("Start Event", self.menu, "Key")
+        self.create_event("Gated Event", self.menu, "Lamp", "Key")
+        self.create_event("Upper Event", upper, "Hammer", "Lamp")
+        self.create_event("Unreachable Event", upper, "Crown", "Flute")
+
+        incremental_state = CollectionState(self.multiworld)
+        incremental_state.sweep_for_events()
+        self.multiworld.worlds[self.player].incremental_reachability = False
+        full_state = CollectionState(self.multiworld)
+        full_state.sweep_for_events()
+
+        self.assertEqual(full_state.events, incremental_state.events)
+        self.assertEqual(full_state.prog_items, incremental_state.prog_items)
+        self.assertTrue(incremental_state.has_all(("Key", "Lamp", "Hammer"), self.player))
+        self.assertFalse(incremental_state.has("Crown", self.player))
+
+    def test_remove_keeps_unrelated_regions(self) -> None:
+        """Tests that removing an item only forgets regions whose entrances depended on it"""
+        left = self.create_region("Left", self.menu, "Left Key")
+        right = self.create_region("Right", self.menu, "Right Key")
+        self.create_event("Left Key Event", self.menu, "Left Key")
+        self.create_event("Right Key Event", self.menu, "Right Key")
+
+        state = CollectionState(self.multiworld)
+        state.sweep_for_events()
+        self.assertTrue(left.can_reach(state))
+        self.assertTrue(right.can_reach(state))
+
+        removed_state = state.copy()
+        removed_state.remove(self.multiworld.get_location("Left Key Event", self.player).item)
+        self.assertIn(right, removed_state.reachable_regions[self.player])
+        self.assertFalse(left.can_reach(removed_state))
+        self.assertTrue(right.can_reach(removed_state))
+        self.assertTrue(left.can_reach(state))
+
+    def create_indirect_region(self) -> Entrance:
+        """Creates a region whose entrance checks for a region only reachable further down Menu's exits"""
+        hidden = Region("Hidden", self.player, self.multiworld)
+        self.multiworld.regions.append(hidden)
+        entrance = Entrance(self.player, "Menu -> Hidden", self.menu)
+        self.menu.exits.append(entrance)
+        entrance.connect(hidden)
+        upper = self.create_region("Upper", self.menu, "Key")
+        entrance.access_rule = lambda state: state.can_reach(upper)
+        self.multiworld.push_precollected(Item("Key", ItemClassification.progression, None, self.player))
+        return entrance
+
+    def test_registers_indirect_conditions(self) -> None:
+        """Tests that the search registers regions checked by entrance rules as their indirect conditions"""
+        entrance = self.create_indirect_region()
+        upper = self.multiworld.get_region("Upper", self.player)
+        state = CollectionState(self.multiworld)
+        state.update_reachable_regions(self.player)
+        self.assertIn(entrance.connected_region, state.reachable_regions[self.player])
+        self.assertEqual(self.multiworld.indirect_connections, {upper: {entrance}})
+
+    def test_find_indirect_conditions(self) -> None:
+        """Tests that the audit finds unregistered indirect conditions, also of worlds that don't track dependencies"""
+        self.multiworld.worlds[self.player].incremental_reachability = False
+        entrance = self.create_indirect_region()
+        upper = self.multiworld.get_region("Upper", self.player)
+        self.assertEqual(self.multiworld.find_indirect_conditions(), {upper: {entrance}})
+        self.assertEqual(self.multiworld.indirect_connections, {})
+        self.multiworld.register_indirect_condition(upper, entrance)
+        self.assertEqual(self.multiworld.find_indirect_conditions(), {})
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    multiworld: MultiWorld
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        for player in self.multiworld.player_ids:
+            menu = self.multiworld.get_region("Menu", player)
+            region = Region(f"Gated {player}", player, self.multiworld)
+            self.multiworld.regions.append(region)
+            menu.connect(region, rule=lambda state, player_=player: state.has("Key", player_))
+
+    def test_copy_is_independent(self) -> None:
+        """Tests that collecting into a copy neither changes the original nor the untouched players of the copy"""
+        state = CollectionState(self.multiworld)
+        for player in self.multiworld.player_ids:
+            self.assertFalse(self.multiworld.get_region(f"Gated {player}", player).can_reach(state))
+
+        key = Item("Key", ItemClassification.progression, None, 1)
+        copied_state = state.copy()
+        copied_state.collect(key, True)
+
+        self.assertTrue(copied_state.has("Key", 1))
+        self.assertFalse(state.has("Key", 1))
+        self.assertTrue(self.multiworld.get_region("Gated 1", 1).can_reach(copied_state))
+        self.assertFalse(self.multiworld.get_region("Gated 1", 1).can_reach(state))
+        self.assertIsNot(copied_state.prog_items[1], state.prog_items[1])
+        self.assertIs(copied_state.prog_items[2], state.prog_items[2])
+        self.assertFalse(self.multiworld.get_region("Gated 2", 2).can_reach(copied_state))
+        self.assertIs(copied_state.reachable_regions[2], state.reachable_regions[2])
+
+        state.collect(Item("Key", ItemClassification.progression, None, 2), True)
+        self.assertTrue(state.has("Key", 2))
+        self.assertFalse(copied_state.has("Key", 2))
+        copied_state.remove(key)
+        self.assertFalse(copied_state.has("Key", 1))
+        self.assertFalse(self.multiworld.get_region("Gated 1", 1).can_reach(copied_state))
+
+
+class TestArrayInventory(unittest.TestCase):
+    multiworld: MultiWorld
+    player: int = 1
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        world = self.multiworld.worlds[self.player]
+        world.array_inventory = True
+        world.item_slots = {"Key": 0}
+        self.menu = self.multiworld.get_region("Menu", self.player)
+        self.gated = Region("Gated", self.player, self.multiworld)
+        self.multiworld.regions.append(self.gated)
+        self.menu.connect(self.gated, rule=lambda state: state.has_all_counts({"Key": 2, "Lamp": 1}, self.player))
+
+    def collect(self, state: CollectionState, *item_names: str) -> None:
+        for item_name in item_names:
+            state.collect(Item(item_name, ItemClassification.progression, None, self.player), True)
+
+    def test_item_counts(self) -> None:
+        """Tests that ItemCounts behaves like a Counter of item names"""
+        counts = ItemCounts({"Key": 0})
+        self.assertEqual(0, counts["Key"])
+        self.assertNotIn("Lamp", counts)
+        counts["Lamp"] += 2
+        counts.update(["Key", "Lamp"])
+        self.assertEqual({"Key": 1, "Lamp": 3}, dict(counts))
+        copied = copy.deepcopy(counts)
+        del counts["Key"]
+        self.assertNotIn("Key", counts)
+        self.assertEqual(1, len(counts))
+        self.assertEqual(1, copied["Key"])
+        self.assertIs(counts.slots, copied.slots)
+        self.assertEqual(4, copied.total())
+        self.assertEqual(ItemCounts({}), ItemCounts({"Key": 0}))
+
+    def test_item_counts_grow(self) -> None:
+        """Tests that new item names grow the counts by one slot each"""
+        counts = ItemCounts({"Key": 0})
+        self.assertEqual(1, len(counts.counts))
+        counts["Lamp"] = 1
+        counts["Hammer"] = 2
+        self.assertEqual(3, len(counts.counts))
+        self.assertEqual([0, 1, 2], counts.counts.tolist())
+
+    def test_matches_counter(self) -> None:
+        """Tests that states of an array_inventory world give the same answers as with a Counter"""
+        state = CollectionState(self.multiworld)
+        self.assertIsInstance(state.prog_items[self.player], ItemCounts)
+        self.assertNotIsInstance(state.prog_items[2], ItemCounts)
+        self.collect(state, "Key", "Lamp")
+        copied_state = state.copy()
+        self.collect(copied_state, "Key")
+        self.assertFalse(self.gated.can_reach(state))
+        self.assertTrue(self.gated.can_reach(copied_state))
+        self.assertEqual(1, state.count("Key", self.player))
+        self.assertEqual({"Key": 2, "Lamp": 1}, copied_state.prog_items[self.player])
+
+        copied_state.remove(Item("Key", ItemClassification.progression, None, self.player))
+        self.assertFalse(self.gated.can_reach(copied_state))
+        self.assertEqual(state.prog_items[self.player], copied_state.prog_items[self.player])
+
+    def test_tracked(self) -> None:
+        """Tests that item reads of an array_inventory world get tracked for incremental_reachability"""
+        self.multiworld.worlds[self.player].incremental_reachability = True
+        state = CollectionState(self.multiworld)
+        self.assertIsInstance(state.prog_items[self.player], ItemCounts)
+        self.collect(state, "Key", "Key")
+        self.assertFalse(self.gated.can_reach(state))
+        self.collect(state.copy(), "Lamp")
+        self.assertFalse(self.gated.can_reach(state))
+        self.collect(state, "Lamp")
+        self.assertTrue(self.gated.can_reach(state))
+        state.remove(Item("Key", ItemClassification.progression, None, self.player))
+        self.assertFalse(self.gated.can_reach(state))
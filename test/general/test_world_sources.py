@@ -0,0 +1,62 @@
+import json
+import pickle
+import unittest
+
+from worlds import LazyDict, _data_package_path, _game_entries, game_sources, get_hint_blacklist, world_settings_games
+from worlds.AutoWorld import AutoWorldRegister, data_package_checksum
+
+
+class TestWorldSources(unittest.TestCase):
+    def test_game_sources(self):
+        """Tests that the manifest points each game to the world source that registers it."""
+        for game, world_source in game_sources.items():
+            with self.subTest(game):
+                world_type = AutoWorldRegister.world_types[game]
+                self.assertTrue(world_source.loaded)
+                self.assertTrue(world_type.__module__ == world_source.module_name or
+                                world_type.__module__.startswith(world_source.module_name + "."))
+
+    def test_world_settings_games(self):
+        """Tests that the manifest knows the settings_key of each world with settings."""
+        for settings_key, game in world_settings_games.items():
+            with self.subTest(game):
+                self.assertEqual(settings_key, AutoWorldRegister.world_types[game].settings_key)
+
+    def test_cached_data_packages(self):
+        """Tests that the cached data packages and hint blacklists match those of the worlds."""
+        for game in game_sources:
+            with self.subTest(game):
+                world_type = AutoWorldRegister.world_types[game]
+                with open(_data_package_path(game, _game_entries[game]["checksum"]), encoding="utf-8") as f:
+                    cached_package = json.load(f)
+                checksum = cached_package.pop("checksum")
+                self.assertEqual(checksum, data_package_checksum(cached_package))
+                game_package = world_type.get_data_package_data()
+                del game_package["checksum"]
+                self.assertEqual(game_package, cached_package)
+                self.assertEqual(world_type.hint_blacklist, get_hint_blacklist(game))
+
+    def test_lazy_dict(self):
+        """Tests that a LazyDict loads single keys on lookup and everything on iteration."""
+        loaded = []
+
+        def load(key: str) -> None:
+            if key in {"a", "b"}:
+                loaded.append(key)
+                dict.__setitem__(lazy, key, key.upper())
+
+        def load_all() -> None:
+            for key in ("a", "b"):
+                if not dict.__contains__(lazy, key):
+                    load(key)
+
+        lazy: LazyDict[str, str] = LazyDict(load, load_all)
+        self.assertEqual("A", lazy["a"])
+        self.assertNotIn("c", lazy)
+        self.assertIsNone(lazy.get("c"))
+        with self.assertRaises(KeyError):
+            lazy["c"]
+        self.assertEqual(["a"], loaded)
+        self.assertEqual({"a": "A", "b": "B"}, dict(lazy))
+        self.assertEqual(["a", "b"], loaded)
+        self.assertEqual({"a": "A", "b": "B"}, pickle.loads(pickle.dumps(lazy)))
@@ -0,0 +1,60 @@
+# Tests for encode and decode in NetUtils.py
+
+import unittest
+from unittest import mock
+
+import NetUtils
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, decode, encode
+from Utils import Version
+
+messages = [
+    [{"cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(1, 2, 3, 4), NetworkItem(5, 6, 7)]}],
+    [{"cmd": "Connected", "team": 0, "slot": 1, "players": [NetworkPlayer(0, 1, "Alias", "Name")],
+      "checked_locations": {3, 4}, "missing_locations": frozenset({5}),
+      "slot_info": {1: NetworkSlot("Name", "Game", SlotType.player, [])}}],
+    [{"cmd": "PrintJSON", "data": [{"text": "ünïcode \"class\""}], "hint": Hint(1, 2, 3, 4, False)}],
+    [{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL, "version": Version(0, 5, 0), "tuple": (1, 2),
+      "float": 1.5, "none": None, "big": 2 ** 70}],
+    [{"cmd": "SetReply", "key": "floats", "value": [1e-7, 1e16, 0.1 + 0.2, 5e-324, -0.0]}],
+]
+
+
+class TestCodec(unittest.TestCase):
+    def test_same_as_json(self) -> None:
+        """The encoding decodes to the same objects as the json module's, which isn't necessarily the same text."""
+        for message in messages:
+            with self.subTest(cmd=message[0]["cmd"]):
+                encoded = encode(message)
+                self.assertEqual(decode(encoded), decode(NetUtils._encode(NetUtils._scan_for_TypedTuples(message))))
+                self.assertEqual(decode(encoded), NetUtils._decode(encoded))
+
+    def test_floats(self) -> None:
+        """Floats decode to the same values, whichever way they are formatted."""
+        values = messages[-1][0]["value"]
+        self.assertEqual([repr(value) for value in decode(encode(values))], [repr(value) for value in values])
+        with mock.patch.object(NetUtils, "orjson", None):
+            self.assertEqual([repr(value) for value in decode(encode(values))], [repr(value) for value in values])
+
+    def test_non_finite_floats(self) -> None:
+        """NaN and Infinity are kept, like the json module does, instead of becoming null."""
+        message = [{"cmd": "SetReply", "key": "key", "value": [float("nan"), {"inf": float("inf")}, None],
+                    "original_value": -float("inf")}]
+        encoded = encode(message)
+        self.assertEqual(encoded, NetUtils._encode(message))
+        decoded = decode(encoded)[0]
+        self.assertNotEqual(decoded["value"][0], decoded["value"][0])
+        self.assertEqual(decoded["value"][1:], [{"inf": float("inf")}, None])
+        self.assertEqual(decoded["original_value"], -float("inf"))
+        self.assertEqual(encode([{"value": None}]), '[{"value":null}]')
+
+    def test_objects(self) -> None:
+        decoded = decode(encode(messages[1]))[0]
+        self.assertEqual(decoded["players"], [NetworkPlayer(0, 1, "Alias", "Name")])
+        self.assertEqual(decoded["slot_info"]["1"], NetworkSlot("Name", "Game", SlotType.player, []))
+        self.assertEqual(decode(encode(messages[3]))[0]["version"], Version(0, 5, 0))
+
+    def test_without_orjson(self) -> None:
+        """Without orjson, the json module gives the same results."""
+        results = [decode(encode(message)) for message in messages]
+        with mock.patch.object(NetUtils, "orjson", None):
+            self.assertEqual([decode(encode(message)) for message in messages], results)
@@ -0,0 +1,88 @@
+# Tests for BatchGenerate.py
+
+import json
+import multiprocessing
+import os
+import sys
+import unittest
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import BatchGenerate
+import Generate
+import worlds
+
+
+class PoolCreated(Exception):
+    pass
+
+
+class TestBatchGenerate(unittest.TestCase):
+    """This tests BatchGenerate.py main"""
+
+    generate_dir = Path(Generate.__file__).parent
+    input_dir = Path(__file__).parent / "data" / "one_player"
+
+    def setUp(self):
+        self.original_local_path = Generate.Utils.local_path.cached_path
+        self.original_user_path = Generate.Utils.user_path.cached_path
+        self.original_output_path = getattr(Generate.Utils.output_path, "cached_path", None)
+        # keep host.yaml and log files out of the checkout
+        self.user_tempdir = TemporaryDirectory(prefix="AP_user_")
+        Generate.Utils.local_path.cached_path = str(self.generate_dir)
+        Generate.Utils.user_path.cached_path = self.user_tempdir.name
+        self.output_tempdir = TemporaryDirectory(prefix="AP_out_")
+        init_logging = mock.patch.object(Generate.Utils, "init_logging")
+        init_logging.start()
+        self.addCleanup(init_logging.stop)
+
+    def tearDown(self):
+        self.output_tempdir.cleanup()
+        self.user_tempdir.cleanup()
+        Generate.Utils.local_path.cached_path = self.original_local_path
+        Generate.Utils.user_path.cached_path = self.original_user_path
+        if self.original_output_path is None:
+            if hasattr(Generate.Utils.output_path, "cached_path"):
+                del Generate.Utils.output_path.cached_path
+        else:
+            Generate.Utils.output_path.cached_path = self.original_output_path
+
+    def get_args(self, processes: int):
+        return BatchGenerate.batch_argparse([str(self.input_dir), "--seeds", "2", "--seed", "0",
+                                             "--processes", str(processes), "--outputpath", self.output_tempdir.name])
+
+    def generate(self, processes: int):
+        results = BatchGenerate.main(self.get_args(processes))
+
+        self.assertEqual([0, 1], [result["seed"] for result in results])
+        for result in results:
+            self.assertTrue(result["success"], result["error"])
+        self.assertEqual(2, len(list(Path(self.output_tempdir.name).glob("*.zip"))))
+        with open(os.path.join(self.output_tempdir.name, "batch_summary.json")) as f:
+            summary = json.load(f)
+        self.assertEqual(2, summary["generated"])
+        self.assertEqual(0, summary["failed"])
+
+    def test_generate_in_process(self):
+        self.generate(1)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requires fork")
+    def test_generate_forked(self):
+        self.generate(2)
+
+    def test_worlds_imported_before_pool(self):
+        """All worlds are imported before the worker processes are created, so forked workers share them."""
+        not_imported = []
+
+        class Context:
+            def Pool(self, *args, **kwargs):
+                not_imported.extend(source.module_name for source in worlds.world_sources
+                                    if source.loaded is not False and source.module_name not in sys.modules)
+                raise PoolCreated
+
+        with mock.patch.object(BatchGenerate.multiprocessing, "get_context", return_value=Context()):
+            with self.assertRaises(PoolCreated):
+                BatchGenerate.main(self.get_args(2))
+        self.assertEqual([], not_imported)
@@ -1,9 +1,11 @@
 # Tests for Generate.py (ArchipelagoGenerate.exe)
 
+import json
 import unittest
 import os
 import os.path
 import sys
+import zipfile
 
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -72,6 +74,41 @@ class TestGenerateMain(unittest.TestCase):
 
         self.assertOutput(self.output_tempdir.name)
 
+    def test_generate_profile(self):
+        sys.argv = [sys.argv[0], '--seed', '0', '--profile',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name]
+        print(f'Testing Generate.py {sys.argv} in {os.getcwd()}')
+        Main.main(*Generate.main())
+
+        self.assertOutput(self.output_tempdir.name)
+        profile_files = list(Path(self.output_tempdir.name).glob('*_profile.json'))
+        self.assertEqual(len(profile_files), 1)
+        with open(profile_files[0]) as f:
+            records = json.load(f)
+        stages = {record["stage"] for record in records}
+        for stage in ("generate_early", "create_regions", "distribute_items_restrictive", "write_multidata",
+                      "write_archive"):
+            self.assertIn(stage, stages)
+        self.assertTrue(any(stage.startswith("fill_restrictive ") for stage in stages))
+        self.assertTrue(all(record["player"] == 1 for record in records if record["stage"] == "create_regions"))
+        self.assertTrue(profile_files[0].with_suffix('.csv').exists())
+
+    def test_generate_multidata_compression(self):
+        sys.argv = [sys.argv[0], '--seed', '0', '--multidata_compression_level', '1',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name]
+        print(f'Testing Generate.py {sys.argv} in {os.getcwd()}')
+        Main.main(*Generate.main())
+
+        self.assertOutput(self.output_tempdir.name)
+        from MultiServer import Context
+        with zipfile.ZipFile(next(Path(self.output_tempdir.name).glob('*.zip'))) as zf:
+            data = zf.read(next(name for name in zf.namelist() if name.endswith('.archipelago')))
+        self.assertEqual(data[0], 3)
+        multidata = Context.decompress(data)
+        self.assertEqual(set(multidata["slot_info"]), {1})
+
     def test_generate_yaml(self):
         # override host.yaml
         from settings import get_settings
@@ -92,3 +129,65 @@ class TestGenerateMain(unittest.TestCase):
             user_path.cached_path = user_path_backup
 
         self.assertOutput(self.output_tempdir.name)
+
+
+class TestOutputArchive(unittest.TestCase):
+    def test_compression(self):
+        """Text gets compressed, archives get stored as they are, and a failed output leaves no archive."""
+        from BaseClasses import MultiWorld
+        with TemporaryDirectory() as temp_dir:
+            text_path = os.path.join(temp_dir, 'text.txt')
+            with open(text_path, 'w') as f:
+                f.write('spoiler line\n' * 1000)
+            patch_path = os.path.join(temp_dir, 'patch.apbp')
+            with zipfile.ZipFile(patch_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr('data.bin', os.urandom(10000))
+
+            archive_path = os.path.join(temp_dir, 'AP.zip')
+            with Main.OutputArchive(archive_path, MultiWorld(1)) as archive:
+                archive.add(text_path)
+                archive.add(patch_path)
+                archive.wait()
+            with zipfile.ZipFile(archive_path) as zf:
+                self.assertEqual({info.filename: info.compress_type for info in zf.infolist()},
+                                 {'text.txt': zipfile.ZIP_DEFLATED, 'patch.apbp': zipfile.ZIP_STORED})
+                self.assertEqual(zf.read('text.txt'), b'spoiler line\n' * 1000)
+                self.assertIsNone(zf.testzip())
+
+            with self.assertRaises(FileNotFoundError):
+                with Main.OutputArchive(archive_path, MultiWorld(1)) as archive:
+                    archive.add(os.path.join(temp_dir, 'missing.txt'))
+                    archive.wait()
+            self.assertFalse(os.path.exists(archive_path))
+
+    def test_directories(self):
+        """Files of several output tasks end up complete and in order, and duplicate names are skipped."""
+        from BaseClasses import MultiWorld
+        with TemporaryDirectory() as temp_dir:
+            contents = {}
+            for index in range(8):
+                directory = os.path.join(temp_dir, str(index))
+                os.mkdir(directory)
+                contents[f'{index}.txt'] = f'output of task {index}\n'.encode() * ((index + 1) * 20000)
+                with open(os.path.join(directory, f'{index}.txt'), 'wb') as f:
+                    f.write(contents[f'{index}.txt'])
+            with open(os.path.join(temp_dir, '0', 'empty.txt'), 'wb'):
+                pass
+            contents['empty.txt'] = b''
+            with open(os.path.join(temp_dir, '1', '0.txt'), 'wb') as f:
+                f.write(b'duplicate')
+
+            archive_path = os.path.join(temp_dir, 'AP.zip')
+            with Main.OutputArchive(archive_path, MultiWorld(1)) as archive:
+                with self.assertLogs(level='WARNING'):
+                    for index in range(8):
+                        archive.add_directory(os.path.join(temp_dir, str(index)))
+                archive.wait()
+            with zipfile.ZipFile(archive_path) as zf:
+                self.assertIsNone(zf.testzip())
+                self.assertEqual(zf.namelist(), ['0.txt', 'empty.txt', '1.txt', '2.txt', '3.txt', '4.txt', '5.txt',
+                                                 '6.txt', '7.txt'])
+                for name, content in contents.items():
+                    self.assertEqual(zf.read(name), content)
+                    if content:
+                        self.assertEqual(zf.getinfo(name).compress_type, zipfile.ZIP_DEFLATED)
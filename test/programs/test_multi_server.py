@@ -1,5 +1,12 @@
+import asyncio
+import os
+import tempfile
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+
+from MultiServer import Client, Context, ServerCommandProcessor, encode_data_package, get_received_items, \
+    send_items_to, send_new_items
+from NetUtils import ClientStatus, Endpoint, Hint, NetworkItem, decode
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +45,253 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class RecordingContext(Context):
+    frames: typing.List[typing.Tuple[typing.List[Endpoint], str]]
+
+    def __init__(self) -> None:
+        super().__init__("", 0, "", "", 0, 0, False)
+        self.frames = []
+
+    def _broadcast_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
+        self.frames.append((list(endpoints), msg))
+        return True
+
+
+class TestOutbox(unittest.TestCase):
+    def test_coalescing(self) -> None:
+        """Messages queued within an event loop iteration reach each endpoint as one frame."""
+        ctx = RecordingContext()
+        first, second = Endpoint(None), Endpoint(None)
+
+        async def queue() -> None:
+            ctx.queue_msgs([first, second], [{"cmd": "PrintJSON", "data": [{"text": "1"}]},
+                                             {"cmd": "PrintJSON", "data": [{"text": "2"}]}])
+            ctx.queue_msgs([first], [{"cmd": "RoomUpdate", "checked_locations": [3]}])
+            ctx.queue_msgs([], [{"cmd": "RoomUpdate", "checked_locations": [4]}])
+            self.assertEqual(ctx.frames, [])
+            await asyncio.sleep(0)
+
+        asyncio.run(queue())
+        frames = {tuple(endpoints): decode(msg) for endpoints, msg in ctx.frames}
+        self.assertEqual(len(ctx.frames), 2)
+        self.assertEqual([msg["cmd"] for msg in frames[first,]], ["PrintJSON", "PrintJSON", "RoomUpdate"])
+        self.assertEqual([msg["cmd"] for msg in frames[second,]], ["PrintJSON", "PrintJSON"])
+
+    def test_budget(self) -> None:
+        """Messages beyond the budget wait for the next event loop iteration, keeping their order."""
+        ctx = RecordingContext()
+        ctx.outbox_budget = 2
+        endpoint = Endpoint(None)
+
+        async def queue() -> None:
+            for index in range(3):
+                ctx.queue_msgs([endpoint], [{"cmd": "RoomUpdate", "checked_locations": [index]},
+                                            {"cmd": "RoomUpdate", "checked_locations": [index]}])
+            await asyncio.sleep(0)
+            self.assertEqual(len(ctx.frames), 1)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        asyncio.run(queue())
+        self.assertEqual(len(ctx.frames), 3)
+        self.assertEqual([msg["checked_locations"] for _, frame in ctx.frames for msg in decode(frame)],
+                         [[0], [0], [1], [1], [2], [2]])
+
+
+    def test_broadcast_order(self) -> None:
+        """Direct broadcasts don't overtake queued messages, even when those wait for the next iteration."""
+        ctx = RecordingContext()
+        ctx.outbox_budget = 1
+        endpoint = Endpoint(None)
+
+        async def send() -> None:
+            for index in range(3):
+                ctx.queue_msgs([endpoint], [{"cmd": "RoomUpdate", "checked_locations": [index]}])
+            await asyncio.sleep(0)
+            ctx.broadcast([endpoint], [{"cmd": "PrintJSON", "data": [{"text": "goal"}]}])
+            ctx.queue_msgs([endpoint], [{"cmd": "RoomUpdate", "checked_locations": [3]}])
+            for _ in range(3):
+                await asyncio.sleep(0)
+
+        asyncio.run(send())
+        self.assertEqual([msg.get("checked_locations", msg["cmd"]) for _, frame in ctx.frames
+                          for msg in decode(frame)], [[0], [1], [2], "PrintJSON", [3]])
+
+
+class TestSendNewItems(unittest.TestCase):
+    def test_receivers(self) -> None:
+        """Only clients of slots that were sent items since the last call get ReceivedItems."""
+        ctx = RecordingContext()
+        clients = {}
+        for slot in (1, 2):
+            client = clients[slot] = Client(None, ctx)
+            client.team, client.slot = 0, slot
+            client.items_handling = 0b111
+        ctx.clients = {0: {slot: [client] for slot, client in clients.items()}}
+        # not sent through send_items_to, so not noted as new
+        get_received_items(ctx, 0, 2, True).append(NetworkItem(1, 1, 1, 0))
+
+        async def send() -> None:
+            send_items_to(ctx, 0, 1, NetworkItem(2, 2, 2, 0))
+            self.assertEqual(ctx.new_items_receivers, {(0, 1)})
+            send_new_items(ctx)
+            self.assertEqual(ctx.new_items_receivers, set())
+            send_new_items(ctx)
+            await asyncio.sleep(0)
+
+        asyncio.run(send())
+        self.assertEqual(clients[1].send_index, 1)
+        self.assertEqual(clients[2].send_index, 0)
+        self.assertEqual([(endpoints, [msg["cmd"] for msg in decode(frame)]) for endpoints, frame in ctx.frames],
+                         [([clients[1]], ["ReceivedItems"])])
+
+
+class TestEncodedCache(unittest.TestCase):
+    def test_data_package(self) -> None:
+        """The spliced DataPackage matches encoding it whole, and each game is only encoded once."""
+        ctx = RecordingContext()
+        games = ["Archipelago", "Clique"]
+        expected = ctx.dumper([{"cmd": "DataPackage", "data": {"games": {game: ctx.gamespackage[game]
+                                                                          for game in games}}}])
+        self.assertEqual(decode(encode_data_package(ctx, games)), decode(expected))
+        self.assertIs(ctx.get_encoded_game_package("Clique"), ctx.get_encoded_game_package("Clique"))
+        self.assertIsNot(RecordingContext().get_encoded_game_package("Clique"), ctx.get_encoded_game_package("Clique"))
+
+    def test_encode_with(self) -> None:
+        ctx = RecordingContext()
+        values = []
+        encoded = ctx.get_encoded("players", lambda: values)
+        values.append(1)
+        self.assertEqual(ctx.get_encoded("players", lambda: values), encoded)
+        ctx.encoded_cache.pop("players")
+        self.assertEqual(decode(ctx.encode_with({"cmd": "RoomUpdate"},
+                                                {"players": ctx.get_encoded("players", lambda: values)})),
+                         {"cmd": "RoomUpdate", "players": [1]})
+
+
+class JournalingContext(Context):
+    def __init__(self, save_filename: str) -> None:
+        super().__init__("", 0, "", "", 0, 0, False, save_journal=True)
+        self.save_filename = save_filename
+
+    def _start_async_saving(self, atexit_save: bool = True) -> None:
+        pass
+
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.save_filename = os.path.join(directory.name, "test.apsave")
+        self.ctx = JournalingContext(self.save_filename)
+        self.ctx.init_save()
+        self.assertTrue(self.ctx._save())
+
+    def change(self) -> None:
+        send_items_to(self.ctx, 0, 1, NetworkItem(2, 2, 2, 0))
+        self.ctx.location_checks[0, 2] |= {2}
+        self.ctx.journal("location_checks", 0, 2, {2})
+        self.ctx.stored_data["key"] = [1]
+        self.ctx.journal("stored_data", "key", [1])
+        self.ctx.client_game_state[0, 1] = ClientStatus.CLIENT_GOAL
+        self.ctx.journal("client_game_state", 0, 1, ClientStatus.CLIENT_GOAL)
+        self.ctx.hints_used[0, 1] = 3
+
+    def load(self) -> Context:
+        ctx = JournalingContext(self.save_filename)
+        ctx.init_save()
+        return ctx
+
+    def assert_changed(self, ctx: Context) -> None:
+        self.assertEqual(get_received_items(ctx, 0, 1, True), [NetworkItem(2, 2, 2, 0)])
+        self.assertEqual(get_received_items(ctx, 0, 1, False), [NetworkItem(2, 2, 2, 0)])
+        self.assertEqual(ctx.location_checks[0, 2], {2})
+        self.assertEqual(ctx.stored_data["key"], [1])
+        self.assertEqual(ctx.client_game_state[0, 1], ClientStatus.CLIENT_GOAL)
+        self.assertEqual(ctx.hints_used[0, 1], 3)
+
+    def test_replay(self) -> None:
+        """Changes are appended to the journal without rewriting the save file, and replayed when loading."""
+        with open(self.save_filename, "rb") as f:
+            snapshot = f.read()
+        self.change()
+        self.assertTrue(self.ctx._save())
+        with open(self.save_filename, "rb") as f:
+            self.assertEqual(f.read(), snapshot)
+        self.assert_changed(self.load())
+
+    def test_replay_twice(self) -> None:
+        """Items already in the save file are not received again when their journal entries are replayed."""
+        self.change()
+        self.assertTrue(self.ctx._save())
+        ctx = self.load()
+        send_items_to(ctx, 0, 1, NetworkItem(3, 3, 2, 0))
+        self.assertTrue(ctx._save(True))
+        with open(ctx.journal_filename, "ab") as f, open(self.ctx.journal_filename, "rb") as old_journal:
+            f.write(old_journal.read())  # replayed records of the old journal, that are already in the save
+        self.assertEqual(len(get_received_items(self.load(), 0, 1, True)), 2)
+
+    def test_compaction(self) -> None:
+        """Once the journal gets long, or on exit, the next save writes the whole save file again."""
+        self.assertEqual(len(self.ctx._read_journal()), 1)  # only the header
+        self.ctx.journal_compaction_records = 6
+        self.change()
+        self.assertTrue(self.ctx._save())
+        self.assertGreater(len(self.ctx._read_journal()), 1)
+
+        self.ctx.stored_data["other key"] = 2
+        self.ctx.journal("stored_data", "other key", 2)
+        self.assertTrue(self.ctx._save())
+        self.assertEqual(len(self.ctx._read_journal()), 1)
+        self.assert_changed(self.load())
+
+        self.ctx.journal("stored_data", "other key", 2)
+        self.assertTrue(self.ctx._save())
+        self.assertGreater(len(self.ctx._read_journal()), 1)
+        self.assertTrue(self.ctx._save(True))
+        self.assertEqual(len(self.ctx._read_journal()), 1)
+        self.assertEqual(self.load().stored_data["other key"], 2)
+
+    def test_saving_disabled(self) -> None:
+        """Without saving, changes are not kept around for a journal that is never written."""
+        ctx = JournalingContext(self.save_filename)
+        ctx.init_save(False)
+        ctx.journal("stored_data", "key", [1])
+        self.assertEqual(ctx.journal_records, [])
+
+    def test_rechecked_hints(self) -> None:
+        """Hints found since they were given are journaled when they get checked again."""
+        hint = Hint(1, 2, 5, 6, False)
+        self.ctx.hints[0, 1].add(hint)
+        self.assertTrue(self.ctx._save(True))
+        self.ctx.location_checks[0, 2] |= {5}
+        self.ctx.journal("location_checks", 0, 2, {5})
+        self.ctx.recheck_hints(0, 1)
+        self.assertTrue(self.ctx._save())
+        self.assertIn(("hints", 0, 1, frozenset({hint._replace(found=True)})), self.ctx._read_journal())
+        self.assertEqual(self.load().hints[0, 1], {hint._replace(found=True)})
+
+    def test_torn_journal(self) -> None:
+        """A journal cut off while appending loads up to the last complete entry."""
+        self.change()
+        self.assertTrue(self.ctx._save())
+        self.ctx.stored_data["key"] = [2]
+        self.ctx.journal("stored_data", "key", [2])
+        self.assertTrue(self.ctx._save())
+        with open(self.ctx.journal_filename, "rb+") as f:
+            f.truncate(os.path.getsize(self.ctx.journal_filename) - 1)
+        self.assert_changed(self.load())
+
+    def test_stale_journal(self) -> None:
+        """A journal left over from before the last save file was written is not replayed."""
+        self.change()
+        self.assertTrue(self.ctx._save())
+        with open(self.ctx.journal_filename, "rb") as f:
+            journal = f.read()
+        ctx = JournalingContext(self.save_filename)
+        self.assertTrue(ctx._save())
+        with open(ctx.journal_filename, "wb") as f:
+            f.write(journal)
+        self.assertEqual(self.load().stored_data, {})
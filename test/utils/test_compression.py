@@ -0,0 +1,36 @@
+# Tests for pickle_compressed and decompress in Utils.py
+
+import importlib.util
+import io
+import pickle
+import unittest
+import zlib
+
+from Utils import decompress, pickle_compressed
+
+
+class TestPickleCompressed(unittest.TestCase):
+    data = {"locations": {player: {address: (address, player, 0) for address in range(10000)}
+                          for player in range(1, 4)},
+            "blob": bytes(range(256)) * 1000}
+
+    def dump(self, compression: str, level: int = 9) -> bytes:
+        file = io.BytesIO()
+        pickle_compressed(self.data, file, compression, level)
+        return file.getvalue()
+
+    def test_zlib(self) -> None:
+        """The stream is readable by zlib.decompress, like multidata of format version 3 always was."""
+        for level in (1, 9):
+            with self.subTest(level=level):
+                data = self.dump("zlib", level)
+                self.assertEqual(pickle.loads(zlib.decompress(data)), self.data)
+                self.assertEqual(pickle.loads(decompress(data)), self.data)
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "zstandard is not installed")
+    def test_zstd(self) -> None:
+        self.assertEqual(pickle.loads(decompress(self.dump("zstd", 3), "zstd")), self.data)
+
+    def test_unknown(self) -> None:
+        with self.assertRaises(ValueError):
+            self.dump("lzma")
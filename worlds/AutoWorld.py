@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import concurrent.futures
 import hashlib
 import logging
 import pathlib
@@ -10,6 +11,7 @@ from dataclasses import make_dataclass
 from typing import (Any, Callable, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Set, TextIO, Tuple,
                     TYPE_CHECKING, Type, Union)
 
+from GenerationProfile import measure
 from Options import item_and_loc_options, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState
 
@@ -173,19 +175,45 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
         return ret
 
 
+def call_step(multiworld: "MultiWorld", method_name: str, player: int, *args: Any) -> Any:
+    """Like call_single, but measured as a step of the player's world when profiling."""
+    with measure(multiworld, method_name, multiworld.worlds[player].game, player):
+        return call_single(multiworld, method_name, player, *args)
+
+
 def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types: Set[AutoWorldRegister] = set()
-    for player in multiworld.player_ids:
-        prev_item_count = len(multiworld.itempool)
-        world_types.add(multiworld.worlds[player].__class__)
-        call_single(multiworld, method_name, player, *args)
-        if __debug__:
-            new_items = multiworld.itempool[prev_item_count:]
-            for i, item in enumerate(new_items):
-                for other in new_items[i+1:]:
-                    assert item is not other, (
-                        f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
-                        f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+    isolated: List[int] = []
+    if multiworld.generation_threads > 1:
+        isolated = [player for player in multiworld.player_ids
+                    if method_name in multiworld.worlds[player].isolated_stages]
+    isolated_futures: List[concurrent.futures.Future[Any]] = []
+    executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    if isolated:
+        # these run alongside the other worlds, which are called one after the other in this thread
+        executor = concurrent.futures.ThreadPoolExecutor(min(multiworld.generation_threads, len(isolated)),
+                                                         thread_name_prefix=method_name)
+        isolated_futures = [executor.submit(call_step, multiworld, method_name, player, *args)
+                            for player in isolated]
+    try:
+        for player in multiworld.player_ids:
+            if player in isolated:
+                continue
+            prev_item_count = len(multiworld.itempool)
+            world_types.add(multiworld.worlds[player].__class__)
+            call_step(multiworld, method_name, player, *args)
+            if __debug__:
+                new_items = multiworld.itempool[prev_item_count:]
+                for i, item in enumerate(new_items):
+                    for other in new_items[i+1:]:
+                        assert item is not other, (
+                            f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
+                            f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+    finally:
+        if executor:
+            executor.shutdown()
+    for future in isolated_futures:
+        future.result()
 
     call_stage(multiworld, method_name, *args)
 
@@ -195,7 +223,8 @@ def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     for world_type in sorted(world_types, key=lambda world: world.__name__):
         stage_callable = getattr(world_type, f"stage_{method_name}", None)
         if stage_callable:
-            _timed_call(stage_callable, multiworld, *args)
+            with measure(multiworld, f"stage_{method_name}", world_type.game):
+                _timed_call(stage_callable, multiworld, *args)
 
 
 class WebWorld(metaclass=WebWorldRegister):
@@ -289,6 +318,37 @@ class World(metaclass=AutoWorldRegister):
     hidden: ClassVar[bool] = False
     """Hide World Type from various views. Does not remove functionality."""
 
+    incremental_reachability: ClassVar[bool] = False
+    """
+    Opt in to incremental reachability. Only enable this if all access rules of this world exclusively depend on
+    CollectionState.prog_items and region reachability, as state.sweep_for_events then skips re-evaluating rules whose
+    dependencies did not change, and state.remove keeps regions that did not depend on the removed item.
+    """
+
+    detect_indirect_conditions: ClassVar[bool] = False
+    """
+    Check after generate_basic which regions the access rules of this world's entrances check the reachability of,
+    registering those missing from multiworld.register_indirect_condition. Costs two extra evaluations of every rule.
+    Regardless of this, states tracking dependencies for incremental_reachability register what their searches find.
+    """
+
+    isolated_stages: ClassVar[FrozenSet[str]] = frozenset()
+    """
+    Names of generation steps, like "create_regions" or "set_rules", that may run in a thread alongside the other
+    worlds when MultiWorld.generation_threads is above 1. Only list a step if it exclusively touches this player's
+    data: it may register its own regions, locations, entrances, indirect conditions and rules, which are guarded
+    by locks, but must not use multiworld.random, add to multiworld.itempool or read other worlds.
+    """
+
+    array_inventory: ClassVar[bool] = False
+    """
+    Opt in to keeping this world's CollectionState.prog_items in an array-backed BaseClasses.ItemCounts instead of a
+    Counter, which makes state copies cheaper and lets compiled rules look up items by slot. Only enable this if the
+    world uses prog_items like a mapping of item name to count, not like a Counter.
+    """
+    item_slots: Dict[str, int]
+    """Slot of each item name in the ItemCounts of this world's player, if array_inventory is enabled."""
+
     web: ClassVar[WebWorld] = WebWorld()
     """see WebWorld for options"""
 
@@ -326,6 +386,8 @@ class World(metaclass=AutoWorldRegister):
         self.player = player
         self.random = Random(multiworld.random.getrandbits(64))
         multiworld.per_slot_randoms[player] = self.random
+        if self.array_inventory:
+            self.item_slots = {item_name: slot for slot, item_name in enumerate(self.item_name_to_id)}
 
     def __getattr__(self, item: str) -> Any:
         if item == "settings":
@@ -498,6 +560,7 @@ class World(metaclass=AutoWorldRegister):
     # these two methods can be extended for pseudo-items on state
     def collect(self, state: "CollectionState", item: "Item") -> bool:
         """Called when an item is collected in to state. Useful for things such as progressive items or currency."""
+        state.unshare(self.player)
         name = self.collect_item(state, item)
         if name:
             state.prog_items[self.player][name] += 1
@@ -506,6 +569,7 @@ class World(metaclass=AutoWorldRegister):
 
     def remove(self, state: "CollectionState", item: "Item") -> bool:
         """Called when an item is removed from to state. Useful for things such as progressive items or currency."""
+        state.unshare(self.player)
         name = self.collect_item(state, item, True)
         if name:
             state.prog_items[self.player][name] -= 1
@@ -1,5 +1,6 @@
 import importlib
 import importlib.util
+import json
 import logging
 import os
 import sys
@@ -7,9 +8,9 @@ import warnings
 import zipimport
 import time
 import dataclasses
-from typing import Dict, List, TypedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, TypedDict, TypeVar
 
-from Utils import local_path, user_path
+from Utils import cache_path, get_file_safe_name, local_path, user_path, __version__
 
 local_folder = os.path.dirname(__file__)
 user_folder = user_path("worlds") if user_path() != local_path() else user_path("custom_worlds")
@@ -27,6 +28,11 @@ __all__ = {
     "GamesPackage",
     "DataPackage",
     "failed_world_loads",
+    "LazyDict",
+    "game_sources",
+    "get_hint_blacklist",
+    "load_all_worlds",
+    "world_settings_games",
 }
 
 
@@ -45,12 +51,77 @@ class DataPackage(TypedDict):
     games: Dict[str, GamesPackage]
 
 
+KT = TypeVar("KT")
+VT = TypeVar("VT")
+
+
+class LazyDict(Dict[KT, VT]):
+    """
+    A dict that fills in a key the first time it is looked up, and fills in everything before it is iterated over.
+    Pickles and copies to a regular dict.
+    """
+
+    def __init__(self, load: Callable[[KT], None], load_all: Callable[[], None]) -> None:
+        super().__init__()
+        self._load = load
+        self._load_all = load_all
+
+    def __missing__(self, key: KT) -> VT:
+        self._load(key)
+        if not super().__contains__(key):
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: object) -> bool:
+        if not super().__contains__(key):
+            self._load(key)  # type: ignore[arg-type]
+        return super().__contains__(key)
+
+    def get(self, key: KT, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def __iter__(self) -> Iterator[KT]:
+        self._load_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._load_all()
+        return super().__len__()
+
+    def keys(self):  # type: ignore[override]
+        self._load_all()
+        return super().keys()
+
+    def values(self):  # type: ignore[override]
+        self._load_all()
+        return super().values()
+
+    def items(self):  # type: ignore[override]
+        self._load_all()
+        return super().items()
+
+    def copy(self) -> Dict[KT, VT]:
+        return dict(self.items())
+
+    def __eq__(self, other: object) -> bool:
+        self._load_all()
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        self._load_all()
+        return super().__repr__()
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[KT, VT]]]:
+        return dict, (self.copy(),)
+
+
 @dataclasses.dataclass(order=True)
 class WorldSource:
     path: str  # typically relative path from this module
     is_zip: bool = False
     relative: bool = True  # relative to regular world import folder
     time_taken: float = -1.0
+    loaded: Optional[bool] = dataclasses.field(default=None, compare=False)  # None until loading was attempted
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.path}, is_zip={self.is_zip}, relative={self.relative})"
@@ -61,7 +132,29 @@ class WorldSource:
             return os.path.join(local_folder, self.path)
         return self.path
 
+    @property
+    def module_name(self) -> str:
+        return f"worlds.{os.path.basename(self.path).rsplit('.', 1)[0]}"
+
+    @property
+    def stamp(self) -> List[int]:
+        """Changes whenever the code or data of this world source changes."""
+        if self.is_zip:
+            stat = os.stat(self.resolved_path)
+            return [stat.st_mtime_ns, stat.st_size]
+        newest = 0
+        count = 0
+        for root, dirs, files in os.walk(self.resolved_path):
+            dirs[:] = [directory for directory in dirs if directory != "__pycache__"]
+            for file in files:
+                newest = max(newest, os.stat(os.path.join(root, file)).st_mtime_ns)
+                count += 1
+        return [newest, count]
+
     def load(self) -> bool:
+        if self.loaded is not None:
+            return self.loaded
+        self.loaded = False
         try:
             start = time.perf_counter()
             if self.is_zip:
@@ -84,6 +177,7 @@ class WorldSource:
             else:
                 importlib.import_module(f".{self.path}", "worlds")
             self.time_taken = time.perf_counter()-start
+            self.loaded = True
             return True
 
         except Exception:
@@ -116,16 +210,140 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
                     logging.warning(f"excluding {entry.name} from world sources because it has no __init__.py")
             elif entry.is_file() and entry.name.endswith(".apworld"):
                 world_sources.append(WorldSource(file_name, is_zip=True, relative=relative))
-
-# import all submodules to trigger AutoWorldRegister
 world_sources.sort()
-for world_source in world_sources:
-    world_source.load()
 
-# Build the data package for each game.
-from .AutoWorld import AutoWorldRegister
+game_sources: Dict[str, WorldSource] = {}
+"""the world source registering each game, so it can be imported once the game is first looked up"""
+world_settings_games: Dict[str, str] = {}
+"""settings_key -> game of every world that has settings in host.yaml"""
+_game_entries: Dict[str, Dict[str, Any]] = {}
+
+
+def load_all_worlds() -> None:
+    """Imports every world source that was not imported yet."""
+    for world_source in world_sources:
+        world_source.load()
 
+
+def _load_game(game: str) -> None:
+    world_source = game_sources.get(game)
+    if world_source:
+        world_source.load()
+
+
+def _data_package_path(game: str, checksum: str) -> str:
+    return cache_path("worlds", "datapackage", get_file_safe_name(game), f"{checksum}.json")
+
+
+def _load_game_package(game: str) -> None:
+    entry = _game_entries.get(game)
+    # an imported world builds its own, as not every world's data package is ordered the same in every process
+    if entry and not dict.__contains__(AutoWorldRegister.world_types, game):
+        try:
+            with open(_data_package_path(game, entry["checksum"]), encoding="utf-8") as f:
+                game_package: GamesPackage = json.load(f)
+            if game_package["checksum"] == entry["checksum"]:
+                dict.__setitem__(network_data_package["games"], game, game_package)
+                return
+        except Exception as e:
+            logging.debug(f"Could not load cached data package of {game}: {e}")
+    if game in AutoWorldRegister.world_types:
+        dict.__setitem__(network_data_package["games"], game,
+                         AutoWorldRegister.world_types[game].get_data_package_data())
+
+
+def _load_all_game_packages() -> None:
+    for game in (*game_sources, *dict.keys(AutoWorldRegister.world_types)):
+        if not dict.__contains__(network_data_package["games"], game):
+            _load_game_package(game)
+
+
+# The data package for each game, read from the cache or built once the game is first looked up.
 network_data_package: DataPackage = {
-    "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
+    "games": LazyDict(_load_game_package, _load_all_game_packages),
 }
 
+
+def get_hint_blacklist(game: str) -> FrozenSet[str]:
+    """The hint_blacklist of a game's world, without importing the world if it is in the manifest."""
+    entry = _game_entries.get(game)
+    if entry:
+        return frozenset(entry["hint_blacklist"])
+    return AutoWorldRegister.world_types[game].hint_blacklist
+
+
+from .AutoWorld import AutoWorldRegister
+
+# Worlds register their game when imported, so look up which world source registers which game in a manifest,
+# which lets the world sources be imported only once their game is first looked up.
+AutoWorldRegister.world_types = LazyDict(_load_game, load_all_worlds)
+
+
+def _register_games(world_source: WorldSource) -> Dict[str, Dict[str, Any]]:
+    """Finds the games registered by an imported world source and caches their data packages."""
+    games: Dict[str, Dict[str, Any]] = {}
+    for game, world in dict.items(AutoWorldRegister.world_types):
+        if world.__module__ == world_source.module_name or world.__module__.startswith(world_source.module_name + "."):
+            annotation = world.__annotations__.get("settings", None)
+            has_settings = annotation is not None and annotation != "ClassVar[Optional['Group']]"
+            game_package = world.get_data_package_data()
+            dict.__setitem__(network_data_package["games"], game, game_package)
+            try:
+                path = _data_package_path(game, game_package["checksum"])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(game_package, f, ensure_ascii=False, separators=(",", ":"))
+            except Exception as e:
+                logging.debug(f"Could not store data package of {game}: {e}")
+            games[game] = {
+                "settings_key": world.settings_key if has_settings else None,
+                "checksum": game_package["checksum"],
+                "hint_blacklist": sorted(world.hint_blacklist),
+            }
+    return games
+
+
+def _load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["version"] == manifest_version:
+            return manifest["sources"]
+    except Exception as e:
+        logging.debug(f"Could not load world manifest: {e}")
+    return {}
+
+
+def _store_manifest(path: str, sources: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": manifest_version, "sources": sources}, f)
+    except Exception as e:
+        logging.debug(f"Could not store world manifest: {e}")
+
+
+def _index_world_sources(manifest_path: str) -> None:
+    old_manifest = _load_manifest(manifest_path)
+    new_manifest: Dict[str, Any] = {}
+    for world_source in world_sources:
+        stamp = world_source.stamp
+        manifest_entry = old_manifest.get(world_source.resolved_path)
+        if not manifest_entry or manifest_entry["stamp"] != stamp or not manifest_entry["games"]:
+            # new or changed world sources, and those that do not register a game, get imported right away
+            if not world_source.load():
+                continue
+            manifest_entry = {"stamp": stamp, "games": _register_games(world_source)}
+        new_manifest[world_source.resolved_path] = manifest_entry
+        for game, game_entry in manifest_entry["games"].items():
+            game_sources[game] = world_source
+            _game_entries[game] = game_entry
+            if game_entry["settings_key"]:
+                world_settings_games[game_entry["settings_key"]] = game
+    if new_manifest != old_manifest:
+        _store_manifest(manifest_path, new_manifest)
+
+
+manifest_version = f"{__version__}-1"
+"""bump the suffix whenever the layout of the manifest changes"""
+_index_world_sources(cache_path("worlds", "manifest.json"))
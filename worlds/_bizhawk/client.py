@@ -55,6 +55,8 @@ class AutoBizHawkClientRegister(abc.ABCMeta):
 
     @staticmethod
     async def get_handler(ctx: "BizHawkClientContext", system: str) -> Optional[BizHawkClient]:
+        from .. import load_all_worlds
+        load_all_worlds()
         for systems, handlers in AutoBizHawkClientRegister.game_handlers.items():
             if system in systems:
                 for handler in handlers.values():
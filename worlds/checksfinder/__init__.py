@@ -29,6 +29,8 @@ class ChecksFinderWorld(World):
     option_definitions = checksfinder_options
     topology_present = True
     web = ChecksFinderWeb()
+    array_inventory = True
+    isolated_stages = frozenset({"create_regions", "set_rules"})
 
     item_name_to_id = {name: data.code for name, data in item_table.items()}
     location_name_to_id = {name: data.id for name, data in advancement_table.items()}
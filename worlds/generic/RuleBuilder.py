@@ -0,0 +1,578 @@
+"""
+Declarative access rules, as an alternative to writing rules as lambdas.
+
+    set_rule(location, Has("Hookshot") & (HasGroup("Swords", 2) | CanReach("Armory")))
+
+Rules get compiled for a world's player when set: item groups are resolved to their item names, nested And/Or are
+flattened, constant parts are folded away and item checks of the same player are merged, before the rule is turned
+into a small evaluator that only looks up the player's prog_items once. For worlds with array_inventory, the
+evaluators index the player's ItemCounts by item slot directly, unless item reads have to be tracked for
+incremental_reachability.
+"""
+from __future__ import annotations
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from BaseClasses import CollectionState, Entrance, Location, MultiWorld, Region
+    from worlds.AutoWorld import World
+
+    CollectionRule = typing.Callable[[CollectionState], bool]
+else:
+    CollectionRule = typing.Callable[[object], bool]
+
+__all__ = ["Rule", "Constant", "Has", "HasAll", "HasAny", "HasAllCounts", "HasFromList", "HasGroup", "CanReach",
+           "And", "Or", "compile_rule"]
+
+
+class Rule:
+    """Base class of all declarative rules. Combine them with & and |."""
+    __slots__ = ()
+
+    def __and__(self, other: Rule) -> Rule:
+        return And(self, other)
+
+    def __or__(self, other: Rule) -> Rule:
+        return Or(self, other)
+
+    def resolve(self, world: World) -> Rule:
+        """Returns the simplified equivalent of this rule for world's player."""
+        raise NotImplementedError
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        """Returns the evaluator of a resolved rule. Item rules use item slots if multiworld allows it."""
+        raise NotImplementedError
+
+    def build_reference(self) -> CollectionRule:
+        """Returns an evaluator of a resolved rule written like a lambda would be, to compare against."""
+        raise NotImplementedError
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self._key() == other._key()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._key()))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self._key()!r}"
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        raise NotImplementedError
+
+
+def compile_rule(rule: Rule, world: World) -> CollectionRule:
+    """Compiles rule for world's player. The evaluator keeps the rule it came from as its `rule` attribute."""
+    resolved = rule.resolve(world)
+    evaluator = resolved.build(world.multiworld)
+    try:
+        evaluator.rule = resolved  # type: ignore[attr-defined]
+    except AttributeError:  # shared constant evaluators
+        pass
+    return evaluator
+
+
+def _always_true(state: CollectionState) -> bool:
+    return True
+
+
+def _always_false(state: CollectionState) -> bool:
+    return False
+
+
+class Constant(Rule):
+    __slots__ = ("value",)
+    value: bool
+
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+    def resolve(self, world: World) -> Rule:
+        return self
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        return _always_true if self.value else _always_false
+
+    def build_reference(self) -> CollectionRule:
+        return self.build()
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.value,
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+class _ItemRule(Rule):
+    """A rule only looking at the items of a single player. player None means the player of the world."""
+    __slots__ = ("player",)
+    player: typing.Optional[int]
+
+    def _player(self, world: World) -> int:
+        return world.player if self.player is None else self.player
+
+    def _item_slots(self, multiworld: typing.Optional[MultiWorld]) -> typing.Optional[typing.Dict[str, int]]:
+        """The item slots of the player's ItemCounts, if evaluators may read them without going through tracking."""
+        if multiworld is None:
+            return None
+        world = multiworld.worlds.get(self.player)  # type: ignore[arg-type]
+        if not world or not world.array_inventory or \
+                any(other.incremental_reachability for other in multiworld.worlds.values()):
+            return None
+        return world.item_slots
+
+
+def _slot(item_slots: typing.Dict[str, int], item: str) -> int:
+    # states created before this slot was handed out have shorter counts, reading past them raises IndexError,
+    # states created before the world was have a Counter without counts, raising AttributeError
+    return item_slots.setdefault(item, len(item_slots))
+
+
+class Has(_ItemRule):
+    __slots__ = ("item", "count")
+    item: str
+    count: int
+
+    def __init__(self, item: str, count: int = 1, player: typing.Optional[int] = None) -> None:
+        self.item = item
+        self.count = count
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        if self.count <= 0:
+            return TRUE
+        return Has(self.item, self.count, self._player(world))
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        item, count, player = self.item, self.count, self.player
+
+        def has(state: CollectionState) -> bool:
+            return state.prog_items[player][item] >= count
+
+        item_slots = self._item_slots(multiworld)
+        if item_slots is None:
+            return has
+        slot = _slot(item_slots, item)
+
+        def has_slot(state: CollectionState) -> bool:
+            try:
+                return state.prog_items[player].counts[slot] >= count  # type: ignore[attr-defined]
+            except IndexError:
+                return False
+            except AttributeError:
+                return has(state)
+        return has_slot
+
+    def build_reference(self) -> CollectionRule:
+        return lambda state: state.has(self.item, self.player, self.count)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.item, self.count, self.player
+
+
+class HasAll(_ItemRule):
+    __slots__ = ("items",)
+    items: typing.Tuple[str, ...]
+
+    def __init__(self, *items: str, player: typing.Optional[int] = None) -> None:
+        self.items = tuple(dict.fromkeys(items))
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        if not self.items:
+            return TRUE
+        if len(self.items) == 1:
+            return Has(self.items[0], 1, self._player(world))
+        return HasAll(*self.items, player=self._player(world))
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        items, player = self.items, self.player
+
+        def has_all(state: CollectionState) -> bool:
+            player_prog_items = state.prog_items[player]
+            for item in items:
+                if not player_prog_items[item]:
+                    return False
+            return True
+
+        item_slots = self._item_slots(multiworld)
+        if item_slots is None:
+            return has_all
+        slots = tuple(_slot(item_slots, item) for item in items)
+
+        def has_all_slots(state: CollectionState) -> bool:
+            try:
+                counts = state.prog_items[player].counts  # type: ignore[attr-defined]
+                for slot in slots:
+                    if not counts[slot]:
+                        return False
+            except IndexError:
+                return False
+            except AttributeError:
+                return has_all(state)
+            return True
+        return has_all_slots
+
+    def build_reference(self) -> CollectionRule:
+        return lambda state: state.has_all(self.items, self.player)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player
+
+
+class HasAny(_ItemRule):
+    __slots__ = ("items",)
+    items: typing.Tuple[str, ...]
+
+    def __init__(self, *items: str, player: typing.Optional[int] = None) -> None:
+        self.items = tuple(dict.fromkeys(items))
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        if not self.items:
+            return FALSE
+        if len(self.items) == 1:
+            return Has(self.items[0], 1, self._player(world))
+        return HasAny(*self.items, player=self._player(world))
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        items, player = self.items, self.player
+
+        def has_any(state: CollectionState) -> bool:
+            player_prog_items = state.prog_items[player]
+            for item in items:
+                if player_prog_items[item]:
+                    return True
+            return False
+
+        item_slots = self._item_slots(multiworld)
+        if item_slots is None:
+            return has_any
+        # ascending, so all slots after one past the end are past the end too
+        slots = tuple(sorted(_slot(item_slots, item) for item in items))
+
+        def has_any_slot(state: CollectionState) -> bool:
+            try:
+                counts = state.prog_items[player].counts  # type: ignore[attr-defined]
+                for slot in slots:
+                    if counts[slot]:
+                        return True
+            except IndexError:
+                pass
+            except AttributeError:
+                return has_any(state)
+            return False
+        return has_any_slot
+
+    def build_reference(self) -> CollectionRule:
+        return lambda state: state.has_any(self.items, self.player)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player
+
+
+class HasAllCounts(_ItemRule):
+    __slots__ = ("counts",)
+    counts: typing.Tuple[typing.Tuple[str, int], ...]
+
+    def __init__(self, counts: typing.Mapping[str, int], player: typing.Optional[int] = None) -> None:
+        self.counts = tuple(counts.items())
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        counts = {item: count for item, count in self.counts if count > 0}
+        if not counts:
+            return TRUE
+        if len(counts) == 1:
+            item, count = next(iter(counts.items()))
+            return Has(item, count, self._player(world))
+        if all(count == 1 for count in counts.values()):
+            return HasAll(*counts, player=self._player(world))
+        return HasAllCounts(counts, self._player(world))
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        counts, player = self.counts, self.player
+
+        def has_all_counts(state: CollectionState) -> bool:
+            player_prog_items = state.prog_items[player]
+            for item, count in counts:
+                if player_prog_items[item] < count:
+                    return False
+            return True
+
+        item_slots = self._item_slots(multiworld)
+        if item_slots is None:
+            return has_all_counts
+        slot_counts = tuple((_slot(item_slots, item), count) for item, count in counts)
+
+        def has_all_slot_counts(state: CollectionState) -> bool:
+            try:
+                player_counts = state.prog_items[player].counts  # type: ignore[attr-defined]
+                for slot, count in slot_counts:
+                    if player_counts[slot] < count:
+                        return False
+            except IndexError:
+                return False
+            except AttributeError:
+                return has_all_counts(state)
+            return True
+        return has_all_slot_counts
+
+    def build_reference(self) -> CollectionRule:
+        return lambda state: state.has_all_counts(dict(self.counts), self.player)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.counts, self.player
+
+
+class HasFromList(_ItemRule):
+    """At least count items out of items, or of different items out of items if unique."""
+    __slots__ = ("items", "count", "unique")
+    items: typing.Tuple[str, ...]
+    count: int
+    unique: bool
+
+    def __init__(self, items: typing.Iterable[str], count: int = 1, unique: bool = False,
+                 player: typing.Optional[int] = None) -> None:
+        self.items = tuple(dict.fromkeys(items))
+        self.count = count
+        self.unique = unique
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        if self.count <= 0:
+            return TRUE
+        if not self.items or (self.unique and self.count > len(self.items)):
+            return FALSE
+        if self.count == 1:
+            return HasAny(*self.items, player=self._player(world)).resolve(world)
+        if self.unique and self.count == len(self.items):
+            return HasAll(*self.items, player=self._player(world)).resolve(world)
+        if len(self.items) == 1:
+            return Has(self.items[0], self.count, self._player(world))
+        return HasFromList(self.items, self.count, self.unique, self._player(world))
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        items, count, player = self.items, self.count, self.player
+        if self.unique:
+            def has_from_list(state: CollectionState) -> bool:
+                found = 0
+                player_prog_items = state.prog_items[player]
+                for item in items:
+                    if player_prog_items[item]:
+                        found += 1
+                        if found >= count:
+                            return True
+                return False
+        else:
+            def has_from_list(state: CollectionState) -> bool:
+                found = 0
+                player_prog_items = state.prog_items[player]
+                for item in items:
+                    found += player_prog_items[item]
+                    if found >= count:
+                        return True
+                return False
+
+        item_slots = self._item_slots(multiworld)
+        if item_slots is None:
+            return has_from_list
+        # ascending, so all slots after one past the end are past the end too
+        slots = tuple(sorted(_slot(item_slots, item) for item in items))
+        unique = self.unique
+
+        def has_from_list_slots(state: CollectionState) -> bool:
+            found = 0
+            try:
+                counts = state.prog_items[player].counts  # type: ignore[attr-defined]
+                for slot in slots:
+                    found += counts[slot] > 0 if unique else counts[slot]
+                    if found >= count:
+                        return True
+            except IndexError:
+                pass
+            except AttributeError:
+                return has_from_list(state)
+            return False
+        return has_from_list_slots
+
+    def build_reference(self) -> CollectionRule:
+        if self.unique:
+            return lambda state: state.has_from_list_unique(self.items, self.player, self.count)
+        return lambda state: state.has_from_list(self.items, self.player, self.count)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.count, self.unique, self.player
+
+
+class HasGroup(_ItemRule):
+    """At least count items of an item name group, resolved to its item names when compiled."""
+    __slots__ = ("group", "count", "unique")
+    group: str
+    count: int
+    unique: bool
+
+    def __init__(self, group: str, count: int = 1, unique: bool = False, player: typing.Optional[int] = None) -> None:
+        self.group = group
+        self.count = count
+        self.unique = unique
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        player = self._player(world)
+        items = world.multiworld.worlds[player].item_name_groups[self.group]
+        return HasFromList(sorted(items), self.count, self.unique, player).resolve(world)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.group, self.count, self.unique, self.player
+
+
+class CanReach(Rule):
+    """Reachability of a Region, Location or Entrance, looked up by name when compiled.
+    Entrance rules reaching for a Region still need the matching MultiWorld.register_indirect_condition."""
+    __slots__ = ("spot", "resolution_hint", "player")
+    spot: typing.Union[str, Region, Location, Entrance]
+    resolution_hint: str
+    player: typing.Optional[int]
+
+    def __init__(self, spot: typing.Union[str, Region, Location, Entrance], resolution_hint: str = "Region",
+                 player: typing.Optional[int] = None) -> None:
+        self.spot = spot
+        self.resolution_hint = resolution_hint
+        self.player = player
+
+    def resolve(self, world: World) -> Rule:
+        if not isinstance(self.spot, str):
+            return self
+        player = world.player if self.player is None else self.player
+        if self.resolution_hint == "Location":
+            spot = world.multiworld.get_location(self.spot, player)
+        elif self.resolution_hint == "Entrance":
+            spot = world.multiworld.get_entrance(self.spot, player)
+        else:
+            spot = world.multiworld.get_region(self.spot, player)
+        return CanReach(spot, self.resolution_hint, player)
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        return self.spot.can_reach  # type: ignore[union-attr]
+
+    def build_reference(self) -> CollectionRule:
+        return lambda state: state.can_reach(self.spot.name, self.resolution_hint, self.player)  # type: ignore
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.spot, self.resolution_hint, self.player
+
+
+class And(Rule):
+    __slots__ = ("rules",)
+    rules: typing.Tuple[Rule, ...]
+
+    def __init__(self, *rules: Rule) -> None:
+        self.rules = rules
+
+    def resolve(self, world: World) -> Rule:
+        rules: typing.List[Rule] = []
+        counts: typing.Dict[int, typing.Dict[str, int]] = {}
+        for rule in self.rules:
+            rule = rule.resolve(world)
+            for sub_rule in (rule.rules if isinstance(rule, And) else (rule,)):
+                if sub_rule == FALSE:
+                    return FALSE
+                if sub_rule == TRUE:
+                    continue
+                # item requirements of the same player all have to be met, so check them together
+                if isinstance(sub_rule, Has):
+                    player_counts = counts.setdefault(sub_rule.player, {})  # type: ignore[arg-type]
+                    player_counts[sub_rule.item] = max(player_counts.get(sub_rule.item, 0), sub_rule.count)
+                elif isinstance(sub_rule, HasAll):
+                    player_counts = counts.setdefault(sub_rule.player, {})  # type: ignore[arg-type]
+                    for item in sub_rule.items:
+                        player_counts[item] = max(player_counts.get(item, 0), 1)
+                elif isinstance(sub_rule, HasAllCounts):
+                    player_counts = counts.setdefault(sub_rule.player, {})  # type: ignore[arg-type]
+                    for item, count in sub_rule.counts:
+                        player_counts[item] = max(player_counts.get(item, 0), count)
+                elif sub_rule not in rules:
+                    rules.append(sub_rule)
+        item_rules = [HasAllCounts(player_counts, player).resolve(world) for player, player_counts in counts.items()]
+        # item checks are cheap, reachability may have to update the reachable regions
+        rules = item_rules + sorted(rules, key=lambda rule: isinstance(rule, CanReach))
+        if not rules:
+            return TRUE
+        if len(rules) == 1:
+            return rules[0]
+        return And(*rules)
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        evaluators = tuple(rule.build(multiworld) for rule in self.rules)
+        if len(evaluators) == 2:
+            first, second = evaluators
+            return lambda state: first(state) and second(state)
+
+        def all_of(state: CollectionState) -> bool:
+            for evaluator in evaluators:
+                if not evaluator(state):
+                    return False
+            return True
+        return all_of
+
+    def build_reference(self) -> CollectionRule:
+        evaluators = [rule.build_reference() for rule in self.rules]
+        return lambda state: all(evaluator(state) for evaluator in evaluators)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.rules
+
+
+class Or(Rule):
+    __slots__ = ("rules",)
+    rules: typing.Tuple[Rule, ...]
+
+    def __init__(self, *rules: Rule) -> None:
+        self.rules = rules
+
+    def resolve(self, world: World) -> Rule:
+        rules: typing.List[Rule] = []
+        any_items: typing.Dict[int, typing.Dict[str, None]] = {}
+        for rule in self.rules:
+            rule = rule.resolve(world)
+            for sub_rule in (rule.rules if isinstance(rule, Or) else (rule,)):
+                if sub_rule == TRUE:
+                    return TRUE
+                if sub_rule == FALSE:
+                    continue
+                # any single item of the same player will do, so check them together
+                if isinstance(sub_rule, Has) and sub_rule.count == 1:
+                    any_items.setdefault(sub_rule.player, {})[sub_rule.item] = None  # type: ignore[arg-type]
+                elif isinstance(sub_rule, HasAny):
+                    any_items.setdefault(sub_rule.player, {}).update(  # type: ignore[arg-type]
+                        dict.fromkeys(sub_rule.items))
+                elif sub_rule not in rules:
+                    rules.append(sub_rule)
+        item_rules = [HasAny(*items, player=player).resolve(world) for player, items in any_items.items()]
+        rules = item_rules + sorted(rules, key=lambda rule: isinstance(rule, CanReach))
+        if not rules:
+            return FALSE
+        if len(rules) == 1:
+            return rules[0]
+        return Or(*rules)
+
+    def build(self, multiworld: typing.Optional[MultiWorld] = None) -> CollectionRule:
+        evaluators = tuple(rule.build(multiworld) for rule in self.rules)
+        if len(evaluators) == 2:
+            first, second = evaluators
+            return lambda state: first(state) or second(state)
+
+        def any_of(state: CollectionState) -> bool:
+            for evaluator in evaluators:
+                if evaluator(state):
+                    return True
+            return False
+        return any_of
+
+    def build_reference(self) -> CollectionRule:
+        evaluators = [rule.build_reference() for rule in self.rules]
+        return lambda state: any(evaluator(state) for evaluator in evaluators)
+
+    def _key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.rules
@@ -1,8 +1,10 @@
 import collections
 import logging
+import types
 import typing
 
 from BaseClasses import LocationProgressType, MultiWorld, Location, Region, Entrance
+from .RuleBuilder import Rule, compile_rule
 
 if typing.TYPE_CHECKING:
     import BaseClasses
@@ -14,6 +16,14 @@ else:
     ItemRule = typing.Callable[[object], bool]
 
 
+def _is_default_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], name: str) -> bool:
+    """Whether the rule is still the empty one spots of its class start with."""
+    default = getattr(spot.__class__, name)
+    if isinstance(default, types.MemberDescriptorType):  # not overridden by a subclass
+        default = spot.slot_defaults[name]
+    return getattr(spot, name) is default
+
+
 def locality_needed(multiworld: MultiWorld) -> bool:
     for player in multiworld.player_ids:
         if multiworld.worlds[player].options.local_items.value:
@@ -69,7 +79,7 @@ def locality_rules(multiworld: MultiWorld):
             if (location.player, location.item_rule) in func_cache:
                 location.item_rule = func_cache[location.player, location.item_rule]
             # empty rule that just returns True, overwrite
-            elif location.item_rule is location.__class__.item_rule:
+            elif _is_default_rule(location, "item_rule"):
                 func_cache[location.player, location.item_rule] = location.item_rule = \
                     lambda i, sending_blockers = forbid_data[location.player], \
                                             old_rule = location.item_rule: \
@@ -96,14 +106,29 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
                 logging.warning(f"Unable to exclude location {loc_name} in player {player}'s world.")
 
 
-def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
-    spot.access_rule = rule
+def _compile_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+                  rule: typing.Union[CollectionRule, Rule]) -> CollectionRule:
+    if isinstance(rule, Rule):
+        return compile_rule(rule, spot.parent_region.multiworld.worlds[spot.player])
+    return rule
+
+
+def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[CollectionRule, Rule]):
+    spot.access_rule = _compile_rule(spot, rule)
 
 
-def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
+def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[CollectionRule, Rule], combine="and"):
     old_rule = spot.access_rule
+    old_rule_source = getattr(old_rule, "rule", None)
+    if isinstance(rule, Rule) and isinstance(old_rule_source, Rule):
+        # both declarative, so compile them together
+        spot.access_rule = _compile_rule(spot, rule & old_rule_source if combine == "and" else rule | old_rule_source)
+        return
+    rule = _compile_rule(spot, rule)
     # empty rule, replace instead of add
-    if old_rule is spot.__class__.access_rule:
+    if _is_default_rule(spot, "access_rule"):
         spot.access_rule = rule if combine == "and" else old_rule
     else:
         if combine == "and":
@@ -115,7 +140,7 @@ def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
 def forbid_item(location: "BaseClasses.Location", item: str, player: int):
     old_rule = location.item_rule
     # empty rule
-    if old_rule is location.__class__.item_rule:
+    if _is_default_rule(location, "item_rule"):
         location.item_rule = lambda i: i.name != item or i.player != player
     else:
         location.item_rule = lambda i: (i.name != item or i.player != player) and old_rule(i)
@@ -135,7 +160,7 @@ def forbid_items(location: "BaseClasses.Location", items: typing.Set[str]):
 def add_item_rule(location: "BaseClasses.Location", rule: ItemRule, combine: str = "and"):
     old_rule = location.item_rule
     # empty rule, replace instead of add
-    if old_rule is location.__class__.item_rule:
+    if _is_default_rule(location, "item_rule"):
         location.item_rule = rule if combine == "and" else old_rule
     else:
         if combine == "and":
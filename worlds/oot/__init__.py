@@ -1294,6 +1294,7 @@ class OOTWorld(World):
     def collect(self, state: CollectionState, item: OOTItem) -> bool:
         if item.advancement and item.special and item.special.get('alias', False):
             alt_item_name, count = item.special.get('alias')
+            state.unshare(self.player)
             state.prog_items[self.player][alt_item_name] += count
             return True
         return super().collect(state, item)
@@ -1301,6 +1302,7 @@ class OOTWorld(World):
     def remove(self, state: CollectionState, item: OOTItem) -> bool:
         if item.advancement and item.special and item.special.get('alias', False):
             alt_item_name, count = item.special.get('alias')
+            state.unshare(self.player)
             state.prog_items[self.player][alt_item_name] -= count
             if state.prog_items[self.player][alt_item_name] < 1:
                 del (state.prog_items[self.player][alt_item_name])
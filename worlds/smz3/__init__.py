@@ -504,6 +504,7 @@ class SMZ3World(World):
     def collect(self, state: CollectionState, item: Item) -> bool:
         state.smz3state[self.player].Add([TotalSMZ3Item.Item(TotalSMZ3Item.ItemType[item.name], self.smz3World if hasattr(self, "smz3World") else None)])
         if item.advancement:
+            state.unshare(item.player)
             state.prog_items[item.player][item.name] += 1
             return True  # indicate that a logical state change has occured
         return False
@@ -511,6 +512,7 @@ class SMZ3World(World):
     def remove(self, state: CollectionState, item: Item) -> bool:
         name = self.collect_item(state, item, True)
         if name:
+            state.unshare(item.player)
             state.smz3state[item.player].Remove([TotalSMZ3Item.Item(TotalSMZ3Item.ItemType[item.name], self.smz3World if hasattr(self, "smz3World") else None)])
             state.prog_items[item.player][item.name] -= 1
             if state.prog_items[item.player][item.name] < 1: